@@ -15,10 +15,12 @@ Características:
 - Mapeo automático comando->decodificador
 """
 
-import socket
+import asyncio
+import threading
 import time
-from typing import Dict, List, Any, Tuple, Optional
-from dataclasses import dataclass
+import uuid
+from typing import Dict, List, Any, Tuple, Optional, AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, replace
 from enum import Enum
 
 # Import hex frames and decoder integration
@@ -33,15 +35,40 @@ from .hex_frames import (
     validate_frame_format,
     DRS_MASTER_FRAMES, 
     DRS_REMOTE_FRAMES,
-    DRS_SET_FRAMES,
     get_all_master_commands,
     get_all_remote_commands,
-    get_all_set_commands
+    get_all_set_commands,
+    get_set_command_readback,
+    get_frame_registry
 )
 from .decoder_integration import (
     CommandDecoderMapping, 
     create_mock_decoder_response
 )
+from .device_session import AsyncDeviceSession
+from .frame_reader import has_valid_crc, is_well_formed_frame
+from .rto import RTOEstimator, get_default_rto
+from .resilience import CircuitBreakerRegistry, RetryPolicy, get_default_breakers
+from .single_flight import get_single_flight
+from .read_cache import DeviceReadCache, get_read_cache
+from .mock_latency import MockLatencyModel, get_default_mock_latency
+from .state_backend import StateBackend, device_lock, get_state_backend
+from .readback import ReadbackCheck, plan_readback
+from .incremental import SOURCE_PREVIOUS, SOURCE_RERUN, select_commands
+from .early_stop import EARLY_STOP_REASON, PASS_THRESHOLD, EarlyStopPolicy
+from .tiered import TIER_GET, TIER_PROBE, TIER_SET, TieredPlan
+from .history import CommandHistory, get_default_history
+from .pacing import (
+    PacingController,
+    get_default_pacing,
+    FAILURE_MALFORMED,
+    FAILURE_RESET,
+    FAILURE_TIMEOUT
+)
+
+# Errores detectados antes de enviar la trama (no dicen nada del dispositivo)
+LOCAL_FRAME_ERRORS = ("Frame not found", "Invalid frame format")
+
 
 class CommandType(Enum):
     """Tipos de comandos DRS disponibles"""
@@ -55,6 +82,8 @@ class ValidationResult(Enum):
     FAIL = "FAIL"
     TIMEOUT = "TIMEOUT"
     ERROR = "ERROR"
+    SKIPPED = "SKIPPED"
+    CANCELLED = "CANCELLED"
 
 @dataclass
 class CommandTestResult:
@@ -68,10 +97,12 @@ class CommandTestResult:
     decoded_values: Dict[str, Any] = None
     duration_ms: int = 0
     error: str = ""
+    attempts: int = 1
+    provenance: Dict[str, Any] = None  # Origen del resultado en revalidaciones incrementales
     
     def to_dict(self) -> Dict[str, Any]:
         """Convierte el resultado a diccionario serializable JSON"""
-        return {
+        data = {
             "command": self.command,
             "command_type": self.command_type.value if isinstance(self.command_type, CommandType) else str(self.command_type),
             "status": self.status.value if isinstance(self.status, ValidationResult) else str(self.status),
@@ -80,8 +111,37 @@ class CommandTestResult:
             "response_data": self.response_data,
             "decoded_values": self.decoded_values or {},
             "duration_ms": self.duration_ms,
-            "error": self.error
+            "error": self.error,
+            "attempts": self.attempts
         }
+        if self.provenance:
+            data["provenance"] = self.provenance
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CommandTestResult":
+        """Reconstruye un resultado desde su diccionario (p. ej. de un resultado guardado)"""
+        try:
+            command_type = CommandType(data.get("command_type"))
+        except ValueError:
+            command_type = data.get("command_type")
+        try:
+            status = ValidationResult(data.get("status"))
+        except ValueError:
+            status = ValidationResult.ERROR
+        return cls(
+            command=data["command"],
+            command_type=command_type,
+            status=status,
+            message=data.get("message", ""),
+            details=data.get("details", ""),
+            response_data=data.get("response_data", ""),
+            decoded_values=data.get("decoded_values") or {},
+            duration_ms=data.get("duration_ms", 0),
+            error=data.get("error", ""),
+            attempts=data.get("attempts", 1),
+            provenance=data.get("provenance")
+        )
 
 class BatchCommandsValidator:
     """
@@ -91,17 +151,71 @@ class BatchCommandsValidator:
     con soporte para modo mock (simulación) y live (conexión real).
     """
     
-    def __init__(self, timeout_per_command: int = 3, log_callback=None):
+    def __init__(
+        self,
+        timeout_per_command: int = 3,
+        log_callback=None,
+        pipeline_window: int = 1,
+        pacing: Optional[PacingController] = None,
+        device_model: Optional[str] = None,
+        firmware_version: Optional[str] = None,
+        rto: Optional[RTOEstimator] = None,
+        adaptive_timeouts: bool = True,
+        retry_policy: Optional[RetryPolicy] = None,
+        breakers: Optional[CircuitBreakerRegistry] = None,
+        coalesce_reads: bool = True,
+        read_cache: Optional[DeviceReadCache] = None,
+        mock_latency: Optional[MockLatencyModel] = None,
+        state_backend: Optional[StateBackend] = None,
+        verify_readback: bool = False,
+        early_stop: Optional[EarlyStopPolicy] = None,
+        history: Optional[CommandHistory] = None,
+        order_by_history: bool = False
+    ):
         """
         Inicializar el validador batch.
         
         Args:
             timeout_per_command: Timeout en segundos para cada comando individual
             log_callback: Función opcional para logging en tiempo real (async)
+            pipeline_window: Comandos GET enviados seguidos sin esperar respuesta
+                en modo live (1 = secuencial, sin pipelining)
+            pacing: Controlador de pausa entre comandos (None = compartido del proceso)
+            device_model: Modelo del dispositivo para el perfil de pausa (default: tipo de comando)
+            firmware_version: Versión de firmware para el perfil de pausa
+            rto: Estimador de timeouts por dispositivo/comando (None = compartido del proceso)
+            adaptive_timeouts: Si es False, todos los comandos usan timeout_per_command
+            retry_policy: Reintentos de errores transitorios (None = max_retries de validation_scenarios.yaml)
+            breakers: Circuit breakers por IP (None = registro compartido del proceso)
+            coalesce_reads: Comparte un único intercambio entre lecturas GET idénticas en curso
+            read_cache: Caché de lecturas GET (None = caché compartida del proceso)
+            mock_latency: Latencia simulada del modo mock (None = perfil $DRS_MOCK_LATENCY / configuración)
+            state_backend: Estado compartido entre workers para locks de dispositivo (None = $DRS_STATE_BACKEND)
+            verify_readback: Tras cada SET, lee el parámetro escrito por la misma conexión
+                y falla el SET si los valores leídos no coinciden con los escritos
+            early_stop: Corta el batch cuando el veredicto ya está decidido (None = ejecutar todo)
+            history: Latencias y fallos de resultados guardados (None = historial compartido del proceso)
+            order_by_history: Ejecuta primero los GET de mayor valor diagnóstico según el historial
+                (por defecto se conserva el orden de los comandos)
         """
         self.timeout_per_command = timeout_per_command
         self.socket_timeout = timeout_per_command
         self.log_callback = log_callback
+        self.pipeline_window = max(1, pipeline_window or 1)
+        self.pacing = pacing or get_default_pacing()
+        self.device_model = device_model
+        self.firmware_version = firmware_version
+        self.rto = (rto or get_default_rto()) if adaptive_timeouts else None
+        self.retry_policy = retry_policy or RetryPolicy.from_scenarios()
+        self.breakers = breakers or get_default_breakers()
+        self.single_flight = get_single_flight() if coalesce_reads else None
+        self.read_cache = read_cache or get_read_cache()
+        self.mock_latency = mock_latency or get_default_mock_latency()
+        self.state_backend = state_backend or get_state_backend()
+        self.verify_readback = verify_readback
+        self.early_stop = early_stop
+        self.history = history or get_default_history()
+        self.order_by_history = order_by_history
     
     async def _log(self, message: str, level: str = "INFO"):
         """
@@ -117,41 +231,50 @@ class BatchCommandsValidator:
             except Exception as e:
                 print(f"Warning: Failed to send log message: {e}")
     
-    def _log_sync(self, message: str, level: str = "INFO"):
+    def validate_batch_commands(
+        self, 
+        ip_address: str,
+        command_type: CommandType,
+        mode: str = "mock",
+        selected_commands: List[str] = None,
+        port: int = 65050,
+        max_staleness: Optional[float] = None
+    ) -> Dict[str, Any]:
         """
-        Envía un mensaje de log de forma síncrona (para contextos no-async).
+        Valida un batch de comandos DRS (versión síncrona).
+        
+        Envoltorio de validate_batch_commands_async: ejecuta el mismo núcleo
+        asíncrono en un event loop propio. Desde código async (endpoints)
+        debe usarse directamente validate_batch_commands_async.
         
         Args:
-            message: Mensaje a loguear
-            level: Nivel del log (INFO, DEBUG, ERROR, etc.)
+            ip_address: IP del dispositivo DRS
+            command_type: Tipo de comandos (MASTER o REMOTE)
+            mode: Modo de validación ("mock" o "live")  
+            selected_commands: Lista específica de comandos (None = todos)
+            port: Puerto TCP para conexión (default: 65050)
+            max_staleness: Antigüedad máxima (segundos) de lecturas GET servidas
+                desde la caché en modo live (None = siempre leer del dispositivo)
+            
+        Returns:
+            Diccionario con resultados de validación batch
         """
-        if self.log_callback:
-            try:
-                # Si hay un event loop corriendo, crear una tarea async
-                import asyncio
-                try:
-                    loop = asyncio.get_running_loop()
-                    # Crear tarea para ejecutar el callback async
-                    asyncio.create_task(self.log_callback(f"[{level}] {message}"))
-                except RuntimeError:
-                    # No hay event loop, usar print como fallback
-                    print(f"[{level}] {message}")
-            except Exception as e:
-                print(f"Warning: Failed to send sync log message: {e}")
-        else:
-            # Fallback cuando no hay callback
-            print(f"[{level}] {message}")
+        return _run_coroutine_sync(self.validate_batch_commands_async(
+            ip_address, command_type, mode, selected_commands, port, max_staleness
+        ))
     
-    def validate_batch_commands(
+    async def validate_batch_commands_async(
         self, 
         ip_address: str,
         command_type: CommandType,
         mode: str = "mock",
         selected_commands: List[str] = None,
-        port: int = 65050
+        port: int = 65050,
+        max_staleness: Optional[float] = None,
+        on_result: Optional[Callable[["CommandTestResult"], Awaitable[None]]] = None
     ) -> Dict[str, Any]:
         """
-        Valida un batch de comandos DRS (versión síncrona).
+        Valida un batch de comandos DRS (versión asíncrona con logs en tiempo real).
         
         Args:
             ip_address: IP del dispositivo DRS
@@ -159,6 +282,9 @@ class BatchCommandsValidator:
             mode: Modo de validación ("mock" o "live")  
             selected_commands: Lista específica de comandos (None = todos)
             port: Puerto TCP para conexión (default: 65050)
+            max_staleness: Antigüedad máxima (segundos) de lecturas GET servidas
+                desde la caché en modo live (None = siempre leer del dispositivo)
+            on_result: Función async llamada con cada resultado apenas termina su comando
             
         Returns:
             Diccionario con resultados de validación batch
@@ -171,71 +297,284 @@ class BatchCommandsValidator:
         else:
             commands = self._get_commands_for_type(command_type)
         
+        # Orden y duración estimada según el historial del dispositivo
+        plan = await self._plan_commands_async(ip_address, mode, commands)
+        commands = {cmd_name: commands[cmd_name] for cmd_name in plan["order"]}
+        await self._log(
+            f"⏱️ Duración estimada: ~{plan['eta_seconds']}s para {plan['total_commands']} comandos "
+            f"({plan['commands_with_history']} con historial)"
+        )
+        
         # Ejecutar tests según el modo
         if mode.lower() == "mock":
-            # ALWAYS use sync version - async will be called from validate_batch_commands_async
-            results = self._execute_mock_batch(commands, command_type)
+            results = await self._execute_mock_batch_async(commands, command_type, on_result)
         else:
-            results = self._execute_live_batch(ip_address, commands, command_type, port)
-        
-        # Calcular estadísticas
-        total_duration = int((time.time() - start_time) * 1000)
-        stats = self._calculate_batch_statistics(results)
+            # Modo live con logs detallados en tiempo real
+            results = await self._execute_live_batch_async(
+                ip_address, commands, command_type, port, max_staleness, on_result
+            )
         
-        return {
-            "overall_status": self._determine_overall_status(results),
-            "command_type": command_type.value,
-            "mode": mode,
-            "ip_address": ip_address,
-            "total_commands": len(commands),
-            "commands_tested": [result.command for result in results],
-            "statistics": stats,
-            "results": [result.to_dict() for result in results],
-            "duration_ms": total_duration,
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-        }
+        result = self._batch_result(ip_address, command_type, mode, commands, results, start_time)
+        result["plan"] = plan
+        return result
     
-    async def validate_batch_commands_async(
-        self, 
+    def validate_tiered(
+        self,
         ip_address: str,
         command_type: CommandType,
         mode: str = "mock",
-        selected_commands: List[str] = None,
-        port: int = 65050
+        port: int = 65050,
+        escalate_to_set: Optional[bool] = None,
+        plan: Optional[TieredPlan] = None
+    ) -> Dict[str, Any]:
+        """Validación escalonada (versión síncrona de validate_tiered_async)."""
+        return _run_coroutine_sync(
+            self.validate_tiered_async(ip_address, command_type, mode, port, escalate_to_set, plan)
+        )
+    
+    async def validate_tiered_async(
+        self,
+        ip_address: str,
+        command_type: CommandType,
+        mode: str = "mock",
+        port: int = 65050,
+        escalate_to_set: Optional[bool] = None,
+        plan: Optional[TieredPlan] = None,
+        on_result: Optional[Callable[["CommandTestResult"], Awaitable[None]]] = None
     ) -> Dict[str, Any]:
         """
-        Valida un batch de comandos DRS (versión asíncrona con logs en tiempo real).
+        Validación escalonada: sonda de salud y batch completo sólo ante anomalías.
+        
+        Ejecuta los comandos de la sonda; si falta algún valor o está fuera
+        de rango, escala a los GET restantes del tipo y, si se pide, a los SET.
         
         Args:
             ip_address: IP del dispositivo DRS
             command_type: Tipo de comandos (MASTER o REMOTE)
-            mode: Modo de validación ("mock" o "live")  
-            selected_commands: Lista específica de comandos (None = todos)
+            mode: Modo de validación ("mock" o "live")
             port: Puerto TCP para conexión (default: 65050)
+            escalate_to_set: Incluir los SET al escalar (None = según el plan)
+            plan: Sonda y rangos (None = validation_modes.tiered de la configuración)
+            on_result: Función async llamada con cada resultado apenas termina su comando
             
         Returns:
-            Diccionario con resultados de validación batch
+            Diccionario con resultados de validación batch y la clave "tiers"
+            (niveles ejecutados y anomalías de la sonda)
         """
+        if command_type == CommandType.SET:
+            raise ValueError("Tiered validation requires master or remote commands")
+        plan = plan or TieredPlan.from_scenarios()
+        if escalate_to_set is None:
+            escalate_to_set = plan.escalate_to_set
         start_time = time.time()
         
-        # Obtener lista de comandos a probar
+        all_commands = self._get_commands_for_type(command_type)
+        probe_commands = [cmd_name for cmd_name in plan.probe_commands if cmd_name in all_commands]
+        probe = await self.validate_batch_commands_async(
+            ip_address, command_type, mode, probe_commands, port, on_result=on_result
+        )
+        results = [CommandTestResult.from_dict(result) for result in probe["results"]]
+        anomalies = plan.anomalies(probe["results"])
+        executed = [TIER_PROBE]
+        
+        if anomalies:
+            await self._log(
+                f"⚠️ Sonda de salud con {len(anomalies)} anomalías "
+                f"({', '.join(a['command'] for a in anomalies)}): escalando a batch completo", "WARNING"
+            )
+            tiers = [(TIER_GET, [c for c in all_commands if not self._is_set_command(c) and c not in probe_commands])]
+            if escalate_to_set:
+                tiers.append((TIER_SET, [c for c in all_commands if self._is_set_command(c)]))
+            for tier, tier_commands in tiers:
+                if not tier_commands:
+                    continue
+                executed.append(tier)
+                batch = await self.validate_batch_commands_async(
+                    ip_address, command_type, mode, tier_commands, port, on_result=on_result
+                )
+                results.extend(CommandTestResult.from_dict(result) for result in batch["results"])
+        else:
+            await self._log(f"✅ Sonda de salud OK ({len(probe_commands)} comandos): sin escalar")
+        
+        result = self._batch_result(
+            ip_address, command_type, mode, {r.command: "" for r in results}, results, start_time
+        )
+        result["tiers"] = {"executed": executed, "escalated": bool(anomalies), "anomalies": anomalies}
+        return result
+    
+    def revalidate_batch_commands(
+        self,
+        previous: Dict[str, Any],
+        mode: Optional[str] = None,
+        port: int = 65050,
+        max_age_seconds: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Revalidación incremental (versión síncrona de revalidate_batch_commands_async)."""
+        return _run_coroutine_sync(
+            self.revalidate_batch_commands_async(previous, mode, port, max_age_seconds)
+        )
+    
+    async def revalidate_batch_commands_async(
+        self,
+        previous: Dict[str, Any],
+        mode: Optional[str] = None,
+        port: int = 65050,
+        max_age_seconds: Optional[float] = None,
+        on_result: Optional[Callable[["CommandTestResult"], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Revalidación incremental de un resultado batch anterior.
+        
+        Sólo se ejecutan los comandos que no pasaron o cuya validación es
+        más antigua que max_age_seconds; los demás se conservan. Cada
+        resultado lleva su procedencia: source (rerun / previous), run_id
+        y validated_at del batch que lo produjo.
+        
+        Args:
+            previous: Resultado batch anterior (ver incremental.load_previous_result)
+            mode: Modo de validación (None = el del resultado anterior)
+            port: Puerto TCP para conexión (default: 65050)
+            max_age_seconds: Antigüedad máxima de un PASS para conservarlo (None = sin límite)
+            on_result: Función async llamada con cada resultado re-ejecutado
+            
+        Returns:
+            Diccionario con resultados de validación batch combinados y la
+            clave "incremental" con los comandos re-ejecutados
+        """
+        start_time = time.time()
+        ip_address = previous["ip_address"]
+        command_type = CommandType(previous["command_type"])
+        mode = mode or previous.get("mode", "mock")
+        rerun = select_commands(previous, max_age_seconds)
+        
+        await self._log(
+            f"♻️ Revalidación incremental de {ip_address}: {len(rerun)}/{len(previous['results'])} comandos a re-ejecutar"
+        )
+        fresh_results: Dict[str, Dict[str, Any]] = {}
+        fresh_provenance: Dict[str, Any] = {}
+        if rerun:
+            fresh = await self.validate_batch_commands_async(
+                ip_address, command_type, mode, rerun, port, on_result=on_result
+            )
+            fresh_results = {result["command"]: result for result in fresh["results"]}
+            fresh_provenance = {"source": SOURCE_RERUN, "run_id": fresh["run_id"], "validated_at": fresh["timestamp"]}
+        
+        merged = []
+        for previous_result in previous["results"]:
+            cmd_name = previous_result["command"]
+            if cmd_name in fresh_results:
+                result = CommandTestResult.from_dict(fresh_results[cmd_name])
+                result.provenance = dict(fresh_provenance)
+            else:
+                origin = previous_result.get("provenance") or {}
+                result = CommandTestResult.from_dict(previous_result)
+                result.provenance = {
+                    "source": SOURCE_PREVIOUS,
+                    "run_id": origin.get("run_id") or previous.get("run_id"),
+                    "validated_at": origin.get("validated_at") or previous.get("timestamp")
+                }
+            merged.append(result)
+        
+        batch = self._batch_result(
+            ip_address, command_type, mode, {result.command: "" for result in merged}, merged, start_time
+        )
+        batch["incremental"] = {
+            "previous_run_id": previous.get("run_id"),
+            "rerun_commands": [cmd_name for cmd_name in rerun if cmd_name in fresh_results],
+            "reused_commands": sum(1 for result in merged if result.provenance["source"] == SOURCE_PREVIOUS)
+        }
+        return batch
+    
+    def cancelled_batch_result(
+        self,
+        ip_address: str,
+        command_type: CommandType,
+        mode: str,
+        selected_commands: Optional[List[str]],
+        completed: List[CommandTestResult],
+        start_time: float
+    ) -> Dict[str, Any]:
+        """
+        Resultado parcial de un batch cancelado.
+        
+        Conserva los resultados ya obtenidos (p. ej. recogidos con on_result)
+        y marca como CANCELLED los comandos que no llegaron a completarse.
+        
+        Args:
+            completed: Resultados obtenidos antes de la cancelación
+            start_time: time.time() del inicio del batch
+        """
         if selected_commands:
             commands = self._build_commands_dict(selected_commands, command_type)
         else:
             commands = self._get_commands_for_type(command_type)
+        done = {result.command for result in completed}
+        cancelled = [
+            CommandTestResult(
+                command=cmd_name,
+                command_type=command_type,
+                status=ValidationResult.CANCELLED,
+                message=f"🛑 Cancelled before completion: {cmd_name}",
+                details="cancelled"
+            )
+            for cmd_name in commands if cmd_name not in done
+        ]
+        return self._batch_result(ip_address, command_type, mode, commands, list(completed) + cancelled, start_time)
+    
+    def plan_batch(
+        self,
+        ip_address: str,
+        command_type: CommandType,
+        mode: str = "mock",
+        selected_commands: List[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Orden de ejecución y duración estimada de un batch, sin ejecutarlo.
         
-        # Ejecutar tests según el modo
-        if mode.lower() == "mock":
-            results = await self._execute_mock_batch_async(commands, command_type)
+        Returns:
+            {"order", "eta_seconds", "total_commands", "commands_with_history", "expected_ms"}
+        """
+        if selected_commands:
+            commands = self._build_commands_dict(selected_commands, command_type)
         else:
-            # Modo live con logs detallados en tiempo real
-            results = await self._execute_live_batch_async(ip_address, commands, command_type, port)
-        
-        # Calcular estadísticas
+            commands = self._get_commands_for_type(command_type)
+        return self._plan_commands(ip_address, mode, commands)
+    
+    def _plan_commands(
+        self,
+        ip_address: str,
+        mode: str,
+        commands: Dict[str, str],
+        refresh: bool = True
+    ) -> Dict[str, Any]:
+        """Ordena los comandos según el historial y predice la duración del batch."""
+        if refresh:
+            self.history.refresh()
+        order = list(commands)
+        if self.order_by_history:
+            order = self.history.order(ip_address, mode, order, is_set=self._is_set_command)
+        return {"order": order, **self.history.predict(ip_address, mode, order)}
+    
+    async def _plan_commands_async(self, ip_address: str, mode: str, commands: Dict[str, str]) -> Dict[str, Any]:
+        """Como _plan_commands, pero relee el historial en un hilo para no bloquear el event loop."""
+        await asyncio.to_thread(self.history.refresh)
+        return self._plan_commands(ip_address, mode, commands, refresh=False)
+    
+    def _batch_result(
+        self,
+        ip_address: str,
+        command_type: CommandType,
+        mode: str,
+        commands: Dict[str, str],
+        results: List[CommandTestResult],
+        start_time: float
+    ) -> Dict[str, Any]:
+        """Arma el diccionario de resultado batch con sus estadísticas."""
         total_duration = int((time.time() - start_time) * 1000)
         stats = self._calculate_batch_statistics(results)
         
         return {
+            "run_id": uuid.uuid4().hex[:12],
             "overall_status": self._determine_overall_status(results),
             "command_type": command_type.value,
             "mode": mode,
@@ -245,9 +584,59 @@ class BatchCommandsValidator:
             "statistics": stats,
             "results": [result.to_dict() for result in results],
             "duration_ms": total_duration,
+            "root_cause": self._find_root_cause(results),
+            "early_stop": self._early_stop_summary(results),
+            "circuit_breaker": self.breakers.get(ip_address).to_dict() if mode.lower() != "mock" else None,
             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
         }
     
+    async def stream_batch_commands(
+        self,
+        ip_address: str,
+        command_type: CommandType,
+        mode: str = "mock",
+        selected_commands: List[str] = None,
+        port: int = 65050,
+        max_staleness: Optional[float] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Valida un batch entregando cada resultado en cuanto termina su comando.
+        
+        Emite registros {"type": "result", ...CommandTestResult.to_dict()} y, al
+        final, {"type": "summary", ...} con el resultado batch sin la lista de
+        resultados (o {"type": "error"} si la validación falla). Si el consumidor
+        deja de iterar, la validación en curso se cancela.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        
+        async def publish(result: CommandTestResult):
+            await queue.put({"type": "result", **result.to_dict()})
+        
+        async def run():
+            try:
+                summary = await self.validate_batch_commands_async(
+                    ip_address, command_type, mode, selected_commands, port, max_staleness, on_result=publish
+                )
+                summary.pop("results", None)
+                await queue.put({"type": "summary", **summary})
+            except Exception as e:
+                await queue.put({"type": "error", "error": str(e)})
+        
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                record = await queue.get()
+                yield record
+                if record["type"] != "result":
+                    break
+        finally:
+            if not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+    
     def _get_commands_for_type(self, command_type: CommandType) -> Dict[str, str]:
         """Obtiene todos los comandos (GET + SET) para el tipo especificado."""
         from .hex_frames import (
@@ -314,9 +703,18 @@ class BatchCommandsValidator:
         
         return commands
     
-    async def _execute_mock_batch_async(self, commands: Dict[str, str], command_type: CommandType) -> List[CommandTestResult]:
+    async def _execute_mock_batch_async(
+        self,
+        commands: Dict[str, str],
+        command_type: CommandType,
+        on_result: Optional[Callable[[CommandTestResult], Awaitable[None]]] = None
+    ) -> List[CommandTestResult]:
         """
-        Versión asíncrona de _execute_mock_batch para enviar logs en tiempo real.
+        Ejecuta validación batch en modo mock (simulado).
+        
+        En modo mock, todos los comandos simulan respuestas exitosas con
+        datos realistas; la latencia del perfil mock se espera con
+        asyncio.sleep, sin bloquear el event loop.
         """
         from .real_drs_responses_20250926_194004 import REAL_DRS_RESPONSES as MASTER_RESPONSES
         from .real_drs_remote_responses import REAL_DRS_RESPONSES as REMOTE_RESPONSES
@@ -335,10 +733,10 @@ class BatchCommandsValidator:
             await self._log(f"📤 [{i}/{len(commands)}] Comando: {cmd_name}")
             await self._log(f"    📋 Trama enviada: {hex_frame}")
             
-            # Simular duración realista (50-200ms)
-            import random
-            import asyncio
-            await asyncio.sleep(random.uniform(0.05, 0.2))
+            # Simular la latencia del dispositivo según el perfil mock
+            delay = self.mock_latency.delay_for(cmd_name)
+            if delay:
+                await asyncio.sleep(delay)
             
             duration = int((time.time() - start_time) * 1000)
             
@@ -387,62 +785,135 @@ class BatchCommandsValidator:
                 duration_ms=duration
             )
             
-            results.append(result)
+            # Lectura simulada del parámetro escrito por el SET
+            if self.verify_readback and is_set_command and mock_response:
+                check = self._mock_readback(result, hex_frame)
+                if check:
+                    delay = self.mock_latency.delay_for(check.get_command)
+                    if delay:
+                        await asyncio.sleep(delay)
+                    result.duration_ms += int(delay * 1000)
+                    await self._log(f"    🔎 Read-back {check.get_command}: valores confirmados")
+            
+            await self._publish(results, [result], on_result)
+            
+            reason = self._early_stop_reason(results, len(commands))
+            if reason:
+                remaining = list(commands)[i:]
+                await self._log(f"🏁 Veredicto decidido: {reason}; {len(remaining)} comandos sin ejecutar")
+                await self._publish(results, self._not_executed_results(remaining, command_type, reason), on_result)
+                break
         
         return results
     
-    async def _execute_live_batch_async(self, ip_address: str, commands: Dict[str, str], command_type: CommandType, port: int = 65050) -> List[CommandTestResult]:
+    async def _execute_live_batch_async(
+        self,
+        ip_address: str,
+        commands: Dict[str, str],
+        command_type: CommandType,
+        port: int = 65050,
+        max_staleness: Optional[float] = None,
+        on_result: Optional[Callable[[CommandTestResult], Awaitable[None]]] = None
+    ) -> List[CommandTestResult]:
         """
-        Versión asíncrona de _execute_live_batch con logs detallados en tiempo real.
+        Ejecuta validación batch en modo live (conexión real) con logs en tiempo real.
         
         Conecta al dispositivo DRS y ejecuta comandos reales usando
         tramas hexadecimales del protocolo Santone, enviando logs detallados via WebSocket.
+        El transporte es asyncio nativo: no ocupa hilos del executor mientras espera al dispositivo.
+        Con pipeline_window > 1, los comandos GET consecutivos se envían en ventanas.
+        Con max_staleness, las lecturas GET vigentes en la caché no van al cable.
         """
-        import asyncio
-        
         # Log inicial
         await self._log(f"🔌 Iniciando validación batch de {len(commands)} comandos {command_type.value} en {ip_address}")
         
         results = []
+        index = 0
+        steps = self._plan_live_steps(commands)
+        pacing_key = self.pacing.profile_key(self.device_model or command_type.value, self.firmware_version)
+        breaker = self.breakers.get(ip_address)
         
-        for i, (cmd_name, hex_frame) in enumerate(commands.items(), 1):
-            start_time = time.time()
-            
-            # Log detallado del comando
-            await self._log(f"📤 [{i}/{len(commands)}] Comando: {cmd_name}")
-            await self._log(f"    📋 Trama enviada: {hex_frame}")
-            
-            # Ejecutar comando en thread pool para no bloquear
-            result = await asyncio.to_thread(
-                self._execute_single_live_command,
-                ip_address,
-                cmd_name,
-                command_type,
-                port
-            )
-            
-            results.append(result)
-            
-            # Log de la respuesta recibida
-            if result.response_data:
-                await self._log(f"    📥 Respuesta: {result.response_data}")
-            
-            # Log de valores decodificados
-            if result.decoded_values:
-                for key, value in result.decoded_values.items():
-                    if key not in ['status', 'mock_source', 'raw_bytes', 'decoder_mapping']:
-                        await self._log(f"       🔍 {key}: {value}")
-            
-            # Log del resultado
-            if result.status == ValidationResult.PASS:
-                await self._log(f"    ✅ EXITOSO ({result.duration_ms}ms)")
-            elif result.status == ValidationResult.TIMEOUT:
-                await self._log(f"    ⏱️ TIMEOUT ({result.duration_ms}ms)")
-            else:
-                await self._log(f"    ❌ ERROR: {result.error}")
-            
-            # Pequeña pausa entre comandos
-            await asyncio.sleep(0.1)
+        # Una sola conexión TCP para todo el batch
+        device_timeout = self._response_timeout(ip_address)
+        # Con estado compartido entre workers, un solo proceso habla con el dispositivo
+        async with device_lock(self.state_backend, ip_address, port), \
+                AsyncDeviceSession(ip_address, port, timeout=device_timeout, log=self._log) as session:
+            for step_index, step in enumerate(steps):
+                # Circuit breaker abierto: el dispositivo no recibe más comandos
+                if not breaker.allow_request():
+                    remaining = [cmd for later in steps[step_index:] for cmd in later]
+                    await self._log(f"⛔ Circuit breaker abierto para {ip_address}; omitiendo {len(remaining)} comandos", "ERROR")
+                    await self._publish(results, self._skipped_results(remaining, command_type, "circuit_open"), on_result)
+                    break
+                
+                # Toda sonda half-open se libera, sea cual sea el desenlace del paso
+                # (FAIL, SKIPPED, caché, error local de trama, cancelación)
+                try:
+                    for cmd_name in step:
+                        index += 1
+                        # Log detallado del comando
+                        await self._log(f"📤 [{index}/{len(commands)}] Comando: {cmd_name}")
+                        await self._log(f"    📋 Trama enviada: {commands[cmd_name]}")
+                
+                    cached = self._cached_results(ip_address, port, command_type, step, max_staleness)
+                    to_send = [cmd_name for cmd_name in step if cmd_name not in cached]
+                    if len(to_send) == 1:
+                        sent_results = [
+                            await self._execute_single_live_command(ip_address, to_send[0], command_type, port, session)
+                        ]
+                    elif to_send:
+                        sent_results = await self._execute_pipelined_window(to_send, command_type, session)
+                    else:
+                        sent_results = []
+                    by_command = dict(cached)
+                    by_command.update((result.command, result) for result in sent_results)
+                    step_results = [by_command[cmd_name] for cmd_name in step]
+                
+                    # Dispositivo inalcanzable: el fallo se atribuye a la causa raíz
+                    unreachable = session.unreachable_reason
+                    if unreachable:
+                        root_cause = f"{unreachable}: {session.last_connect_detail}"
+                        for result in step_results:
+                            if result.status != ValidationResult.PASS:
+                                result.status = ValidationResult.ERROR
+                                result.error = root_cause
+                
+                    for result in step_results:
+                        if result.command not in cached:
+                            self._record_pacing(pacing_key, result)
+                            self._record_breaker(breaker, result)
+                            self._update_read_cache(ip_address, port, result)
+                        if (self.verify_readback and self._is_set_command(result.command)
+                                and result.status == ValidationResult.PASS and not session.unreachable_reason):
+                            readback_result = await self._verify_readback(session, result, command_type)
+                            if readback_result:
+                                self._record_pacing(pacing_key, readback_result)
+                                self._record_breaker(breaker, readback_result)
+                                self._update_read_cache(ip_address, port, readback_result)
+                        await self._publish(results, [result], on_result)
+                        await self._log_live_result(result)
+                
+                    if unreachable:
+                        remaining = [cmd for later in steps[step_index + 1:] for cmd in later]
+                        await self._log(f"⛔ Dispositivo inalcanzable ({root_cause}); omitiendo {len(remaining)} comandos", "ERROR")
+                        await self._publish(results, self._skipped_results(remaining, command_type, unreachable), on_result)
+                        break
+                
+                    reason = self._early_stop_reason(results, len(commands))
+                    if reason:
+                        remaining = [cmd for later in steps[step_index + 1:] for cmd in later]
+                        await self._log(f"🏁 Veredicto decidido: {reason}; {len(remaining)} comandos sin ejecutar")
+                        await self._publish(results, self._not_executed_results(remaining, command_type, reason), on_result)
+                        break
+                
+                    # Pausa adaptativa entre comandos (o ventanas)
+                    gap = self.pacing.gap_seconds(pacing_key)
+                    if gap and to_send and step_index < len(steps) - 1:
+                        await asyncio.sleep(gap)
+                finally:
+                    breaker.release_probe()
+        
+        self.pacing.save()
         
         # Log final
         successful = sum(1 for r in results if r.status == ValidationResult.PASS)
@@ -450,189 +921,404 @@ class BatchCommandsValidator:
         
         return results
     
-    def _execute_mock_batch(self, commands: Dict[str, str], command_type: CommandType) -> List[CommandTestResult]:
+    @staticmethod
+    async def _publish(
+        results: List[CommandTestResult],
+        new_results: List[CommandTestResult],
+        on_result: Optional[Callable[[CommandTestResult], Awaitable[None]]]
+    ):
+        """Agrega resultados al batch y los notifica a on_result en cuanto están listos."""
+        for result in new_results:
+            results.append(result)
+            if on_result:
+                await on_result(result)
+    
+    def _cached_results(
+        self,
+        ip_address: str,
+        port: int,
+        command_type: CommandType,
+        command_names: List[str],
+        max_staleness: Optional[float]
+    ) -> Dict[str, CommandTestResult]:
+        """Resultados GET vigentes en la caché de lecturas (vacío si max_staleness es None)."""
+        if max_staleness is None:
+            return {}
+        cached = {}
+        for cmd_name in command_names:
+            if self._is_set_command(cmd_name):
+                continue
+            hit = self.read_cache.get(ip_address, port, command_type.value, cmd_name, max_staleness)
+            if hit:
+                result, age = hit
+                cached[cmd_name] = replace(
+                    result,
+                    decoded_values=dict(result.decoded_values or {}),
+                    details=f"Cached read ({age:.1f}s old)",
+                    duration_ms=0,
+                    attempts=0
+                )
+        return cached
+    
+    def _update_read_cache(self, ip_address: str, port: int, result: CommandTestResult):
+        """Guarda lecturas GET válidas e invalida las afectadas por comandos SET enviados."""
+        if self._is_set_command(result.command):
+            if result.error not in LOCAL_FRAME_ERRORS:
+                # Aunque el SET falle, el dispositivo pudo haberlo aplicado; se
+                # invalidan las lecturas de cualquier tipo de comando
+                self.read_cache.invalidate(ip_address, port, get_set_command_readback(result.command))
+        elif result.status == ValidationResult.PASS:
+            self.read_cache.put(ip_address, port, result.command_type.value, result.command, replace(result))
+    
+    async def _verify_readback(
+        self,
+        session: AsyncDeviceSession,
+        set_result: CommandTestResult,
+        command_type: CommandType
+    ) -> Optional[CommandTestResult]:
         """
-        Ejecuta validación batch en modo mock (simulado).
+        Lee por la sesión el parámetro escrito por un SET y compara los valores.
         
-        En modo mock, todos los comandos simulan respuestas exitosas
-        con datos realistas para propósitos de testing.
+        Returns:
+            Resultado del GET de lectura (None si el SET no tiene lectura verificable)
         """
-        from .real_drs_responses_20250926_194004 import REAL_DRS_RESPONSES as MASTER_RESPONSES
-        from .real_drs_remote_responses import REAL_DRS_RESPONSES as REMOTE_RESPONSES
-        from .set_command_responses import get_master_set_mock_response, get_remote_set_mock_response
-        from .hex_frames import get_master_set_command_frame, get_remote_set_command_frame
-        
-        results = []
-        
-        # Log inicial
-        self._log_sync(f"🎮 Modo MOCK: Simulando {len(commands)} comandos {command_type.value}")
+        check = plan_readback(set_result.command, get_frame_registry().get_hex(command_type.value, set_result.command))
+        if check is None:
+            return None
         
-        for i, (cmd_name, hex_frame) in enumerate(commands.items(), 1):
-            start_time = time.time()
-            
-            # Log del comando siendo ejecutado
-            self._log_sync(f"📤 [{i}/{len(commands)}] Comando: {cmd_name}")
-            self._log_sync(f"    📋 Trama enviada: {hex_frame}")
-            
-            # Simular duración realista (50-200ms)
-            import random
-            time.sleep(random.uniform(0.05, 0.2))
-            
-            duration = int((time.time() - start_time) * 1000)
-            
-            # Determinar si es comando GET o SET
-            is_set_command = cmd_name.startswith('set_') or cmd_name.startswith('remote_set_')
-            
-            # Obtener respuesta mock según tipo de comando
-            if is_set_command:
-                if command_type == CommandType.MASTER:
-                    mock_response = get_master_set_mock_response(cmd_name)
-                else:
-                    mock_response = get_remote_set_mock_response(cmd_name)
-                mock_decoded = {}  # Comandos SET no tienen valores decodificados
-                self._log_sync(f"    ⚙️ Comando SET - Configuración aplicada")
-            else:
-                # Comandos GET (lógica existente)
-                if command_type == CommandType.MASTER:
-                    mock_response = MASTER_RESPONSES.get(cmd_name, "")
-                else:
-                    mock_response = REMOTE_RESPONSES.get(cmd_name, "")
-                mock_decoded = self._generate_mock_decoded_values(cmd_name)
-                
-                # Log de respuesta
-                if mock_response:
-                    self._log_sync(f"    📥 Respuesta: {mock_response}")
-                    if mock_decoded:
-                        for key, value in mock_decoded.items():
-                            if key not in ['status', 'mock_source', 'raw_bytes', 'decoder_mapping']:
-                                self._log_sync(f"       🔍 {key}: {value}")
-            
-            # Log del resultado
-            if mock_response:
-                self._log_sync(f"    ✅ EXITOSO ({duration}ms)")
-            else:
-                self._log_sync(f"    ❌ FALLIDO - No mock response")
-            
-            # Crear resultado
-            result = CommandTestResult(
+        await self._log(f"    🔎 Read-back: {check.get_command}")
+        # Los SET genéricos se leen con las tramas GET master
+        readback_type = CommandType.MASTER if command_type == CommandType.SET else command_type
+        get_result = await self._execute_live_command(
+            session.ip_address, check.get_command, readback_type, session.port, session
+        )
+        if get_result.status == ValidationResult.PASS:
+            verification = check.verify(bytes.fromhex(get_result.response_data))
+        else:
+            verification = check.verify(None)
+            verification["error"] = get_result.error or get_result.status.value
+        self._apply_readback(set_result, check, verification, get_result.duration_ms)
+        return get_result
+    
+    def _apply_readback(
+        self,
+        set_result: CommandTestResult,
+        check: ReadbackCheck,
+        verification: Dict[str, Any],
+        duration_ms: int
+    ):
+        """Incorpora la verificación por lectura al resultado de un SET."""
+        set_result.decoded_values = {**(set_result.decoded_values or {}), "readback": verification}
+        set_result.duration_ms += duration_ms
+        if verification["match"]:
+            set_result.message = f"✅ {check.set_command} applied and confirmed by {check.get_command}"
+            set_result.details = f"{set_result.details}; read-back {check.get_command} OK".lstrip("; ")
+            return
+        set_result.status = ValidationResult.FAIL
+        if "error" in verification:
+            set_result.message = f"❌ Could not read back {check.get_command} after {check.set_command}"
+            set_result.error = f"Read-back failed: {verification['error']}"
+        else:
+            set_result.message = f"❌ {check.get_command} does not match values written by {check.set_command}"
+            set_result.error = "Read-back mismatch: " + "; ".join(verification["mismatches"])
+    
+    def _mock_readback(self, set_result: CommandTestResult, hex_frame: str) -> Optional[ReadbackCheck]:
+        """
+        Verificación por lectura simulada: el dispositivo mock aplica lo escrito,
+        así que la lectura devuelve los mismos datos que la trama SET.
+        """
+        check = plan_readback(set_result.command, hex_frame)
+        if check is not None:
+            self._apply_readback(set_result, check, check.verify(bytes.fromhex(hex_frame)), 0)
+        return check
+    
+    def _skipped_results(self, command_names: List[str], command_type: CommandType, reason: str) -> List[CommandTestResult]:
+        """Resultados SKIPPED para los comandos no enviados a un dispositivo inalcanzable."""
+        return [
+            CommandTestResult(
                 command=cmd_name,
                 command_type=command_type,
-                status=ValidationResult.PASS if mock_response else ValidationResult.FAIL,
-                message=f"✅ Mock validation successful for {cmd_name}" if mock_response else f"❌ No mock response for {cmd_name}",
-                details=f"Trama enviada: {hex_frame}",
-                response_data=mock_response,
-                decoded_values=mock_decoded,
-                duration_ms=duration
+                status=ValidationResult.SKIPPED,
+                message=f"⏭️ Skipped: device unreachable ({reason})",
+                details=reason
             )
-            
-            results.append(result)
+            for cmd_name in command_names
+        ]
+    
+    def _not_executed_results(self, command_names: List[str], command_type: CommandType, reason: str) -> List[CommandTestResult]:
+        """Resultados SKIPPED para los comandos no enviados por corte anticipado."""
+        return [
+            CommandTestResult(
+                command=cmd_name,
+                command_type=command_type,
+                status=ValidationResult.SKIPPED,
+                message="⏭️ Not executed: batch verdict already decided",
+                details=f"{EARLY_STOP_REASON}: {reason}"
+            )
+            for cmd_name in command_names
+        ]
+    
+    def _early_stop_reason(self, results: List[CommandTestResult], total: int) -> Optional[str]:
+        """Motivo para cortar el batch según la política de corte anticipado (None = seguir)."""
+        if self.early_stop is None:
+            return None
+        return self.early_stop.check(
+            ((result.command, result.status == ValidationResult.PASS) for result in results), total
+        )
+    
+    @staticmethod
+    def _early_stop_summary(results: List[CommandTestResult]) -> Optional[Dict[str, Any]]:
+        """Resumen del corte anticipado del batch (None si se ejecutó completo)."""
+        not_executed = [r for r in results if r.status == ValidationResult.SKIPPED and r.details.startswith(EARLY_STOP_REASON)]
+        if not not_executed:
+            return None
+        first = results.index(not_executed[0])
+        return {
+            "reason": not_executed[0].details[len(EARLY_STOP_REASON) + 2:],
+            "after_command": results[first - 1].command if first > 0 else None,
+            "not_executed": [r.command for r in not_executed]
+        }
+    
+    def _find_root_cause(self, results: List[CommandTestResult]) -> Optional[Dict[str, Any]]:
+        """
+        Causa raíz del batch si se omitieron comandos por dispositivo inalcanzable.
         
-        return results
+        El motivo viene de los resultados SKIPPED; el error, del último
+        comando enviado antes del primer SKIPPED.
+        """
+        skipped = [
+            r for r in results
+            if r.status == ValidationResult.SKIPPED and not r.details.startswith(EARLY_STOP_REASON)
+        ]
+        if not skipped:
+            return None
+        first_skipped = results.index(skipped[0])
+        trigger = results[first_skipped - 1] if first_skipped > 0 else None
+        error = trigger.error if trigger else ""
+        return {
+            "reason": skipped[0].details,
+            "error": error,
+            "command": trigger.command if trigger else None,
+            "skipped_commands": len(skipped)
+        }
+    
+    def _record_breaker(self, breaker, result: CommandTestResult):
+        """Informa al circuit breaker del dispositivo el resultado final de un comando."""
+        if result.status == ValidationResult.PASS:
+            breaker.record_success()
+        elif result.status in (ValidationResult.TIMEOUT, ValidationResult.ERROR) and result.error not in LOCAL_FRAME_ERRORS:
+            breaker.record_failure()
+    
+    def _response_timeout(self, ip_address: str, command: Optional[str] = None) -> float:
+        """Timeout de respuesta para un comando (adaptativo si hay estimador RTO)."""
+        if self.rto:
+            return self.rto.timeout_for(ip_address, command)
+        return self.socket_timeout
     
-    def _execute_live_batch(self, ip_address: str, commands: Dict[str, str], command_type: CommandType, port: int = 65050) -> List[CommandTestResult]:
+    def _record_pacing(self, pacing_key: str, result: CommandTestResult):
+        """Informa al controlador de pausa el resultado de transporte de un comando."""
+        if result.status == ValidationResult.PASS:
+            if is_well_formed_frame(bytes.fromhex(result.response_data)):
+                self.pacing.record_success(pacing_key)
+            else:
+                self.pacing.record_failure(pacing_key, FAILURE_MALFORMED)
+        elif result.status == ValidationResult.TIMEOUT:
+            self.pacing.record_failure(pacing_key, FAILURE_TIMEOUT)
+        elif result.status == ValidationResult.ERROR and result.error not in LOCAL_FRAME_ERRORS:
+            self.pacing.record_failure(pacing_key, FAILURE_RESET)
+    
+    def _plan_live_steps(self, commands: Dict[str, str]) -> List[List[str]]:
         """
-        Ejecuta validación batch en modo live (conexión real).
+        Agrupa los comandos en pasos de ejecución.
         
-        Conecta al dispositivo DRS y ejecuta comandos reales usando
-        tramas hexadecimales del protocolo Santone.
+        Los comandos GET consecutivos se agrupan en ventanas de hasta
+        pipeline_window comandos; los comandos SET siempre van solos.
         """
-        # Log inicial
-        self._log_sync(f"🔌 Iniciando validación batch de {len(commands)} comandos {command_type.value} en {ip_address}")
+        steps: List[List[str]] = []
+        window: List[str] = []
+        for cmd_name in commands:
+            if self.pipeline_window > 1 and not self._is_set_command(cmd_name):
+                window.append(cmd_name)
+                if len(window) == self.pipeline_window:
+                    steps.append(window)
+                    window = []
+                continue
+            if window:
+                steps.append(window)
+                window = []
+            steps.append([cmd_name])
+        if window:
+            steps.append(window)
+        return steps
+    
+    async def _execute_pipelined_window(
+        self,
+        command_names: List[str],
+        command_type: CommandType,
+        session: AsyncDeviceSession
+    ) -> List[CommandTestResult]:
+        """
+        Ejecuta una ventana de comandos GET sobre la sesión sin esperar cada respuesta.
         
-        results = []
+        Las respuestas se emparejan con las peticiones por número de comando.
+        """
+        results: Dict[str, CommandTestResult] = {}
+        frames: List[bytes] = []
+        sent: List[str] = []
+        for cmd_name in command_names:
+            frame = self._resolve_live_frame(cmd_name, command_type)
+            error_result = self._check_live_frame(cmd_name, command_type, frame)
+            if error_result:
+                results[cmd_name] = error_result
+                continue
+            frames.append(frame)
+            sent.append(cmd_name)
         
-        for i, (command, hex_frame) in enumerate(commands.items(), 1):
-            self._log_sync(f"📤 Ejecutando comando {i}/{len(commands)}: {command}")
-            result = self._execute_single_live_command(ip_address, command, command_type, port)
-            results.append(result)
-            
-            # Log del resultado
-            if result.status == ValidationResult.PASS:
-                self._log_sync(f"✅ Comando {command}: EXITOSO ({result.duration_ms}ms)")
-            elif result.status == ValidationResult.TIMEOUT:
-                self._log_sync(f"⏱️ Comando {command}: TIMEOUT ({result.duration_ms}ms)")
-            else:
-                self._log_sync(f"❌ Comando {command}: ERROR - {result.error}")
+        if frames:
+            window_timeout = sum(self._response_timeout(session.ip_address, cmd_name) for cmd_name in sent)
+            if self.rto:
+                window_timeout = min(window_timeout, self.rto.max_seconds)
+            try:
+                responses = await session.exchange_pipelined(frames, timeout=window_timeout)
+            except asyncio.TimeoutError:
+                responses = [(None, window_timeout)] * len(frames)
+            except Exception as e:
+                for cmd_name in sent:
+                    results[cmd_name] = CommandTestResult(
+                        command=cmd_name,
+                        command_type=command_type,
+                        status=ValidationResult.ERROR,
+                        message=f"❌ Error executing command: {cmd_name}",
+                        error=str(e)
+                    )
+                responses = []
+            for cmd_name, (response, elapsed) in zip(sent, responses):
+                if self.rto:
+                    # elapsed se mide desde el envío de la ventana (sin la conexión)
+                    if response is not None:
+                        self.rto.record_sample(session.ip_address, cmd_name, elapsed)
+                    else:
+                        self.rto.record_timeout(session.ip_address, cmd_name)
+                results[cmd_name] = self._build_live_result(cmd_name, command_type, response, int(elapsed * 1000))
             
-            # Pequeña pausa entre comandos para evitar saturar el dispositivo
-            time.sleep(0.1)
+            # Los fallos transitorios de la ventana se reintentan de a uno
+            if self.retry_policy.max_retries and not session.unreachable_reason:
+                for cmd_name in sent:
+                    if results[cmd_name].status in (ValidationResult.TIMEOUT, ValidationResult.ERROR):
+                        delay = self.retry_policy.delay_for(1)
+                        await self._log(f"🔁 Reintento 1/{self.retry_policy.max_retries} de {cmd_name} fuera de la ventana en {int(delay * 1000)}ms")
+                        await asyncio.sleep(delay)
+                        retried = await self._execute_single_live_command(
+                            session.ip_address, cmd_name, command_type, session.port, session,
+                            retries=self.retry_policy.max_retries - 1
+                        )
+                        retried.attempts += 1
+                        retried.duration_ms += results[cmd_name].duration_ms
+                        results[cmd_name] = retried
         
-        # Log final
-        successful = sum(1 for r in results if r.status == ValidationResult.PASS)
-        self._log_sync(f"📊 Validación completada: {successful}/{len(commands)} comandos exitosos")
+        return [results[cmd_name] for cmd_name in command_names]
+    
+    async def _log_live_result(self, result: CommandTestResult):
+        """Envía los logs de respuesta, valores decodificados y estado de un comando live."""
+        # Log de la respuesta recibida
+        if result.response_data:
+            await self._log(f"    📥 Respuesta: {result.response_data}")
         
-        return results
+        # Log de valores decodificados
+        if result.decoded_values:
+            for key, value in result.decoded_values.items():
+                if key not in ['status', 'mock_source', 'raw_bytes', 'decoder_mapping']:
+                    await self._log(f"       🔍 {key}: {value}")
+        
+        # Log del resultado
+        if result.status == ValidationResult.PASS:
+            await self._log(f"    ✅ EXITOSO ({result.duration_ms}ms)")
+        elif result.status == ValidationResult.TIMEOUT:
+            await self._log(f"    ⏱️ TIMEOUT ({result.duration_ms}ms)")
+        else:
+            await self._log(f"    ❌ ERROR: {result.error}")
     
-    def _execute_single_live_command(self, ip_address: str, command: str, command_type: CommandType, port: int = 65050) -> CommandTestResult:
+    async def _execute_single_live_command(
+        self,
+        ip_address: str,
+        command: str,
+        command_type: CommandType,
+        port: int = 65050,
+        session: Optional[AsyncDeviceSession] = None,
+        retries: Optional[int] = None
+    ) -> CommandTestResult:
         """
         Ejecuta un comando individual en modo live.
+        
+        Si se entrega una sesión, el comando se envía sobre su conexión
+        persistente; si no, se usa una conexión dedicada. Los errores
+        transitorios (timeout, CRC inválido) se reintentan según retry_policy,
+        salvo que el dispositivo resulte inalcanzable.
+        
+        Las lecturas GET idénticas (mismo dispositivo y comando) que coinciden
+        en el tiempo comparten un único intercambio; los SET nunca se coalescen.
+        Tampoco las lecturas de una sesión que reservó el dispositivo: nadie más
+        puede tener un intercambio en curso con él, y unirse a uno que espera
+        turno detrás de la sesión la bloquearía.
+        
+        Args:
+            retries: Reintentos permitidos (None = retry_policy.max_retries)
         """
+        if (self.single_flight is None or command_type == CommandType.SET or self._is_set_command(command)
+                or (session is not None and session.holds_device)):
+            return await self._execute_live_command(ip_address, command, command_type, port, session, retries)
+        
         start_time = time.time()
+        result, shared = await self.single_flight.run(
+            (ip_address, port, command_type.value, command),
+            lambda: self._execute_live_command(ip_address, command, command_type, port, session, retries)
+        )
+        if shared:
+            await self._log(f"🔗 {command}: respuesta compartida con una lectura idéntica en curso", "DEBUG")
+            result = replace(
+                result,
+                decoded_values=dict(result.decoded_values or {}),
+                details=f"{result.details} (coalesced)".strip(),
+                duration_ms=int((time.time() - start_time) * 1000)
+            )
+        return result
+    
+    async def _execute_live_command(
+        self,
+        ip_address: str,
+        command: str,
+        command_type: CommandType,
+        port: int = 65050,
+        session: Optional[AsyncDeviceSession] = None,
+        retries: Optional[int] = None
+    ) -> CommandTestResult:
+        """Ejecuta un comando live con reintentos (sin coalescencia)."""
+        start_time = time.time()
+        retries = self.retry_policy.max_retries if retries is None else retries
         
         try:
             # Obtener trama hexadecimal para el comando
-            frame = ""
-            if command_type == CommandType.MASTER:
-                frame = get_master_frame(command)
-                # Si no se encontró, buscar en comandos SET master
-                if not frame and (command.startswith('set_') or 'set_' in command):
-                    frame = get_master_set_command_frame(command)
-            elif command_type == CommandType.REMOTE:
-                frame = get_remote_frame(command)
-                # Si no se encontró, buscar en comandos SET remote
-                if not frame and (command.startswith('remote_set_') or 'set_' in command):
-                    frame = get_remote_set_command_frame(command)
-            elif command_type == CommandType.SET:
-                frame = get_set_frame(command)
-            
-            if not frame:
-                return CommandTestResult(
-                    command=command,
-                    command_type=command_type,
-                    status=ValidationResult.ERROR,
-                    message=f"❌ No hex frame found for command: {command}",
-                    duration_ms=0,
-                    error="Frame not found"
-                )
+            frame = self._resolve_live_frame(command, command_type)
+            error_result = self._check_live_frame(command, command_type, frame)
+            if error_result:
+                return error_result
             
-            # Validar formato de trama
-            if not validate_frame_format(frame):
-                return CommandTestResult(
-                    command=command,
-                    command_type=command_type,
-                    status=ValidationResult.ERROR,
-                    message=f"❌ Invalid frame format for command: {command}",
-                    duration_ms=0,
-                    error="Invalid frame format"
-                )
-            
-            # Ejecutar comando via TCP
-            response = self._send_command_via_tcp(ip_address, frame, port)
+            attempt = 0
+            while True:
+                # Ejecutar comando via TCP
+                response = await self._send_command_via_tcp(ip_address, frame, port, session, command)
+                failure = self._transient_failure(response)
+                if failure is None or attempt >= retries or (session and session.unreachable_reason):
+                    break
+                attempt += 1
+                delay = self.retry_policy.delay_for(attempt)
+                await self._log(f"🔁 Reintento {attempt}/{retries} de {command} ({failure}) en {int(delay * 1000)}ms")
+                await asyncio.sleep(delay)
             duration = int((time.time() - start_time) * 1000)
             
-            if response is None:
-                return CommandTestResult(
-                    command=command,
-                    command_type=command_type,
-                    status=ValidationResult.TIMEOUT,
-                    message=f"⏱️ Timeout sending command: {command}",
-                    duration_ms=duration,
-                    error="TCP timeout"
-                )
-            
-            # Decodificar respuesta
-            decoded_values = self._decode_response(command, response)
-            
-            return CommandTestResult(
-                command=command,
-                command_type=command_type,
-                status=ValidationResult.PASS,
-                message=f"✅ Command {command} executed successfully",
-                details=f"Received {len(response)} bytes response",
-                response_data=response.hex() if isinstance(response, (bytes, bytearray)) else str(response),
-                decoded_values=decoded_values,
-                duration_ms=duration
-            )
+            result = self._build_live_result(command, command_type, response, duration)
+            result.attempts = attempt + 1
+            return result
             
         except Exception as e:
             duration = int((time.time() - start_time) * 1000)
@@ -645,50 +1331,136 @@ class BatchCommandsValidator:
                 error=str(e)
             )
     
-    def _send_command_via_tcp(self, ip_address: str, hex_frame: str, port: int = 65050) -> Optional[bytes]:
+    def _resolve_live_frame(self, command: str, command_type: CommandType) -> Optional[bytes]:
+        """Obtiene los bytes de la trama de un comando según el tipo de dispositivo (GET o SET)."""
+        return get_frame_registry().get(command_type.value, command)
+    
+    def _check_live_frame(self, command: str, command_type: CommandType, frame: Optional[bytes]) -> Optional[CommandTestResult]:
+        """Retorna un resultado de error si la trama no existe o es inválida, None si es usable."""
+        if not frame:
+            return CommandTestResult(
+                command=command,
+                command_type=command_type,
+                status=ValidationResult.ERROR,
+                message=f"❌ No hex frame found for command: {command}",
+                duration_ms=0,
+                error="Frame not found"
+            )
+        
+        # Validar formato de trama (precalculado en el registro)
+        if not get_frame_registry().is_valid(command_type.value, command):
+            return CommandTestResult(
+                command=command,
+                command_type=command_type,
+                status=ValidationResult.ERROR,
+                message=f"❌ Invalid frame format for command: {command}",
+                duration_ms=0,
+                error="Invalid frame format"
+            )
+        return None
+    
+    @staticmethod
+    def _transient_failure(response: Optional[bytes]) -> Optional[str]:
+        """Motivo de fallo reintentable de una respuesta (None si es válida)."""
+        if response is None:
+            return "timeout"
+        if not has_valid_crc(response):
+            return "crc_mismatch"
+        return None
+    
+    def _build_live_result(self, command: str, command_type: CommandType, response: Optional[bytes], duration: int) -> CommandTestResult:
+        """Construye el resultado de un comando live a partir de su respuesta (None = timeout)."""
+        if response is None:
+            return CommandTestResult(
+                command=command,
+                command_type=command_type,
+                status=ValidationResult.TIMEOUT,
+                message=f"⏱️ Timeout sending command: {command}",
+                duration_ms=duration,
+                error="TCP timeout"
+            )
+        
+        if not has_valid_crc(response):
+            return CommandTestResult(
+                command=command,
+                command_type=command_type,
+                status=ValidationResult.ERROR,
+                message=f"❌ CRC mismatch in response to: {command}",
+                response_data=response.hex(),
+                duration_ms=duration,
+                error="CRC mismatch"
+            )
+        
+        # Decodificar respuesta
+        decoded_values = self._decode_response(command, response)
+        
+        return CommandTestResult(
+            command=command,
+            command_type=command_type,
+            status=ValidationResult.PASS,
+            message=f"✅ Command {command} executed successfully",
+            details=f"Received {len(response)} bytes response",
+            response_data=response.hex() if isinstance(response, (bytes, bytearray)) else str(response),
+            decoded_values=decoded_values,
+            duration_ms=duration
+        )
+    
+    @staticmethod
+    def _is_set_command(command: str) -> bool:
+        """Indica si un comando es de configuración (SET)."""
+        return command.startswith('set_') or command.startswith('remote_set_')
+    
+    async def _send_command_via_tcp(
+        self,
+        ip_address: str,
+        frame: bytes,
+        port: int = 65050,
+        session: Optional[AsyncDeviceSession] = None,
+        command: Optional[str] = None
+    ) -> Optional[bytes]:
         """
         Envía un comando hexadecimal via TCP al dispositivo DRS.
         
+        El timeout de respuesta se calcula con el RTT medido del comando y
+        cada respuesta actualiza esa estadística.
+        
         Args:
             ip_address: IP del dispositivo
-            hex_frame: Trama hexadecimal a enviar
+            frame: Trama a enviar
             port: Puerto TCP a usar (default: 65050)
+            session: Sesión persistente a reutilizar (None = conexión dedicada)
+            command: Nombre del comando (clave de las estadísticas de RTT)
             
         Returns:
             Respuesta del dispositivo o None si hay timeout/error
         """
+        owns_session = session is None
+        if owns_session:
+            session = AsyncDeviceSession(ip_address, port, timeout=self._response_timeout(ip_address), log=self._log)
+        
         try:
-            # Convertir trama hex a bytes
-            frame_bytes = bytes.fromhex(hex_frame)
-            self._log_sync(f"🔌 Conectando a {ip_address}:{port}")
-            self._log_sync(f"📤 Enviando trama: {hex_frame}")
-            
-            # Crear socket TCP
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self.socket_timeout)
-            
-            # Conectar al puerto especificado
-            sock.connect((ip_address, port))
-            self._log_sync(f"✅ Conexión TCP establecida exitosamente")
+            if self.log_callback:
+                await self._log(f"📤 Enviando trama: {frame.hex().upper()}", "DEBUG")
             
-            # Enviar comando
-            sock.send(frame_bytes)
-            self._log_sync(f"📨 Comando enviado, esperando respuesta...")
-            
-            # Recibir respuesta
-            response = sock.recv(1024)  # Buffer de 1KB
-            response_hex = response.hex().upper()
-            self._log_sync(f"📥 Respuesta recibida ({len(response)} bytes): {response_hex}")
-            
-            sock.close()
+            response = await session.exchange(frame, timeout=self._response_timeout(ip_address, command))
+            if response is not None:
+                response_hex = response.hex().upper()
+                await self._log(f"📥 Respuesta recibida ({len(response)} bytes): {response_hex}", "DEBUG")
+                if self.rto and session.last_rtt is not None:
+                    self.rto.record_sample(ip_address, command, session.last_rtt)
+            elif self.rto:
+                self.rto.record_timeout(ip_address, command)
             return response
             
-        except socket.timeout:
-            self._log_sync(f"⏱️ Timeout de socket después de {self.socket_timeout}s")
+        except asyncio.TimeoutError:
+            await self._log(f"⏱️ Timeout de conexión después de {session.timeout:.2f}s")
             return None
         except Exception as e:
-            self._log_sync(f"❌ Error durante envío TCP: {type(e).__name__}: {e}")
+            await self._log(f"❌ Error durante envío TCP: {type(e).__name__}: {e}", "ERROR")
             return None
+        finally:
+            if owns_session:
+                await session.close()
     
     def _decode_response(self, command: str, response: bytes) -> Dict[str, Any]:
         """
@@ -870,6 +1642,8 @@ class BatchCommandsValidator:
         failed = len([r for r in results if r.status == ValidationResult.FAIL])
         timeouts = len([r for r in results if r.status == ValidationResult.TIMEOUT])
         errors = len([r for r in results if r.status == ValidationResult.ERROR])
+        skipped = len([r for r in results if r.status == ValidationResult.SKIPPED])
+        cancelled = len([r for r in results if r.status == ValidationResult.CANCELLED])
         
         avg_duration = sum(r.duration_ms for r in results) / total if total > 0 else 0
         
@@ -879,6 +1653,8 @@ class BatchCommandsValidator:
             "failed": failed,
             "timeouts": timeouts,
             "errors": errors,
+            "skipped": skipped,
+            "cancelled": cancelled,
             "success_rate": round(passed / total * 100, 1) if total > 0 else 0,
             "average_duration_ms": round(avg_duration, 1)
         }
@@ -888,12 +1664,43 @@ class BatchCommandsValidator:
         if not results:
             return "ERROR"
         
+        if any(r.status == ValidationResult.CANCELLED for r in results):
+            return "CANCELLED"
+        
         total = len(results)
         passed = len([r for r in results if r.status == ValidationResult.PASS])
         success_rate = passed / total
         
         # Criterio: 80% de comandos deben pasar para considerar éxito
-        return "PASS" if success_rate >= 0.8 else "FAIL"
+        return "PASS" if success_rate >= PASS_THRESHOLD else "FAIL"
+
+def _run_coroutine_sync(coro):
+    """
+    Ejecuta una corrutina hasta completarse desde código síncrono.
+    
+    Si el hilo actual ya tiene un event loop corriendo (llamada desde un
+    endpoint async), la corrutina se ejecuta en un hilo auxiliar con su
+    propio event loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    
+    outcome = {}
+    
+    def runner():
+        try:
+            outcome["result"] = asyncio.run(coro)
+        except BaseException as e:
+            outcome["error"] = e
+    
+    thread = threading.Thread(target=runner, name="batch-validator-loop")
+    thread.start()
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
 
 # Función de conveniencia para uso directo
 def validate_drs_commands(
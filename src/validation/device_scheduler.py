@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Device Scheduler - Un único usuario a la vez por dispositivo DRS
+
+El firmware DRS maneja mal las sesiones concurrentes: si dos validaciones
+hablan a la vez con la misma IP, las tramas se mezclan y ambas terminan en
+timeout. Este scheduler, compartido por todo el proceso, serializa por
+(ip, puerto) las sesiones de batch (AsyncDeviceSession reserva el turno de
+principio a fin) y los intercambios sueltos, mientras dispositivos
+distintos avanzan en paralelo.
+
+Funciona entre event loops: el validador síncrono ejecuta su loop en un
+hilo auxiliar, por lo que la cola de espera no puede depender de un
+asyncio.Lock ligado a un único loop.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional, Tuple
+
+DeviceKey = Tuple[str, int]
+
+
+class _DeviceQueue:
+    """Cola FIFO de espera de un dispositivo (protegida por el lock del scheduler)"""
+
+    def __init__(self):
+        self.busy = False
+        self.waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self.exchanges = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_depth = 0
+
+
+class DeviceScheduler:
+    """
+    Scheduler de turnos por dispositivo.
+
+    Uso:
+        async with scheduler.slot(ip_address, port):
+            ...  # una única sesión o intercambio con el dispositivo
+    """
+
+    def __init__(self):
+        self._queues: Dict[DeviceKey, _DeviceQueue] = {}
+        self._lock = threading.Lock()
+
+    def _queue(self, key: DeviceKey) -> _DeviceQueue:
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = _DeviceQueue()
+        return queue
+
+    async def acquire(self, ip_address: str, port: int) -> float:
+        """
+        Espera el turno del dispositivo.
+
+        Returns:
+            Segundos esperados en la cola
+        """
+        key = (ip_address, port)
+        start = time.monotonic()
+        with self._lock:
+            queue = self._queue(key)
+            if not queue.busy:
+                queue.busy = True
+                self._record_wait(queue, 0.0)
+                return 0.0
+            loop = asyncio.get_running_loop()
+            waiter = loop.create_future()
+            queue.waiters.append((loop, waiter))
+            queue.max_depth = max(queue.max_depth, len(queue.waiters))
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if (loop, waiter) in queue.waiters:
+                    queue.waiters.remove((loop, waiter))
+                    raise
+            # El turno ya había sido cedido a este waiter: devolverlo
+            self.release(ip_address, port)
+            raise
+
+        waited = time.monotonic() - start
+        with self._lock:
+            self._record_wait(queue, waited)
+        return waited
+
+    def release(self, ip_address: str, port: int):
+        """Cede el turno al siguiente en la cola (o libera el dispositivo)."""
+        with self._lock:
+            queue = self._queue((ip_address, port))
+            while queue.waiters:
+                loop, waiter = queue.waiters.popleft()
+                if loop.is_closed():
+                    continue
+                # El dispositivo sigue ocupado: el turno pasa directo al siguiente
+                loop.call_soon_threadsafe(self._wake, waiter)
+                return
+            queue.busy = False
+
+    @staticmethod
+    def _wake(waiter: asyncio.Future):
+        if not waiter.done():
+            waiter.set_result(None)
+
+    @staticmethod
+    def _record_wait(queue: _DeviceQueue, waited: float):
+        queue.exchanges += 1
+        queue.total_wait += waited
+        queue.max_wait = max(queue.max_wait, waited)
+
+    @asynccontextmanager
+    async def slot(self, ip_address: str, port: int):
+        """Context manager async que mantiene el turno del dispositivo."""
+        await self.acquire(ip_address, port)
+        try:
+            yield
+        finally:
+            self.release(ip_address, port)
+
+    def queue_depth(self, ip_address: str, port: int) -> int:
+        """Intercambios esperando turno para el dispositivo."""
+        with self._lock:
+            queue = self._queues.get((ip_address, port))
+            return len(queue.waiters) if queue else 0
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Estadísticas de contención por dispositivo."""
+        with self._lock:
+            return {
+                f"{ip}:{port}": {
+                    "busy": queue.busy,
+                    "queue_depth": len(queue.waiters),
+                    "max_queue_depth": queue.max_depth,
+                    "exchanges": queue.exchanges,
+                    "average_wait_ms": round(queue.total_wait / queue.exchanges * 1000, 1) if queue.exchanges else 0,
+                    "max_wait_ms": round(queue.max_wait * 1000, 1)
+                }
+                for (ip, port), queue in self._queues.items()
+            }
+
+
+_default_scheduler: Optional[DeviceScheduler] = None
+_default_lock = threading.Lock()
+
+
+def get_device_scheduler() -> DeviceScheduler:
+    """Scheduler compartido por todo el proceso."""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = DeviceScheduler()
+        return _default_scheduler
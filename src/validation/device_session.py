@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""
+Device Session - Conexión TCP persistente con un dispositivo DRS
+
+Permite enviar todos los comandos de un batch sobre una única conexión TCP
+en lugar de abrir y cerrar un socket por comando. Si el enlace se cae
+durante la ejecución, la sesión se reconecta de forma transparente y
+reintenta el envío una vez.
+
+El transporte es asyncio nativo (StreamReader/StreamWriter): cada sesión
+en curso es una corrutina, no un hilo, por lo que un único event loop
+puede atender cientos de dispositivos de forma concurrente.
+
+Usada como `async with`, la sesión reserva el dispositivo en el
+DeviceScheduler desde la entrada hasta la salida del bloque: dos batches
+del mismo DRS no intercalan comandos, el segundo espera a que termine el
+primero. Sin `async with`, cada intercambio reserva el turno por separado.
+"""
+
+import asyncio
+import errno
+import socket
+import time
+from collections import defaultdict, deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from .device_scheduler import DeviceScheduler, get_device_scheduler
+from .frame_reader import SantoneFrameReader, get_frame_command_number
+
+# Tamaño de lectura del stream (las tramas se delimitan con SantoneFrameReader)
+READ_CHUNK_SIZE = 4096
+
+# Clasificación de fallos de conexión
+CONNECTION_REFUSED = "connection_refused"
+HOST_UNREACHABLE = "host_unreachable"
+CONNECT_TIMEOUT = "connect_timeout"
+CONNECT_ERROR = "connect_error"
+
+_UNREACHABLE_ERRNOS = {errno.EHOSTUNREACH, errno.ENETUNREACH, getattr(errno, "EHOSTDOWN", errno.EHOSTUNREACH)}
+
+
+def classify_connection_error(error: BaseException) -> str:
+    """
+    Clasifica un fallo al abrir la conexión con el dispositivo.
+
+    Returns:
+        CONNECTION_REFUSED, HOST_UNREACHABLE, CONNECT_TIMEOUT o CONNECT_ERROR
+    """
+    if isinstance(error, asyncio.TimeoutError):
+        return CONNECT_TIMEOUT
+    if isinstance(error, ConnectionRefusedError):
+        return CONNECTION_REFUSED
+    if isinstance(error, socket.gaierror) or getattr(error, "errno", None) in _UNREACHABLE_ERRNOS:
+        return HOST_UNREACHABLE
+    return CONNECT_ERROR
+
+
+async def _no_log(message: str, level: str = "INFO"):
+    pass
+
+
+class AsyncDeviceSession:
+    """
+    Sesión TCP reutilizable con un dispositivo DRS (protocolo Santone).
+
+    La conexión se abre de forma perezosa en el primer intercambio y se
+    mantiene abierta hasta llamar a close() (o al salir del bloque async with).
+    """
+
+    def __init__(
+        self,
+        ip_address: str,
+        port: int = 65050,
+        timeout: float = 3,
+        max_reconnects: int = 1,
+        log: Optional[Callable[[str], Awaitable[None]]] = None,
+        max_connect_failures: int = 2,
+        scheduler: Optional[DeviceScheduler] = None
+    ):
+        """
+        Inicializar la sesión.
+
+        Args:
+            ip_address: IP del dispositivo DRS
+            port: Puerto TCP del dispositivo (default: 65050)
+            timeout: Timeout en segundos para conexión y lectura
+            max_reconnects: Reconexiones permitidas por intercambio si el enlace se cae
+            log: Función async opcional para logging
+            max_connect_failures: Fallos de conexión consecutivos (timeouts u otros
+                errores transitorios) tras los que el dispositivo se considera inalcanzable
+            scheduler: Serializa las sesiones e intercambios por dispositivo (None = el del proceso)
+        """
+        self.ip_address = ip_address
+        self.port = port
+        self.timeout = timeout
+        self.max_reconnects = max_reconnects
+        self._log = log or _no_log
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._frames = SantoneFrameReader()
+        self.connect_count = 0
+        self.last_rtt: Optional[float] = None
+        self.max_connect_failures = max_connect_failures
+        self.connect_failures = 0
+        self.last_connect_error: Optional[str] = None
+        self.last_connect_detail = ""
+        self.scheduler = scheduler or get_device_scheduler()
+        self.queue_wait = 0.0
+        self.holds_device = False
+
+    @property
+    def is_connected(self) -> bool:
+        """Indica si hay una conexión abierta con el dispositivo."""
+        return self._writer is not None
+
+    @property
+    def unreachable_reason(self) -> Optional[str]:
+        """
+        Motivo por el que el dispositivo se considera inalcanzable (None si no lo es).
+
+        Conexión rechazada y host inalcanzable son definitivos al primer
+        intento; los timeouts de conexión cuentan tras max_connect_failures.
+        """
+        if self.last_connect_error in (CONNECTION_REFUSED, HOST_UNREACHABLE):
+            return self.last_connect_error
+        if self.last_connect_error and self.connect_failures >= self.max_connect_failures:
+            return self.last_connect_error
+        return None
+
+    async def connect(self):
+        """
+        Abre la conexión TCP si no está abierta.
+
+        Raises:
+            asyncio.TimeoutError: Si la conexión no se establece dentro del timeout
+            OSError: Si el dispositivo rechaza o no es alcanzable
+        """
+        if self._writer is not None:
+            return
+        await self._log(f"🔌 Conectando a {self.ip_address}:{self.port}")
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.ip_address, self.port),
+                timeout=self.timeout
+            )
+        except (asyncio.TimeoutError, OSError) as e:
+            self.connect_failures += 1
+            self.last_connect_error = classify_connection_error(e)
+            self.last_connect_detail = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            raise
+        self.connect_count += 1
+        self.connect_failures = 0
+        self.last_connect_error = None
+        await self._log("✅ Conexión TCP establecida exitosamente")
+
+    async def close(self):
+        """Cierra la conexión TCP (idempotente)."""
+        writer = self._writer
+        self._reader = self._writer = None
+        self._frames.clear()
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def send_frame(self, frame_bytes: bytes):
+        """Escribe una trama en la conexión (abriéndola si es necesario)."""
+        await self.connect()
+        self._writer.write(frame_bytes)
+        await self._writer.drain()
+
+    async def read_frame(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Lee exactamente una trama Santone completa.
+
+        Retorna en cuanto llega el 0x7E de cierre; los bytes sobrantes quedan
+        en el buffer para la siguiente lectura.
+
+        Args:
+            timeout: Tiempo máximo total de espera (None = timeout de la sesión)
+
+        Returns:
+            Trama completa o None si vence el timeout
+
+        Raises:
+            ConnectionResetError: Si el dispositivo cierra la conexión
+        """
+        frame = self._frames.next_frame()
+        if frame is not None:
+            return frame
+
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                data = await asyncio.wait_for(self._reader.read(READ_CHUNK_SIZE), timeout=remaining)
+            except asyncio.TimeoutError:
+                return None
+            if not data:
+                raise ConnectionResetError("Connection closed by device")
+            self._frames.feed(data)
+            frame = self._frames.next_frame()
+            if frame is not None:
+                return frame
+
+    async def _wait_turn(self):
+        """Espera el turno del dispositivo en el scheduler del proceso."""
+        depth = self.scheduler.queue_depth(self.ip_address, self.port)
+        if depth:
+            await self._log(f"⏳ Dispositivo ocupado, esperando turno ({depth} en cola)")
+        waited = await self.scheduler.acquire(self.ip_address, self.port)
+        self.queue_wait += waited
+        if waited >= 0.01:
+            await self._log(f"⏳ Turno obtenido tras {int(waited * 1000)}ms en cola")
+
+    async def reserve_device(self):
+        """Reserva el dispositivo en el scheduler hasta release_device() (idempotente)."""
+        if not self.holds_device:
+            await self._wait_turn()
+            self.holds_device = True
+
+    def release_device(self):
+        """Cede el dispositivo reservado con reserve_device() (idempotente)."""
+        if self.holds_device:
+            self.holds_device = False
+            self.scheduler.release(self.ip_address, self.port)
+
+    async def exchange(self, frame_bytes: bytes, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Envía una trama y espera la respuesta, con el dispositivo reservado en el scheduler.
+
+        Ver _exchange.
+        """
+        if self.holds_device:
+            return await self._exchange(frame_bytes, timeout)
+        await self._wait_turn()
+        try:
+            return await self._exchange(frame_bytes, timeout)
+        finally:
+            self.scheduler.release(self.ip_address, self.port)
+
+    async def _exchange(self, frame_bytes: bytes, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Envía una trama y espera la respuesta sobre la conexión persistente.
+
+        El tiempo entre el envío y la respuesta queda en last_rtt (None si
+        no hubo respuesta); no incluye el establecimiento de la conexión.
+
+        Args:
+            frame_bytes: Trama Santone completa a enviar
+            timeout: Tiempo máximo de espera de la respuesta (None = timeout de la sesión)
+
+        Returns:
+            Trama de respuesta completa o None si hay timeout de lectura
+
+        Raises:
+            asyncio.TimeoutError: Si la conexión no se establece dentro del timeout
+            OSError: Si no es posible (re)conectar con el dispositivo
+        """
+        attempts = 0
+        self.last_rtt = None
+        read_timeout = self.timeout if timeout is None else timeout
+        while True:
+            try:
+                await self.connect()
+                sent_at = time.monotonic()
+                await self.send_frame(frame_bytes)
+                await self._log("📨 Comando enviado, esperando respuesta...")
+                response = await self.read_frame(timeout=read_timeout)
+                if response is None:
+                    # Una respuesta tardía podría mezclarse con el siguiente comando:
+                    # se descarta la conexión y el próximo intercambio reconecta
+                    await self._log(f"⏱️ Timeout de socket después de {read_timeout:.2f}s")
+                    await self.close()
+                else:
+                    self.last_rtt = time.monotonic() - sent_at
+                return response
+            except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError) as e:
+                await self.close()
+                if attempts >= self.max_reconnects:
+                    raise
+                attempts += 1
+                await self._log(f"🔁 Enlace perdido ({type(e).__name__}), reconectando...")
+
+    async def exchange_pipelined(
+        self,
+        frames: List[bytes],
+        timeout: Optional[float] = None
+    ) -> List[Tuple[Optional[bytes], float]]:
+        """
+        Envía una ventana de tramas con el dispositivo reservado en el scheduler.
+
+        Ver _exchange_pipelined.
+        """
+        if self.holds_device:
+            return await self._exchange_pipelined(frames, timeout)
+        await self._wait_turn()
+        try:
+            return await self._exchange_pipelined(frames, timeout)
+        finally:
+            self.scheduler.release(self.ip_address, self.port)
+
+    async def _exchange_pipelined(
+        self,
+        frames: List[bytes],
+        timeout: Optional[float] = None
+    ) -> List[Tuple[Optional[bytes], float]]:
+        """
+        Envía varias tramas seguidas y empareja las respuestas por número de comando.
+
+        Todas las tramas se escriben sin esperar respuesta; luego se leen
+        respuestas hasta completar la ventana, agotar el timeout o perder la
+        conexión. Cada respuesta se asigna a la petición pendiente más antigua
+        con el mismo número de comando (byte CmdNum de la cabecera).
+
+        Args:
+            frames: Tramas Santone de la ventana (sólo comandos de lectura)
+            timeout: Tiempo máximo para completar la ventana (None = timeout de la sesión)
+
+        Returns:
+            Lista alineada con frames de (respuesta o None, segundos hasta su llegada);
+            las peticiones sin respuesta llevan el tiempo esperado por la ventana
+
+        Raises:
+            asyncio.TimeoutError: Si la conexión no se establece dentro del timeout
+            OSError: Si no es posible conectar con el dispositivo
+        """
+        results: List[Tuple[Optional[bytes], float]] = [(None, 0.0)] * len(frames)
+        pending: Dict[int, Deque[int]] = defaultdict(deque)
+        for index, frame in enumerate(frames):
+            pending[get_frame_command_number(frame)].append(index)
+
+        await self.connect()
+        start = time.monotonic()
+        await self.send_frame(b"".join(frames))
+        await self._log(f"📨 {len(frames)} comandos enviados en ventana, esperando respuestas...")
+
+        deadline = start + (self.timeout if timeout is None else timeout)
+        remaining = len(frames)
+        while remaining:
+            try:
+                response = await self.read_frame(timeout=deadline - time.monotonic())
+            except (ConnectionResetError, ConnectionAbortedError, asyncio.IncompleteReadError) as e:
+                # Se conservan las respuestas ya recibidas; sólo fallan las pendientes
+                await self._log(f"🔌 Enlace perdido en la ventana ({type(e).__name__}): {remaining} respuestas sin recibir")
+                await self.close()
+                break
+            if response is None:
+                await self._log(f"⏱️ Timeout de ventana: {remaining} respuestas sin recibir")
+                # Las respuestas tardías corromperían la siguiente ventana
+                await self.close()
+                break
+            waiting = pending.get(get_frame_command_number(response))
+            if not waiting:
+                await self._log(f"⚠️ Respuesta no solicitada descartada: {response.hex().upper()}", "DEBUG")
+                continue
+            results[waiting.popleft()] = (response, time.monotonic() - start)
+            remaining -= 1
+
+        if remaining:
+            waited = time.monotonic() - start
+            results = [(None, waited) if response is None else (response, elapsed)
+                       for response, elapsed in results]
+        return results
+
+    async def __aenter__(self) -> "AsyncDeviceSession":
+        await self.reserve_device()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        try:
+            await self.close()
+        finally:
+            self.release_device()
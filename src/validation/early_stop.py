@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Early Stop - Corte anticipado de un batch con el veredicto ya decidido
+
+El veredicto de un batch es PASS si al menos PASS_THRESHOLD de sus
+comandos pasan. Para chequeos go/no-go no tiene sentido seguir enviando
+comandos cuando el resultado ya no puede cambiar (o tras N fallos de
+comandos críticos): los restantes se marcan como no ejecutados.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+# Fracción de comandos que deben pasar para que el batch sea PASS
+PASS_THRESHOLD = 0.8
+
+# Prefijo de details de los comandos no ejecutados por corte anticipado
+EARLY_STOP_REASON = "early_stop"
+
+
+@dataclass
+class EarlyStopPolicy:
+    """
+    Política de corte anticipado.
+
+    Attributes:
+        stop_when_decided: Corta apenas el veredicto PASS/FAIL no puede cambiar
+        max_critical_failures: Corta tras N fallos de comandos críticos (None = sin límite)
+        critical_commands: Comandos críticos (None = todos)
+    """
+    stop_when_decided: bool = True
+    max_critical_failures: Optional[int] = None
+    critical_commands: Optional[List[str]] = None
+
+    def check(self, outcomes: Iterable[Tuple[str, bool]], total: int) -> Optional[str]:
+        """
+        Decide si el batch debe cortarse.
+
+        Args:
+            outcomes: (comando, pasó) de los comandos ya ejecutados
+            total: Comandos del batch
+
+        Returns:
+            Motivo del corte o None para seguir
+        """
+        outcomes = list(outcomes)
+        remaining = total - len(outcomes)
+        if remaining <= 0:
+            return None
+
+        if self.max_critical_failures:
+            critical_failures = [
+                command for command, passed in outcomes
+                if not passed and (self.critical_commands is None or command in self.critical_commands)
+            ]
+            if len(critical_failures) >= self.max_critical_failures:
+                return f"{len(critical_failures)} critical failures ({', '.join(critical_failures)})"
+
+        if self.stop_when_decided:
+            passed = sum(1 for _, ok in outcomes if ok)
+            required = math.ceil(total * PASS_THRESHOLD - 1e-9)
+            if passed >= required:
+                return f"PASS decided ({passed}/{total} passed, {required} required)"
+            if passed + remaining < required:
+                return f"FAIL decided ({len(outcomes) - passed} failed, at most {passed + remaining}/{total} can pass)"
+        return None
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Fleet Validator - Validación batch de muchos dispositivos DRS en paralelo
+
+Ejecuta BatchCommandsValidator contra una lista de dispositivos en un único
+event loop, con:
+
+- Un límite global de dispositivos validándose a la vez.
+- Un límite opcional por sitio (túnel, estación) para no saturar enlaces
+  compartidos.
+- Comandos serializados dentro de cada dispositivo: dos entradas con la
+  misma IP y puerto nunca se validan a la vez.
+
+El resultado incluye el resultado batch de cada dispositivo y un resumen
+agregado de la flota y de cada sitio.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .batch_commands_validator import BatchCommandsValidator, CommandType
+
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_PER_SITE_CONCURRENCY = 8
+
+# Contadores de statistics que se suman a nivel de flota
+COMMAND_COUNTERS = ("total_commands", "passed", "failed", "timeouts", "errors", "skipped", "cancelled")
+
+
+@dataclass
+class FleetDevice:
+    """Dispositivo a validar dentro de una flota"""
+    ip_address: str
+    port: int = 65050
+    command_type: str = "master"
+    site: Optional[str] = None
+    selected_commands: Optional[List[str]] = None
+
+
+class FleetValidator:
+    """
+    Validador de flotas con concurrencia acotada.
+
+    Uso:
+        fleet = FleetValidator(max_concurrency=32, per_site_concurrency=8)
+        result = await fleet.validate_fleet(devices, mode="live")
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        per_site_concurrency: Optional[int] = DEFAULT_PER_SITE_CONCURRENCY,
+        validator_factory: Optional[Callable[[FleetDevice], BatchCommandsValidator]] = None,
+        log_callback=None
+    ):
+        """
+        Inicializar el validador de flota.
+
+        Args:
+            max_concurrency: Dispositivos validándose a la vez en toda la flota
+            per_site_concurrency: Dispositivos a la vez por sitio (None = sin límite por sitio)
+            validator_factory: Crea el BatchCommandsValidator de cada dispositivo
+            log_callback: Función async opcional para logging en tiempo real
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_site_concurrency = per_site_concurrency
+        self.log_callback = log_callback
+        self.validator_factory = validator_factory or self._default_validator
+
+    @classmethod
+    def from_scenarios(
+        cls,
+        max_concurrency: Optional[int] = None,
+        per_site_concurrency: Optional[int] = None,
+        scenarios=None,
+        **kwargs
+    ) -> "FleetValidator":
+        """
+        Validador con la concurrencia pedida recortada a los máximos de validation_scenarios.yaml.
+
+        Args:
+            max_concurrency: Dispositivos a la vez pedidos (None = máximo del servidor)
+            per_site_concurrency: Dispositivos a la vez por sitio pedidos (None = máximo del servidor)
+        """
+        limits = get_fleet_limits(scenarios)
+        return cls(
+            max_concurrency=min(max_concurrency or limits["max_concurrency"], limits["max_concurrency"]),
+            per_site_concurrency=min(per_site_concurrency or limits["per_site_concurrency"],
+                                     limits["per_site_concurrency"]),
+            **kwargs
+        )
+
+    def _default_validator(self, device: FleetDevice) -> BatchCommandsValidator:
+        async def device_log(message: str):
+            if self.log_callback:
+                await self.log_callback(f"[{device.ip_address}] {message}")
+
+        return BatchCommandsValidator(log_callback=device_log if self.log_callback else None)
+
+    async def _log(self, message: str, level: str = "INFO"):
+        if self.log_callback:
+            try:
+                await self.log_callback(f"[{level}] {message}")
+            except Exception as e:
+                print(f"Warning: Failed to send log message: {e}")
+
+    async def validate_fleet(self, devices: List[FleetDevice], mode: str = "mock") -> Dict[str, Any]:
+        """
+        Valida todos los dispositivos de la flota.
+
+        Args:
+            devices: Dispositivos a validar
+            mode: Modo de validación ("mock" o "live")
+
+        Returns:
+            Diccionario con resultados por dispositivo y resumen de flota y sitios
+        """
+        start_time = time.time()
+        global_slots = asyncio.Semaphore(self.max_concurrency)
+        site_slots: Dict[str, asyncio.Semaphore] = {}
+        device_locks: Dict[Tuple[str, int], asyncio.Lock] = defaultdict(asyncio.Lock)
+
+        await self._log(
+            f"🚀 Validación de flota: {len(devices)} dispositivos "
+            f"(máx. {self.max_concurrency} simultáneos, {self.per_site_concurrency or '∞'} por sitio)"
+        )
+
+        async def run_device(device: FleetDevice) -> Dict[str, Any]:
+            # Orden: dispositivo -> sitio -> global, para que un slot global
+            # nunca quede ocupado por un dispositivo esperando su sitio
+            async with device_locks[(device.ip_address, device.port)]:
+                site_limit = None
+                if device.site and self.per_site_concurrency:
+                    site_limit = site_slots.setdefault(device.site, asyncio.Semaphore(self.per_site_concurrency))
+                    await site_limit.acquire()
+                try:
+                    async with global_slots:
+                        return await self._validate_device(device, mode)
+                finally:
+                    if site_limit:
+                        site_limit.release()
+
+        device_results = await asyncio.gather(*[run_device(device) for device in devices])
+
+        summary = self._summarize(device_results)
+        await self._log(
+            f"📊 Flota completada: {summary['devices_passed']}/{summary['total_devices']} dispositivos OK"
+        )
+
+        return {
+            "overall_status": "PASS" if devices and summary["devices_passed"] == len(devices) else "FAIL",
+            "mode": mode,
+            "total_devices": len(devices),
+            "summary": summary,
+            "sites": {
+                site: self._summarize([r for r in device_results if r["site"] == site])
+                for site in sorted({r["site"] for r in device_results if r["site"]})
+            },
+            "devices": device_results,
+            "duration_ms": int((time.time() - start_time) * 1000),
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    async def _validate_device(self, device: FleetDevice, mode: str) -> Dict[str, Any]:
+        """Valida un dispositivo; los errores inesperados se reportan como ERROR del dispositivo."""
+        try:
+            command_type = CommandType(device.command_type.lower())
+            validator = self.validator_factory(device)
+            result = await validator.validate_batch_commands_async(
+                ip_address=device.ip_address,
+                command_type=command_type,
+                mode=mode,
+                selected_commands=device.selected_commands,
+                port=device.port
+            )
+        except Exception as e:
+            await self._log(f"❌ Error validando {device.ip_address}: {e}", "ERROR")
+            result = {
+                "overall_status": "ERROR",
+                "command_type": device.command_type,
+                "mode": mode,
+                "ip_address": device.ip_address,
+                "statistics": {},
+                "results": [],
+                "error": str(e)
+            }
+        result["port"] = device.port
+        result["site"] = device.site
+        return result
+
+    @staticmethod
+    def _summarize(device_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Agrega estados de dispositivos y estadísticas de comandos."""
+        command_totals = {key: 0 for key in COMMAND_COUNTERS}
+        for result in device_results:
+            statistics = result.get("statistics", {})
+            for key in COMMAND_COUNTERS:
+                command_totals[key] += statistics.get(key, 0)
+
+        total_commands = command_totals["total_commands"]
+        statuses = [r["overall_status"] for r in device_results]
+        return {
+            "total_devices": len(device_results),
+            "devices_passed": statuses.count("PASS"),
+            "devices_failed": statuses.count("FAIL"),
+            "devices_error": statuses.count("ERROR"),
+            "unreachable_devices": [r["ip_address"] for r in device_results if r.get("root_cause")],
+            "commands": command_totals,
+            "success_rate": round(command_totals["passed"] / total_commands * 100, 1) if total_commands else 0
+        }
+
+
+def get_fleet_limits(scenarios=None) -> Dict[str, int]:
+    """Máximos del servidor para flotas (validation_modes.fleet de validation_scenarios.yaml)."""
+    if scenarios is None:
+        from .scenarios import validation_scenarios as scenarios
+    return scenarios.get_fleet_settings()
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Lector incremental de tramas Santone sobre un stream TCP.
+
+TCP no preserva los límites de las tramas: una respuesta puede llegar
+fragmentada en varios segmentos, o varias respuestas pueden llegar juntas
+en un mismo segmento. Este módulo acumula los bytes recibidos y entrega
+exactamente una trama completa en cuanto llega su 0x7E de cierre,
+conservando los bytes sobrantes para la trama siguiente.
+
+Formato de trama: 7E [ModFunc][ModAddr][DataType][CmdNum][Flag][Length][Data][CRC] 7E
+Dentro de la trama los bytes 0x7E y 0x5E se transmiten escapados como
+5E 7D y 5E 5D respectivamente, por lo que 0x7E sólo aparece como delimitador.
+"""
+
+from typing import Optional
+
+try:
+    from crccheck.crc import Crc16Xmodem
+    CRC_CHECK_AVAILABLE = True
+except ImportError:
+    CRC_CHECK_AVAILABLE = False
+
+START_FLAG = 0x7E
+END_FLAG = 0x7E
+ESCAPE_BYTE = 0x5E
+
+# Bytes de cabecera tras el START_FLAG (ModFunc..Length) y bytes de CRC
+HEADER_LENGTH = 6
+CRC_LENGTH = 2
+LENGTH_BYTE_INDEX = 6
+COMMAND_NUMBER_INDEX = 4
+
+_UNESCAPE_MAP = {0x5D: 0x5E, 0x7D: 0x7E}
+
+
+def unescape_frame_content(content: bytes) -> bytes:
+    """
+    Revierte el escapado Santone (5E 5D -> 5E, 5E 7D -> 7E).
+
+    Args:
+        content: Bytes entre los flags 7E de una trama
+
+    Returns:
+        Contenido sin secuencias de escape
+    """
+    result = bytearray()
+    escaped = False
+    for byte in content:
+        if escaped:
+            result.append(_UNESCAPE_MAP.get(byte, byte))
+            escaped = False
+        elif byte == ESCAPE_BYTE:
+            escaped = True
+        else:
+            result.append(byte)
+    return bytes(result)
+
+
+def is_well_formed_frame(frame: bytes) -> bool:
+    """
+    Verifica que una trama completa sea coherente con su byte de longitud.
+
+    Args:
+        frame: Trama completa incluyendo ambos flags 7E
+
+    Returns:
+        True si la longitud declarada en la cabecera coincide con el cuerpo recibido
+    """
+    if len(frame) < 2 or frame[0] != START_FLAG or frame[-1] != END_FLAG:
+        return False
+    content = unescape_frame_content(frame[1:-1])
+    if len(content) < HEADER_LENGTH:
+        return False
+    body_length = content[LENGTH_BYTE_INDEX - 1]
+    return len(content) == HEADER_LENGTH + body_length + CRC_LENGTH
+
+
+def has_valid_crc(frame: bytes) -> bool:
+    """
+    Verifica el CRC-16 XMODEM (little-endian) de una trama completa.
+
+    Sin crccheck instalado no se puede verificar y se asume válido.
+    """
+    if not CRC_CHECK_AVAILABLE:
+        return True
+    content = unescape_frame_content(frame[1:-1])
+    if len(content) < HEADER_LENGTH + CRC_LENGTH:
+        return False
+    return Crc16Xmodem.calc(content[:-CRC_LENGTH]) == int.from_bytes(content[-CRC_LENGTH:], "little")
+
+
+def get_frame_command_number(frame: bytes) -> Optional[int]:
+    """Retorna el número de comando de una trama o None si es demasiado corta."""
+    content = unescape_frame_content(frame[1:-1])
+    if len(content) < COMMAND_NUMBER_INDEX:
+        return None
+    return content[COMMAND_NUMBER_INDEX - 1]
+
+
+class SantoneFrameReader:
+    """
+    Acumulador de bytes que extrae tramas Santone completas.
+
+    Uso:
+        reader.feed(data)
+        frame = reader.next_frame()  # None mientras la trama esté incompleta
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    @property
+    def buffered(self) -> int:
+        """Cantidad de bytes pendientes en el buffer."""
+        return len(self._buffer)
+
+    def feed(self, data: bytes):
+        """Agrega bytes recibidos del stream."""
+        self._buffer.extend(data)
+
+    def clear(self):
+        """Descarta los bytes pendientes (p.ej. tras reconectar)."""
+        self._buffer.clear()
+
+    def next_frame(self) -> Optional[bytes]:
+        """
+        Extrae la siguiente trama completa del buffer.
+
+        Returns:
+            Trama completa (con ambos flags 7E) o None si aún no llegó el cierre
+        """
+        while True:
+            start = self._buffer.find(START_FLAG)
+            if start < 0:
+                # Sin inicio de trama: los bytes no pertenecen a ninguna trama
+                self._buffer.clear()
+                return None
+            if start > 0:
+                del self._buffer[:start]
+
+            end = self._buffer.find(END_FLAG, 1)
+            if end < 0:
+                return None
+
+            if end == 1:
+                # 7E 7E: cierre huérfano seguido del inicio de otra trama
+                del self._buffer[:1]
+                continue
+
+            content = unescape_frame_content(self._buffer[1:end])
+            if len(content) < HEADER_LENGTH or len(content) < HEADER_LENGTH + content[LENGTH_BYTE_INDEX - 1] + CRC_LENGTH:
+                # Trama truncada: el 0x7E encontrado es el inicio de la siguiente
+                del self._buffer[:end]
+                continue
+
+            frame = bytes(self._buffer[:end + 1])
+            del self._buffer[:end + 1]
+            return frame
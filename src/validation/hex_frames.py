@@ -37,7 +37,9 @@ Formato de trama: 7E + [ModFunc][ModAddr][DataType][CmdNum][Flag][Length][Data][
 Generado automáticamente el: 26/09/2025
 """
 
-from typing import Dict, List
+import threading
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
 
 # Importar módulo de comandos de seteo
 try:
@@ -126,8 +128,18 @@ def get_set_command_frames() -> Dict[str, str]:
 
     return frames
 
-# Obtener tramas de seteo dinámicamente
-DRS_SET_FRAMES: Dict[str, str] = get_set_command_frames()
+# Tramas de seteo: se generan en el primer acceso a DRS_SET_FRAMES (ver __getattr__)
+_set_frames: Optional[Dict[str, str]] = None
+_set_frames_lock = threading.Lock()
+
+def _get_set_frames() -> Dict[str, str]:
+    """Tramas SET generadas una sola vez y cacheadas."""
+    global _set_frames
+    if _set_frames is None:
+        with _set_frames_lock:
+            if _set_frames is None:
+                _set_frames = get_set_command_frames()
+    return _set_frames
 
 # Tramas para comandos DRS Remote (13 comandos)
 DRS_REMOTE_FRAMES: Dict[str, str] = {
@@ -172,6 +184,35 @@ COMMAND_HEX_MAP: Dict[str, int] = {
     'datt': 0x09,
 }
 
+# Comandos GET que leen el parámetro modificado por cada familia de comandos SET
+# (prefijo del nombre SET sin "remote_" -> comandos de lectura afectados)
+SET_COMMAND_READBACK: Dict[str, List[str]] = {
+    'set_working_mode': ['broadband_switching'],
+    'set_attenuation': ['datt'],
+    'set_channels': ['channel_switch'],
+    'set_single_channel_freq': ['channel_frequency_configuration'],
+    'set_channel_frequenc': ['channel_frequency_configuration'],
+    'set_vhf_frequencies': ['channel_frequency_configuration'],
+    'set_p25_frequencies': ['channel_frequency_configuration'],
+    'set_tetra400_frequencies': ['channel_frequency_configuration'],
+}
+
+def get_set_command_readback(command: str) -> Optional[List[str]]:
+    """
+    Obtiene los comandos GET cuyo valor cambia al enviar un comando SET.
+    
+    Args:
+        command: Nombre del comando SET (master o remote_)
+        
+    Returns:
+        Lista de comandos GET afectados o None si el SET no es conocido
+    """
+    name = command[len('remote_'):] if command.startswith('remote_') else command
+    for prefix, readback in SET_COMMAND_READBACK.items():
+        if name.startswith(prefix):
+            return list(readback)
+    return None
+
 def get_all_master_commands() -> List[str]:
     """Retorna lista de todos los comandos DRS Master disponibles."""
     return list(DRS_MASTER_FRAMES.keys())
@@ -187,7 +228,7 @@ def get_all_set_commands() -> List[str]:
     Returns:
         Lista de nombres de comandos SET
     """
-    return list(DRS_SET_FRAMES.keys())
+    return list(_get_set_frames().keys())
 
 def get_master_command_frame(command: str) -> str:
     """Obtiene la trama hexadecimal de un comando Master específico."""
@@ -199,15 +240,10 @@ def get_remote_command_frame(command: str) -> str:
 
 def get_set_command_frame(command: str) -> str:
     """Obtiene la trama hexadecimal de un comando SET específico."""
-    return DRS_SET_FRAMES.get(command, "")
+    return _get_set_frames().get(command, "")
 
-def get_all_master_set_commands() -> Dict[str, str]:
-    """
-    Retorna todos los comandos SET disponibles para Master
-    
-    Returns:
-        dict: Diccionario con nombre_comando -> trama_hex
-    """
+def _build_master_set_frames() -> Dict[str, bytes]:
+    """Genera las tramas SET disponibles para Master (nombre_comando -> bytes)."""
     if not SET_COMMANDS_AVAILABLE:
         return {}
         
@@ -215,32 +251,32 @@ def get_all_master_set_commands() -> Dict[str, str]:
     
     try:
         # SET Working Mode - WideBand
-        commands['set_working_mode_wideband'] = SetCommands.set_working_mode(wideband=True).hex().upper()
+        commands['set_working_mode_wideband'] = SetCommands.set_working_mode(wideband=True)
         
         # SET Working Mode - Channel
-        commands['set_working_mode_channel'] = SetCommands.set_working_mode(wideband=False).hex().upper()
+        commands['set_working_mode_channel'] = SetCommands.set_working_mode(wideband=False)
         
         # SET Attenuation - Varios valores para probar
         commands['set_attenuation_10_15'] = SetCommands.set_attenuation(
             uplink_db=10,
             downlink_db=15,
             device_type="dmu"
-        ).hex().upper()
+        )
         
         commands['set_attenuation_5_20'] = SetCommands.set_attenuation(
             uplink_db=5,
             downlink_db=20,
             device_type="dmu"
-        ).hex().upper()
+        )
         
         # SET Channel Activation - Varios patrones
-        commands['set_channels_all_on'] = SetCommands.set_channel_activation([True] * 16).hex().upper()
-        commands['set_channels_all_off'] = SetCommands.set_channel_activation([False] * 16).hex().upper()
-        commands['set_channels_first_8_on'] = SetCommands.set_channel_activation([True] * 8 + [False] * 8).hex().upper()
+        commands['set_channels_all_on'] = SetCommands.set_channel_activation([True] * 16)
+        commands['set_channels_all_off'] = SetCommands.set_channel_activation([False] * 16)
+        commands['set_channels_first_8_on'] = SetCommands.set_channel_activation([True] * 8 + [False] * 8)
         
         # SET Channel Frequencies - VHF
         vhf_freqs = SetCommands.generate_vhf_frequencies()
-        commands['set_channel_frequencies_vhf'] = SetCommands.set_channel_frequencies(vhf_freqs).hex().upper()
+        commands['set_channel_frequencies_vhf'] = SetCommands.set_channel_frequencies(vhf_freqs)
         
     except Exception as e:
         print(f"Error generating master SET commands: {e}")
@@ -248,13 +284,10 @@ def get_all_master_set_commands() -> Dict[str, str]:
     
     return commands
 
-def get_all_remote_set_commands() -> Dict[str, str]:
+def _build_remote_set_frames() -> Dict[str, bytes]:
     """
-    Retorna todos los comandos SET disponibles para Remote
+    Genera las tramas SET disponibles para Remote (nombre_comando -> bytes)
     (SIN set_channel_frequencies y set_channel_activation)
-    
-    Returns:
-        dict: Diccionario con nombre_comando -> trama_hex
     """
     if not SET_COMMANDS_AVAILABLE:
         return {}
@@ -263,23 +296,23 @@ def get_all_remote_set_commands() -> Dict[str, str]:
     
     try:
         # SET Working Mode - WideBand
-        commands['remote_set_working_mode_wideband'] = SetCommands.set_working_mode(wideband=True).hex().upper()
+        commands['remote_set_working_mode_wideband'] = SetCommands.set_working_mode(wideband=True)
         
         # SET Working Mode - Channel
-        commands['remote_set_working_mode_channel'] = SetCommands.set_working_mode(wideband=False).hex().upper()
+        commands['remote_set_working_mode_channel'] = SetCommands.set_working_mode(wideband=False)
         
         # SET Attenuation - Varios valores para probar
         commands['remote_set_attenuation_12_18'] = SetCommands.set_attenuation(
             uplink_db=12,
             downlink_db=18,
             device_type="dru"
-        ).hex().upper()
+        )
         
         commands['remote_set_attenuation_8_16'] = SetCommands.set_attenuation(
             uplink_db=8,
             downlink_db=16,
             device_type="dru"
-        ).hex().upper()
+        )
         
     except Exception as e:
         print(f"Error generating remote SET commands: {e}")
@@ -287,6 +320,110 @@ def get_all_remote_set_commands() -> Dict[str, str]:
     
     return commands
 
+# Tipos de dispositivo del registro de tramas
+DEVICE_MASTER = "master"
+DEVICE_REMOTE = "remote"
+DEVICE_SET = "set"
+
+class FrameRegistry:
+    """
+    Registro inmutable de tramas listas para enviar.
+    
+    Indexa por (tipo de dispositivo, comando) los bytes de cada trama, su
+    representación hexadecimal y si tiene formato Santone válido; todo se
+    calcula una sola vez al construir el registro.
+    """
+    
+    def __init__(self, frames: Iterable[Tuple[str, str, bytes]]):
+        """
+        Args:
+            frames: Tuplas (tipo de dispositivo, comando, trama) en orden de ejecución
+        """
+        frame_bytes: Dict[Tuple[str, str], bytes] = {}
+        for device_type, command, frame in frames:
+            frame_bytes[(device_type, command)] = bytes(frame)
+        self._bytes: Mapping[Tuple[str, str], bytes] = MappingProxyType(frame_bytes)
+        self._hex: Mapping[Tuple[str, str], str] = MappingProxyType(
+            {key: frame.hex().upper() for key, frame in frame_bytes.items()}
+        )
+        self._valid = frozenset(key for key, frame in self._hex.items() if validate_frame_format(frame))
+    
+    def get(self, device_type: str, command: str) -> Optional[bytes]:
+        """Bytes de la trama (None si no existe)."""
+        return self._bytes.get((device_type, command))
+    
+    def get_hex(self, device_type: str, command: str) -> str:
+        """Trama hexadecimal (cadena vacía si no existe)."""
+        return self._hex.get((device_type, command), "")
+    
+    def is_valid(self, device_type: str, command: str) -> bool:
+        """Indica si la trama existe y tiene formato Santone válido."""
+        return (device_type, command) in self._valid
+    
+    def hex_frames(self, device_type: str, set_commands: Optional[bool] = None) -> Dict[str, str]:
+        """
+        Tramas hexadecimales de un tipo de dispositivo, en orden de registro.
+        
+        Args:
+            device_type: DEVICE_MASTER, DEVICE_REMOTE o DEVICE_SET
+            set_commands: True = sólo SET, False = sólo GET, None = todos
+        """
+        return {
+            command: frame for (frame_device, command), frame in self._hex.items()
+            if frame_device == device_type
+            and (set_commands is None or _is_set_name(command) == set_commands)
+        }
+    
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._bytes
+    
+    def __len__(self) -> int:
+        return len(self._bytes)
+
+def _is_set_name(command: str) -> bool:
+    return command.startswith('set_') or command.startswith('remote_set_')
+
+def build_frame_registry() -> FrameRegistry:
+    """Construye el registro con las tramas GET y SET de cada tipo de dispositivo."""
+    frames: List[Tuple[str, str, bytes]] = []
+    frames.extend((DEVICE_MASTER, cmd, bytes.fromhex(frame)) for cmd, frame in DRS_MASTER_FRAMES.items())
+    frames.extend((DEVICE_MASTER, cmd, frame) for cmd, frame in _build_master_set_frames().items())
+    frames.extend((DEVICE_REMOTE, cmd, bytes.fromhex(frame)) for cmd, frame in DRS_REMOTE_FRAMES.items())
+    frames.extend((DEVICE_REMOTE, cmd, frame) for cmd, frame in _build_remote_set_frames().items())
+    frames.extend((DEVICE_SET, cmd, bytes.fromhex(frame)) for cmd, frame in _get_set_frames().items())
+    return FrameRegistry(frames)
+
+_frame_registry: Optional[FrameRegistry] = None
+_frame_registry_lock = threading.Lock()
+
+def get_frame_registry() -> FrameRegistry:
+    """Registro de tramas compartido por el proceso (se construye en el primer uso)."""
+    global _frame_registry
+    if _frame_registry is None:
+        with _frame_registry_lock:
+            if _frame_registry is None:
+                _frame_registry = build_frame_registry()
+    return _frame_registry
+
+def get_all_master_set_commands() -> Dict[str, str]:
+    """
+    Retorna todos los comandos SET disponibles para Master
+    
+    Returns:
+        dict: Diccionario con nombre_comando -> trama_hex
+    """
+    return get_frame_registry().hex_frames(DEVICE_MASTER, set_commands=True)
+
+def get_all_remote_set_commands() -> Dict[str, str]:
+    """
+    Retorna todos los comandos SET disponibles para Remote
+    (SIN set_channel_frequencies y set_channel_activation)
+    
+    Returns:
+        dict: Diccionario con nombre_comando -> trama_hex
+    """
+    return get_frame_registry().hex_frames(DEVICE_REMOTE, set_commands=True)
+
 def get_master_set_command_frame(command_name: str) -> str:
     """
     Obtiene la trama hexadecimal de un comando SET master específico
@@ -297,8 +434,9 @@ def get_master_set_command_frame(command_name: str) -> str:
     Returns:
         str: Trama hexadecimal o cadena vacía si no existe
     """
-    commands = get_all_master_set_commands()
-    return commands.get(command_name, "")
+    if not _is_set_name(command_name):
+        return ""
+    return get_frame_registry().get_hex(DEVICE_MASTER, command_name)
 
 def get_remote_set_command_frame(command_name: str) -> str:
     """
@@ -310,8 +448,9 @@ def get_remote_set_command_frame(command_name: str) -> str:
     Returns:
         str: Trama hexadecimal o cadena vacía si no existe
     """
-    commands = get_all_remote_set_commands()
-    return commands.get(command_name, "")
+    if not _is_set_name(command_name):
+        return ""
+    return get_frame_registry().get_hex(DEVICE_REMOTE, command_name)
 
 
 def get_master_frame(command: str) -> str:
@@ -348,7 +487,7 @@ def get_set_frame(command: str) -> str:
     Returns:
         Trama hexadecimal completa o cadena vacía si no existe
     """
-    return DRS_SET_FRAMES.get(command, '')
+    return _get_set_frames().get(command, '')
 
 
 def get_command_hex_code(command: str) -> int:
@@ -395,18 +534,29 @@ def validate_frame_format(frame: str) -> bool:
         
     return True
 
-# Estadísticas de tramas generadas
+# Estadísticas de tramas generadas (las que dependen de las tramas SET se calculan en __getattr__)
 TOTAL_MASTER_COMMANDS = len(DRS_MASTER_FRAMES)
 TOTAL_REMOTE_COMMANDS = len(DRS_REMOTE_FRAMES)
-TOTAL_SET_COMMANDS = len(DRS_SET_FRAMES)
-TOTAL_UNIQUE_COMMANDS = len(set(list(DRS_MASTER_FRAMES.keys()) + list(DRS_REMOTE_FRAMES.keys()) + list(DRS_SET_FRAMES.keys())))
+
+def _total_unique_commands() -> int:
+    return len(set(DRS_MASTER_FRAMES) | set(DRS_REMOTE_FRAMES) | set(_get_set_frames()))
+
+def __getattr__(name: str):
+    """Genera DRS_SET_FRAMES y sus estadísticas en el primer acceso."""
+    if name == 'DRS_SET_FRAMES':
+        return _get_set_frames()
+    if name == 'TOTAL_SET_COMMANDS':
+        return len(_get_set_frames())
+    if name == 'TOTAL_UNIQUE_COMMANDS':
+        return _total_unique_commands()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     print("=== DRS Hex Frames Information ===")
     print(f"DRS Master Commands: {TOTAL_MASTER_COMMANDS}")
     print(f"DRS Remote Commands: {TOTAL_REMOTE_COMMANDS}")
-    print(f"DRS Set Commands: {TOTAL_SET_COMMANDS}")
-    print(f"Total Unique Commands: {TOTAL_UNIQUE_COMMANDS}")
+    print(f"DRS Set Commands: {len(_get_set_frames())}")
+    print(f"Total Unique Commands: {_total_unique_commands()}")
     print()
     print("Sample Master Commands:")
     for i, (cmd, frame) in enumerate(list(DRS_MASTER_FRAMES.items())[:3]):
@@ -416,9 +566,9 @@ if __name__ == "__main__":
     for i, (cmd, frame) in enumerate(list(DRS_REMOTE_FRAMES.items())[:3]):
         print(f"  {cmd}: {frame}")
     print()
-    if DRS_SET_FRAMES:
+    if _get_set_frames():
         print("Sample Set Commands:")
-        for i, (cmd, frame) in enumerate(list(DRS_SET_FRAMES.items())[:3]):
+        for i, (cmd, frame) in enumerate(list(_get_set_frames().items())[:3]):
             print(f"  {cmd}: {frame}")
     else:
         print("No Set Commands available (SetCommands module not found)")
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+History - Orden de comandos y predicción de duración a partir del historial
+
+Los resultados guardados en RESULTS_DIR registran, por dispositivo y
+comando, la duración y el estado de cada ejecución. El historial los
+resume para planificar el siguiente batch:
+
+- Ordena los comandos GET por valor diagnóstico: primero los que más
+  probablemente fallen por milisegundo invertido, para que los problemas
+  aparezcan cuanto antes. Los SET conservan su posición en el batch.
+- Predice la duración total del batch antes de empezar (ETA) y el tiempo
+  restante a medida que se completan comandos.
+
+Sin historial para un dispositivo se usa el de ese comando en otros
+dispositivos y, si tampoco existe, DEFAULT_COMMAND_MS; sin ningún
+historial el orden no cambia.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+# Archivos de resultados considerados (los más recientes)
+MAX_FILES = 200
+# Ejecuciones por dispositivo/comando que se conservan
+MAX_SAMPLES = 20
+# Duración supuesta de un comando sin historial (milisegundos)
+DEFAULT_COMMAND_MS = 150.0
+
+# Directorio de resultados por defecto (vacío = sin historial)
+HISTORY_DIR_ENV = "DRS_RESULTS_DIR"
+
+
+class CommandStats:
+    """Duraciones y fallos recientes de un comando"""
+
+    def __init__(self):
+        self.samples: List[Tuple[float, bool]] = []
+
+    def add(self, duration_ms: float, passed: bool):
+        self.samples.append((duration_ms, passed))
+        if len(self.samples) > MAX_SAMPLES:
+            del self.samples[0]
+
+    @property
+    def runs(self) -> int:
+        return len(self.samples)
+
+    @property
+    def mean_ms(self) -> float:
+        return sum(duration for duration, _ in self.samples) / len(self.samples)
+
+    @property
+    def failure_rate(self) -> float:
+        """Probabilidad de fallo suavizada (Laplace): 0.5 sin ejecuciones."""
+        failures = sum(1 for _, passed in self.samples if not passed)
+        return (failures + 1) / (len(self.samples) + 2)
+
+
+class CommandHistory:
+    """
+    Historial de latencias y fallos por modo, dispositivo y comando.
+
+    Se recarga de forma incremental: si el directorio no cambió (mtime) no
+    se recorre, y si cambió sólo se leen los archivos nuevos o modificados.
+    Los resultados se guardan siempre en archivos nuevos, por lo que cada
+    ejecución guardada modifica el directorio.
+    """
+
+    def __init__(self, results_dir: Optional[Union[str, Path]] = None, max_files: int = MAX_FILES):
+        """
+        Args:
+            results_dir: Directorio de resultados guardados (None = sin historial)
+            max_files: Archivos más recientes considerados
+        """
+        self.results_dir = Path(results_dir) if results_dir else None
+        self.max_files = max_files
+        self._files: Dict[str, Tuple[float, List[Tuple[str, str, str, float, bool]]]] = {}
+        self._device: Dict[Tuple[str, str, str], CommandStats] = {}
+        self._command: Dict[Tuple[str, str], CommandStats] = {}
+        self._dir_mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Relee los archivos de resultados nuevos o modificados."""
+        if self.results_dir is None or not self.results_dir.is_dir():
+            return
+        with self._lock:
+            try:
+                dir_mtime = self.results_dir.stat().st_mtime_ns
+                if dir_mtime == self._dir_mtime:
+                    return
+                paths = sorted(self.results_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+            except OSError:
+                return
+            self._dir_mtime = dir_mtime
+            paths = paths[-self.max_files:]
+            current = {}
+            changed = False
+            for path in paths:
+                try:
+                    mtime = path.stat().st_mtime
+                except OSError:
+                    continue
+                cached = self._files.get(path.name)
+                if cached is None or cached[0] != mtime:
+                    cached = (mtime, _read_samples(path))
+                    changed = True
+                current[path.name] = cached
+            if not changed and current.keys() == self._files.keys():
+                return
+            self._files = current
+            self._device = {}
+            self._command = {}
+            for _, samples in current.values():
+                for mode, ip_address, command, duration_ms, passed in samples:
+                    self._device.setdefault((mode, ip_address, command), CommandStats()).add(duration_ms, passed)
+                    self._command.setdefault((mode, command), CommandStats()).add(duration_ms, passed)
+
+    def stats(self, ip_address: str, mode: str, command: str) -> Optional[CommandStats]:
+        """Historial del comando en el dispositivo o, si no hay, en cualquier dispositivo."""
+        mode = mode.lower()
+        return self._device.get((mode, ip_address, command)) or self._command.get((mode, command))
+
+    def expected_ms(self, ip_address: str, mode: str, command: str) -> float:
+        stats = self.stats(ip_address, mode, command)
+        return stats.mean_ms if stats else DEFAULT_COMMAND_MS
+
+    def order(self, ip_address: str, mode: str, commands: Iterable[str], is_set=None) -> List[str]:
+        """
+        Ordena los comandos GET por probabilidad de fallo por milisegundo.
+
+        Args:
+            ip_address: IP del dispositivo
+            mode: Modo de validación ("mock" o "live")
+            commands: Comandos en su orden original
+            is_set: Función que identifica comandos SET (conservan su posición)
+
+        Returns:
+            Comandos reordenados; el orden original se conserva ante empates
+        """
+        commands = list(commands)
+        gets = [cmd for cmd in commands if not (is_set and is_set(cmd))]
+
+        def score(command: str) -> float:
+            stats = self.stats(ip_address, mode, command)
+            if stats is None:
+                return CommandStats().failure_rate / DEFAULT_COMMAND_MS
+            return stats.failure_rate / max(stats.mean_ms, 1.0)
+
+        # sorted es estable: sin historial el orden no cambia
+        ordered = iter(sorted(gets, key=score, reverse=True))
+        return [cmd if is_set and is_set(cmd) else next(ordered) for cmd in commands]
+
+    def predict(self, ip_address: str, mode: str, commands: Iterable[str]) -> Dict[str, Any]:
+        """
+        Duración estimada de un batch.
+
+        Returns:
+            {"eta_seconds", "total_commands", "commands_with_history", "expected_ms"}
+        """
+        expected = {command: round(self.expected_ms(ip_address, mode, command), 1) for command in commands}
+        return {
+            "eta_seconds": round(sum(expected.values()) / 1000, 1),
+            "total_commands": len(expected),
+            "commands_with_history": sum(
+                1 for command in expected if self.stats(ip_address, mode, command) is not None
+            ),
+            "expected_ms": expected
+        }
+
+    def remaining_seconds(self, plan: Dict[str, Any], completed: Iterable[str]) -> float:
+        """Tiempo restante de un plan dados los comandos ya completados."""
+        done = set(completed)
+        return round(
+            sum(ms for command, ms in plan["expected_ms"].items() if command not in done) / 1000, 1
+        )
+
+
+def _batch_samples(batch: Dict[str, Any]) -> List[Tuple[str, str, str, float, bool]]:
+    mode = str(batch.get("mode", "")).lower()
+    ip_address = batch.get("ip_address")
+    samples = []
+    for result in batch.get("results", []) or []:
+        if not isinstance(result, dict) or result.get("status") in ("SKIPPED", "CANCELLED"):
+            continue
+        # Resultados arrastrados de una ejecución anterior no son una nueva medición
+        if (result.get("provenance") or {}).get("source") == "previous":
+            continue
+        try:
+            duration_ms = float(result.get("duration_ms", 0))
+        except (TypeError, ValueError):
+            continue
+        samples.append((mode, ip_address, result.get("command"), duration_ms, result.get("status") == "PASS"))
+    return samples
+
+
+def _read_samples(path: Path) -> List[Tuple[str, str, str, float, bool]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    batch = data.get("result", data) if isinstance(data, dict) else None
+    if not isinstance(batch, dict) or not batch.get("ip_address"):
+        return []
+    return _batch_samples(batch)
+
+
+_default_history: Optional[CommandHistory] = None
+_default_lock = threading.Lock()
+
+
+def get_default_history() -> CommandHistory:
+    """Historial compartido por el proceso (resultados de $DRS_RESULTS_DIR si está definido)."""
+    global _default_history
+    with _default_lock:
+        if _default_history is None:
+            _default_history = CommandHistory(os.environ.get(HISTORY_DIR_ENV) or None)
+        return _default_history
+
+
+def configure_default_history(results_dir: Optional[Union[str, Path]]) -> CommandHistory:
+    """Reemplaza el historial compartido por uno leído de results_dir."""
+    global _default_history
+    with _default_lock:
+        _default_history = CommandHistory(results_dir)
+        return _default_history
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental - Revalidación incremental a partir de un resultado anterior
+
+Tras un batch con unos pocos timeouts, revalidar todo el dispositivo
+repite decenas de comandos que ya pasaron. La revalidación incremental
+toma un resultado previo (archivo de RESULTS_DIR o run_id) y sólo vuelve
+a ejecutar los comandos que no pasaron o cuya validación es más antigua
+que max_age_seconds; el resto se conserva con su procedencia.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+# Formato de "timestamp" de los resultados batch
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Procedencia de cada comando de un resultado incremental
+SOURCE_RERUN = "rerun"
+SOURCE_PREVIOUS = "previous"
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """Convierte un timestamp de resultado batch a epoch (None si no se puede)."""
+    if not value:
+        return None
+    try:
+        return time.mktime(time.strptime(value, TIMESTAMP_FORMAT))
+    except (TypeError, ValueError):
+        return None
+
+
+def command_validated_at(batch: Dict[str, Any], result: Dict[str, Any]) -> Optional[float]:
+    """Momento en que se validó un comando (su procedencia o, si no, el del batch)."""
+    provenance = result.get("provenance") or {}
+    return parse_timestamp(provenance.get("validated_at")) or parse_timestamp(batch.get("timestamp"))
+
+
+def select_commands(
+    previous: Dict[str, Any],
+    max_age_seconds: Optional[float] = None,
+    now: Optional[float] = None
+) -> List[str]:
+    """
+    Comandos de un resultado previo que deben volver a ejecutarse.
+
+    Args:
+        previous: Resultado batch anterior
+        max_age_seconds: Antigüedad máxima de un PASS para conservarlo (None = sin límite)
+        now: Referencia temporal (None = ahora)
+
+    Returns:
+        Comandos que no pasaron o están vencidos, en el orden del resultado previo
+    """
+    now = time.time() if now is None else now
+    selected = []
+    for result in previous.get("results", []):
+        if result.get("status") != "PASS":
+            selected.append(result["command"])
+            continue
+        if max_age_seconds is not None:
+            validated_at = command_validated_at(previous, result)
+            if validated_at is None or now - validated_at > max_age_seconds:
+                selected.append(result["command"])
+    return selected
+
+
+def load_previous_result(reference: str, results_dir: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Carga un resultado batch guardado por nombre de archivo o run_id.
+
+    Acepta tanto el formato guardado por la API ({"request", "result"})
+    como un resultado batch directo.
+
+    Raises:
+        FileNotFoundError: Si no existe el archivo ni un resultado con ese run_id
+        ValueError: Si el archivo no contiene un resultado batch
+    """
+    results_dir = Path(results_dir)
+    # Sólo archivos de results_dir (sin rutas)
+    candidate = results_dir / Path(reference).name
+    if candidate.suffix != ".json":
+        candidate = candidate.with_name(candidate.name + ".json")
+    if candidate.is_file():
+        return _unwrap(json.loads(candidate.read_text(encoding="utf-8")), candidate.name)
+
+    for path in sorted(results_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        batch = data.get("result", data) if isinstance(data, dict) else None
+        if isinstance(batch, dict) and batch.get("run_id") == reference:
+            return _unwrap(data, path.name)
+    raise FileNotFoundError(f"No se encontró el resultado previo: {reference}")
+
+
+def _unwrap(data: Any, name: str) -> Dict[str, Any]:
+    batch = data.get("result", data) if isinstance(data, dict) else None
+    if not isinstance(batch, dict) or not isinstance(batch.get("results"), list):
+        raise ValueError(f"{name} no contiene un resultado batch")
+    return batch
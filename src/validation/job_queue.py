@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Job Queue - Admisión y cola acotada para ejecuciones de validación
+
+Cada validación lanzada por la API ocupa sesiones con dispositivos y
+tiempo del event loop. Esta cola limita cuántas corren a la vez
+(workers) y cuántas pueden esperar turno (max_queued); con la cola llena,
+la API rechaza la petición (429 + Retry-After) en lugar de degradar a
+todas las validaciones en curso.
+
+Como el DeviceScheduler, funciona entre event loops: los turnos se
+entregan con futures despertados vía call_soon_threadsafe.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# Configuración por entorno del proceso de la API
+WORKERS_ENV = "DRS_VALIDATION_WORKERS"
+QUEUE_SIZE_ENV = "DRS_VALIDATION_QUEUE_SIZE"
+
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 32
+
+# Duración estimada de una validación antes de tener mediciones (segundos)
+DEFAULT_JOB_SECONDS = 30.0
+# Peso de cada nueva duración en el promedio móvil exponencial
+DURATION_ALPHA = 0.2
+
+
+class QueueFullError(Exception):
+    """La cola de validaciones está llena"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Validation queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ValidationJobQueue:
+    """
+    Cola FIFO acotada con un número fijo de workers.
+
+    Uso:
+        position = queue.submit(job_id)      # QueueFullError si no hay lugar
+        await queue.acquire(job_id)          # espera turno de worker
+        try:
+            ...                              # ejecutar la validación
+        finally:
+            queue.release(job_id)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_WORKERS,
+        max_queued: int = DEFAULT_QUEUE_SIZE,
+        initial_job_seconds: float = DEFAULT_JOB_SECONDS
+    ):
+        """
+        Inicializar la cola.
+
+        Args:
+            max_workers: Validaciones ejecutándose a la vez
+            max_queued: Validaciones esperando turno (además de las en ejecución)
+            initial_job_seconds: Duración estimada de una validación sin mediciones
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queued = max(0, max_queued)
+        self.average_job_seconds = initial_job_seconds
+        self._running: Dict[str, Optional[float]] = {}  # job_id -> inicio (None = turno asignado, aún no inicia)
+        self._waiting: Deque[str] = deque()
+        self._waiters: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, job_id: str) -> int:
+        """
+        Admite una validación.
+
+        Returns:
+            Posición en la cola (0 = tiene worker asignado)
+
+        Raises:
+            QueueFullError: Si todos los workers están ocupados y la cola está llena
+        """
+        with self._lock:
+            if job_id in self._running:
+                return 0
+            if job_id in self._waiting:
+                return self._waiting.index(job_id) + 1
+            if len(self._running) < self.max_workers:
+                self._running[job_id] = None
+                return 0
+            if len(self._waiting) >= self.max_queued:
+                self.rejected += 1
+                raise QueueFullError(self._retry_after())
+            self._waiting.append(job_id)
+            return len(self._waiting)
+
+    async def acquire(self, job_id: str):
+        """
+        Espera el turno de worker de una validación admitida.
+
+        Raises:
+            asyncio.CancelledError: Si la validación se cancela mientras espera
+            KeyError: Si job_id no fue admitido con submit
+        """
+        with self._lock:
+            if job_id not in self._running:
+                if job_id not in self._waiting:
+                    raise KeyError(job_id)
+                loop = asyncio.get_running_loop()
+                waiter = loop.create_future()
+                self._waiters[job_id] = (loop, waiter)
+            else:
+                waiter = None
+                self._running[job_id] = time.monotonic()
+
+        if waiter is not None:
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Sale de la cola; si ya tenía worker asignado, lo cede
+                self.release(job_id)
+                raise
+            with self._lock:
+                self._running[job_id] = time.monotonic()
+
+    def release(self, job_id: str):
+        """Libera el worker (o el lugar en cola) de una validación (idempotente)."""
+        with self._lock:
+            self._waiters.pop(job_id, None)
+            if job_id in self._waiting:
+                self._waiting.remove(job_id)
+                return
+            if job_id not in self._running:
+                return
+            started_at = self._running.pop(job_id)
+            if started_at is not None:
+                self.completed += 1
+                duration = time.monotonic() - started_at
+                self.average_job_seconds += DURATION_ALPHA * (duration - self.average_job_seconds)
+            self._start_next()
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Retira una validación que aún espera turno.
+
+        Returns:
+            True si estaba en la cola (su acquire termina con CancelledError)
+        """
+        with self._lock:
+            if job_id not in self._waiting:
+                return False
+            self._waiting.remove(job_id)
+            entry = self._waiters.pop(job_id, None)
+        if entry:
+            loop, waiter = entry
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(waiter.cancel)
+        return True
+
+    def _start_next(self):
+        # Con el lock tomado: el worker libre pasa al primero de la cola
+        while self._waiting and len(self._running) < self.max_workers:
+            job_id = self._waiting.popleft()
+            self._running[job_id] = None
+            entry = self._waiters.pop(job_id, None)
+            if entry:
+                loop, waiter = entry
+                if loop.is_closed():
+                    del self._running[job_id]
+                    continue
+                loop.call_soon_threadsafe(self._wake, waiter)
+
+    @staticmethod
+    def _wake(waiter: asyncio.Future):
+        if not waiter.done():
+            waiter.set_result(None)
+
+    def _retry_after(self) -> int:
+        # Con la cola llena, se libera un lugar cada vez que termina una validación
+        return max(1, math.ceil(self.average_job_seconds / self.max_workers))
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Posición en la cola (0 = ejecutándose, None = desconocida)."""
+        with self._lock:
+            if job_id in self._running:
+                return 0
+            if job_id in self._waiting:
+                return self._waiting.index(job_id) + 1
+            return None
+
+    def eta_seconds(self, job_id: str) -> Optional[float]:
+        """Tiempo estimado hasta que la validación obtenga un worker (0 = ya lo tiene)."""
+        position = self.position(job_id)
+        if position is None:
+            return None
+        return round(math.ceil(position / self.max_workers) * self.average_job_seconds, 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado de la cola."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queued": self.max_queued,
+                "running": len(self._running),
+                "queued": len(self._waiting),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "average_job_seconds": round(self.average_job_seconds, 1)
+            }
+
+
+_default_queue: Optional[ValidationJobQueue] = None
+_default_lock = threading.Lock()
+
+
+def get_job_queue() -> ValidationJobQueue:
+    """Cola compartida por el proceso ($DRS_VALIDATION_WORKERS, $DRS_VALIDATION_QUEUE_SIZE)."""
+    global _default_queue
+    with _default_lock:
+        if _default_queue is None:
+            _default_queue = ValidationJobQueue(
+                int(os.environ.get(WORKERS_ENV) or DEFAULT_WORKERS),
+                int(os.environ.get(QUEUE_SIZE_ENV) or DEFAULT_QUEUE_SIZE)
+            )
+        return _default_queue
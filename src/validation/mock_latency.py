@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Mock Latency - Modelos de latencia simulada para el modo mock
+
+El modo mock esperaba siempre 50-200 ms por comando. Con un modelo
+configurable, CI y los tests corren sin esperas y las estaciones de
+capacitación pueden reproducir tiempos realistas:
+
+- zero: sin esperas (sólo CPU)
+- fixed: latencia constante por comando
+- random: distribución uniforme o normal acotada
+- replay: latencias medidas por comando en dispositivos reales
+
+El perfil se elige en validation_modes.mock.latency_profile de
+validation_scenarios.yaml o con la variable de entorno DRS_MOCK_LATENCY.
+"""
+
+import itertools
+import json
+import os
+import random
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+# Perfil de latencia a usar (reemplaza latency_profile de la configuración)
+MOCK_LATENCY_ENV = "DRS_MOCK_LATENCY"
+
+CONFIG_DIR = Path(__file__).parent.parent / "config"
+
+
+class MockLatencyModel:
+    """Modelo base: sin latencia"""
+
+    name = "zero"
+
+    def __init__(self, setup_ms: float = 0):
+        """
+        Args:
+            setup_ms: Espera previa a cada batch simulado
+        """
+        self.setup_ms = setup_ms
+
+    def delay_for(self, command: str) -> float:
+        """Segundos a esperar antes de responder command."""
+        return 0.0
+
+    @property
+    def setup_seconds(self) -> float:
+        return self.setup_ms / 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"model": self.name, "setup_ms": self.setup_ms}
+
+
+class FixedLatency(MockLatencyModel):
+    """Latencia constante por comando"""
+
+    name = "fixed"
+
+    def __init__(self, latency_ms: float = 100, setup_ms: float = 0):
+        super().__init__(setup_ms)
+        self.latency_ms = latency_ms
+
+    def delay_for(self, command: str) -> float:
+        return self.latency_ms / 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**super().to_dict(), "latency_ms": self.latency_ms}
+
+
+class RandomLatency(MockLatencyModel):
+    """Latencia aleatoria uniforme o normal, acotada a [min_ms, max_ms]"""
+
+    name = "random"
+
+    def __init__(
+        self,
+        min_ms: float = 50,
+        max_ms: float = 200,
+        distribution: str = "uniform",
+        mean_ms: Optional[float] = None,
+        stddev_ms: Optional[float] = None,
+        setup_ms: float = 0,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            min_ms, max_ms: Límites de la latencia generada
+            distribution: "uniform" o "normal"
+            mean_ms, stddev_ms: Parámetros de la normal (por defecto, centro y sexto del rango)
+            seed: Semilla para secuencias reproducibles
+        """
+        if distribution not in ("uniform", "normal"):
+            raise ValueError(f"Distribución de latencia desconocida: {distribution}")
+        super().__init__(setup_ms)
+        self.min_ms = min_ms
+        self.max_ms = max(max_ms, min_ms)
+        self.distribution = distribution
+        self.mean_ms = mean_ms if mean_ms is not None else (self.min_ms + self.max_ms) / 2
+        self.stddev_ms = stddev_ms if stddev_ms is not None else (self.max_ms - self.min_ms) / 6
+        self._random = random.Random(seed)
+
+    def delay_for(self, command: str) -> float:
+        if self.distribution == "uniform":
+            latency = self._random.uniform(self.min_ms, self.max_ms)
+        else:
+            latency = self._random.gauss(self.mean_ms, self.stddev_ms)
+        return min(self.max_ms, max(self.min_ms, latency)) / 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **super().to_dict(),
+            "distribution": self.distribution,
+            "min_ms": self.min_ms,
+            "max_ms": self.max_ms,
+            "mean_ms": self.mean_ms,
+            "stddev_ms": self.stddev_ms
+        }
+
+
+class ReplayLatency(MockLatencyModel):
+    """
+    Reproduce latencias medidas por comando, en ciclo.
+
+    Los comandos sin mediciones usan fallback_ms.
+    """
+
+    name = "replay"
+
+    def __init__(self, latencies_ms: Dict[str, List[float]], fallback_ms: float = 100, setup_ms: float = 0):
+        super().__init__(setup_ms)
+        self.latencies_ms = {command: list(samples) for command, samples in latencies_ms.items() if samples}
+        self.fallback_ms = fallback_ms
+        self._cycles: Dict[str, Iterator[float]] = {
+            command: itertools.cycle(samples) for command, samples in self.latencies_ms.items()
+        }
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], fallback_ms: float = 100, setup_ms: float = 0) -> "ReplayLatency":
+        """
+        Carga latencias grabadas.
+
+        Acepta {"comando": [ms, ...]}, un resultado batch live (con
+        "results": [{"command", "duration_ms"}, ...]) tal como se guarda en
+        RESULTS_DIR ({"request", "result"}) o sin envolver, o una lista de ellos.
+        Rutas relativas se resuelven contra src/config.
+
+        Raises:
+            ValueError: Si el archivo no existe, no es JSON válido o no contiene latencias
+        """
+        path = Path(path)
+        if not path.is_absolute():
+            path = CONFIG_DIR / path
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"No se pudieron cargar latencias grabadas de {path}: {e}") from e
+        latencies = cls._parse_recording(data)
+        if not latencies:
+            raise ValueError(f"El archivo {path} no contiene latencias grabadas")
+        return cls(latencies, fallback_ms, setup_ms)
+
+    @staticmethod
+    def _parse_recording(data: Any) -> Dict[str, List[float]]:
+        batches = data if isinstance(data, list) else [data]
+        latencies: Dict[str, List[float]] = {}
+        for batch in batches:
+            if not isinstance(batch, dict):
+                continue
+            # Resultados guardados por la aplicación: {"timestamp", "request", "result"}
+            batch = batch.get("result", batch)
+            if "results" in batch:
+                for result in batch["results"]:
+                    # Sólo respuestas reales: timeouts y errores no representan latencia del equipo
+                    if result.get("status") in (None, "PASS"):
+                        latencies.setdefault(result["command"], []).append(float(result["duration_ms"]))
+            else:
+                for command, samples in batch.items():
+                    latencies.setdefault(command, []).extend(float(ms) for ms in samples)
+        return latencies
+
+    def delay_for(self, command: str) -> float:
+        cycle = self._cycles.get(command)
+        if cycle is None:
+            return self.fallback_ms / 1000
+        with self._lock:
+            return next(cycle) / 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**super().to_dict(), "commands": len(self.latencies_ms), "fallback_ms": self.fallback_ms}
+
+
+def create_mock_latency(profile: Optional[Union[str, Dict[str, Any]]] = None, scenarios=None) -> MockLatencyModel:
+    """
+    Crea un modelo de latencia a partir de un perfil.
+
+    Args:
+        profile: Nombre de perfil de validation_scenarios.yaml o su configuración
+                 (None = $DRS_MOCK_LATENCY o el perfil por defecto)
+        scenarios: Instancia de ValidationScenarios (None = la global)
+    """
+    if not isinstance(profile, dict):
+        if scenarios is None:
+            from .scenarios import validation_scenarios as scenarios
+        profile = scenarios.get_mock_latency_profile(profile or os.environ.get(MOCK_LATENCY_ENV) or None)
+
+    settings = dict(profile)
+    model = settings.pop("model", "random")
+    if model == "zero":
+        return MockLatencyModel(settings.get("setup_ms", 0))
+    if model == "fixed":
+        return FixedLatency(**settings)
+    if model == "random":
+        return RandomLatency(**settings)
+    if model == "replay":
+        if not settings.get("file"):
+            raise ValueError("El perfil de latencia replay requiere 'file' (latencias o resultado live guardado)")
+        return ReplayLatency.from_file(settings.pop("file"), **settings)
+    raise ValueError(f"Modelo de latencia mock desconocido: {model}")
+
+
+_default_model: Optional[MockLatencyModel] = None
+_default_lock = threading.Lock()
+
+
+def get_default_mock_latency() -> MockLatencyModel:
+    """Modelo compartido por el proceso ($DRS_MOCK_LATENCY o latency_profile)."""
+    global _default_model
+    with _default_lock:
+        if _default_model is None:
+            _default_model = create_mock_latency()
+        return _default_model
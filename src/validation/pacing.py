@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Pacing Controller - Pausa adaptativa entre comandos live
+
+Reemplaza la pausa fija de 100 ms entre comandos por un intervalo que se
+aprende por modelo de dispositivo y versión de firmware:
+
+- Se parte agresivo (sin pausa) y el intervalo se reduce gradualmente
+  mientras el dispositivo responde bien.
+- Ante un timeout, una trama malformada o un reset de la conexión, el
+  intervalo se duplica (con un mínimo de BACKOFF_FLOOR_MS).
+
+Los intervalos aprendidos se guardan en un archivo JSON para que la
+siguiente ejecución parta del valor conocido para cada dispositivo.
+"""
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+# Límites del intervalo entre comandos (milisegundos)
+MIN_GAP_MS = 0.0
+MAX_GAP_MS = 1000.0
+BACKOFF_FLOOR_MS = 50.0
+BACKOFF_FACTOR = 2.0
+
+# Reducción del intervalo tras una racha de respuestas correctas
+DECREASE_AFTER_SUCCESSES = 10
+DECREASE_FACTOR = 0.75
+SNAP_TO_ZERO_MS = 5.0
+
+# Archivo de persistencia por defecto (vacío = sólo en memoria)
+PACING_FILE_ENV = "DRS_PACING_FILE"
+
+FAILURE_TIMEOUT = "timeout"
+FAILURE_MALFORMED = "malformed"
+FAILURE_RESET = "reset"
+
+
+@dataclass
+class PacingProfile:
+    """Estado aprendido para un par (modelo, firmware)"""
+    gap_ms: float = MIN_GAP_MS
+    streak: int = 0
+    failures: int = 0
+    last_failure: str = ""
+
+
+class PacingController:
+    """
+    Controlador de pausa entre comandos por modelo y firmware.
+
+    Es seguro entre hilos: el validador síncrono ejecuta su event loop en
+    un hilo auxiliar cuando ya hay uno corriendo.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        """
+        Inicializar el controlador.
+
+        Args:
+            path: Archivo JSON donde persistir los perfiles (None = sólo memoria)
+        """
+        self.path = Path(path) if path else None
+        self._profiles: Dict[str, PacingProfile] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    @staticmethod
+    def profile_key(device_model: str, firmware_version: Optional[str] = None) -> str:
+        """Clave del perfil para un modelo y firmware."""
+        return f"{device_model}/{firmware_version or 'unknown'}"
+
+    def _profile(self, key: str) -> PacingProfile:
+        return self._profiles.setdefault(key, PacingProfile())
+
+    def gap_seconds(self, key: str) -> float:
+        """Intervalo actual en segundos a esperar entre comandos."""
+        with self._lock:
+            return self._profile(key).gap_ms / 1000.0
+
+    def record_success(self, key: str):
+        """Registra un comando respondido correctamente."""
+        with self._lock:
+            profile = self._profile(key)
+            profile.streak += 1
+            if profile.streak >= DECREASE_AFTER_SUCCESSES and profile.gap_ms > MIN_GAP_MS:
+                profile.streak = 0
+                profile.gap_ms *= DECREASE_FACTOR
+                if profile.gap_ms < SNAP_TO_ZERO_MS:
+                    profile.gap_ms = MIN_GAP_MS
+
+    def record_failure(self, key: str, reason: str = FAILURE_TIMEOUT):
+        """
+        Registra un fallo de transporte y aumenta el intervalo.
+
+        Args:
+            key: Clave del perfil (ver profile_key)
+            reason: Motivo del fallo (timeout, malformed, reset)
+        """
+        with self._lock:
+            profile = self._profile(key)
+            profile.streak = 0
+            profile.failures += 1
+            profile.last_failure = reason
+            profile.gap_ms = min(MAX_GAP_MS, max(BACKOFF_FLOOR_MS, profile.gap_ms * BACKOFF_FACTOR))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Copia de los perfiles aprendidos."""
+        with self._lock:
+            return {key: asdict(profile) for key, profile in self._profiles.items()}
+
+    def load(self):
+        """Carga los perfiles desde el archivo (si existe)."""
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with self._lock:
+                for key, values in data.items():
+                    self._profiles[key] = PacingProfile(**values)
+        except (OSError, ValueError, TypeError) as e:
+            print(f"Warning: Could not load pacing profiles from {self.path}: {e}")
+
+    def save(self):
+        """Guarda los perfiles en el archivo (escritura atómica)."""
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not save pacing profiles to {self.path}: {e}")
+
+
+_default_controller: Optional[PacingController] = None
+_default_lock = threading.Lock()
+
+
+def get_default_pacing() -> PacingController:
+    """Controlador compartido por el proceso (persistido en $DRS_PACING_FILE si está definido)."""
+    global _default_controller
+    with _default_lock:
+        if _default_controller is None:
+            _default_controller = PacingController(os.environ.get(PACING_FILE_ENV) or None)
+        return _default_controller
+
+
+def configure_default_pacing(path: Optional[Union[str, Path]]) -> PacingController:
+    """Reemplaza el controlador compartido por uno persistido en path."""
+    global _default_controller
+    with _default_lock:
+        _default_controller = PacingController(path)
+        return _default_controller
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Read Cache - Caché de lecturas GET por dispositivo con TTL por comando
+
+Valores como device_id, subband_bandwidth o channel_frequency_configuration
+casi nunca cambian; con la caché, las validaciones repetidas sólo van al
+cable por las métricas volátiles (temperatura, potencias).
+
+- Cada comando tiene su TTL (validation_modes.live.read_cache en
+  validation_scenarios.yaml); TTL 0 = nunca se cachea.
+- La caché es opt-in por petición: sólo se lee con max_staleness.
+- Las lecturas se separan por tipo de comando: un mismo nombre puede
+  enviar tramas distintas en master y remote.
+- Enviar un comando SET a un dispositivo invalida las lecturas afectadas
+  (todas las del dispositivo si el SET no tiene mapeo conocido).
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+CacheKey = Tuple[str, int, str, str]
+
+
+class DeviceReadCache:
+    """Caché de resultados GET decodificados por (ip, puerto, tipo de comando, comando)"""
+
+    def __init__(self, ttl_seconds: Optional[Dict[str, float]] = None, default_ttl_seconds: float = 0):
+        """
+        Inicializar la caché.
+
+        Args:
+            ttl_seconds: TTL por comando en segundos
+            default_ttl_seconds: TTL de los comandos no listados (0 = no cachear)
+        """
+        self.ttl_seconds = dict(ttl_seconds or {})
+        self.default_ttl_seconds = default_ttl_seconds
+        self._entries: Dict[CacheKey, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_scenarios(cls, scenarios=None) -> "DeviceReadCache":
+        """Crea la caché con los TTL de validation_scenarios.yaml."""
+        if scenarios is None:
+            from .scenarios import validation_scenarios as scenarios
+        return cls(**scenarios.get_read_cache_settings())
+
+    def ttl_for(self, command: str) -> float:
+        """TTL en segundos de un comando."""
+        return self.ttl_seconds.get(command, self.default_ttl_seconds)
+
+    def get(
+        self,
+        ip_address: str,
+        port: int,
+        command_type: str,
+        command: str,
+        max_staleness: float
+    ) -> Optional[Tuple[Any, float]]:
+        """
+        Busca una lectura vigente.
+
+        Args:
+            command_type: Tipo de comando de la lectura (master, remote)
+            max_staleness: Antigüedad máxima aceptada por el solicitante (segundos)
+
+        Returns:
+            (valor, antigüedad en segundos) o None si no hay lectura vigente
+        """
+        limit = min(self.ttl_for(command), max_staleness)
+        with self._lock:
+            entry = self._entries.get((ip_address, port, command_type, command))
+            if entry is not None:
+                age = time.monotonic() - entry[0]
+                if age <= limit:
+                    self.hits += 1
+                    return entry[1], age
+            self.misses += 1
+            return None
+
+    def put(self, ip_address: str, port: int, command_type: str, command: str, value: Any):
+        """Guarda una lectura (ignorada si el comando tiene TTL 0)."""
+        if self.ttl_for(command) <= 0:
+            return
+        with self._lock:
+            self._entries[(ip_address, port, command_type, command)] = (time.monotonic(), value)
+
+    def invalidate(self, ip_address: str, port: int, commands: Optional[List[str]] = None) -> int:
+        """
+        Invalida lecturas de un dispositivo, de todos los tipos de comando.
+
+        Args:
+            commands: Comandos a invalidar (None = todas las lecturas del dispositivo)
+
+        Returns:
+            Cantidad de entradas eliminadas
+        """
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if key[0] == ip_address and key[1] == port and (commands is None or key[3] in commands)
+            ]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de uso de la caché."""
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_default_cache: Optional[DeviceReadCache] = None
+_default_lock = threading.Lock()
+
+
+def get_read_cache() -> DeviceReadCache:
+    """Caché de lecturas compartida por el proceso."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = DeviceReadCache.from_scenarios()
+        return _default_cache
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Read-back - Verificación de comandos SET por lectura del parámetro escrito
+
+Un SET sólo confirma que el dispositivo respondió. En modo read-back,
+tras cada SET se envía por la misma conexión el comando GET que lee el
+parámetro modificado (datt tras set_attenuation, channel_switch tras
+set_channels, ...) y se comparan los valores decodificados con los
+escritos: una ida y vuelta extra por SET en lugar de un batch GET completo.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from .frame_reader import END_FLAG, HEADER_LENGTH, LENGTH_BYTE_INDEX, unescape_frame_content
+from .hex_frames import get_set_command_readback
+
+# Byte de modo de trabajo (set_working_mode / broadband_switching)
+WORKING_MODES = {0x02: "wideband", 0x03: "channel"}
+
+CHANNEL_COUNT = 16
+
+
+def frame_payload(frame: bytes) -> bytes:
+    """
+    Datos de una trama Santone (7E + 6 bytes de cabecera, el último es la longitud).
+
+    El contenido se desescapa antes de cortar: un 0x5E o 0x7E en los datos
+    (p. ej. 23.5 o 31.5 dB de atenuación) viaja como 5E 5D / 5E 7D.
+    """
+    content = unescape_frame_content(frame[1:-1] if frame[-1:] == bytes([END_FLAG]) else frame[1:])
+    if len(content) < HEADER_LENGTH:
+        return b""
+    return content[HEADER_LENGTH:HEADER_LENGTH + content[LENGTH_BYTE_INDEX - 1]]
+
+
+def _device_type(set_command: str) -> str:
+    # Las atenuaciones DRU (remotas) llevan uplink primero; el resto usa el orden DMU
+    return "dru" if set_command.startswith("remote_") or set_command.endswith("_dru") else "dmu"
+
+
+def _decode_working_mode(payload: bytes, set_command: str) -> Dict[str, Any]:
+    if not payload:
+        return {}
+    return {"working_mode": WORKING_MODES.get(payload[0], f"0x{payload[0]:02X}")}
+
+
+def _decode_attenuation(payload: bytes, set_command: str) -> Dict[str, Any]:
+    if len(payload) < 2:
+        return {}
+    first, second = payload[0] / 4, payload[1] / 4
+    if _device_type(set_command) == "dmu":
+        return {"downlink_db": first, "uplink_db": second}
+    return {"uplink_db": first, "downlink_db": second}
+
+
+def _decode_channels(payload: bytes, set_command: str) -> Dict[str, Any]:
+    if len(payload) < CHANNEL_COUNT:
+        return {}
+    # 00 = canal encendido, 01 = apagado
+    return {"channels_on": [i + 1 for i, state in enumerate(payload[:CHANNEL_COUNT]) if state == 0x00]}
+
+
+def _decode_frequencies(payload: bytes, set_command: str) -> Dict[str, Any]:
+    if len(payload) < CHANNEL_COUNT * 4:
+        return {}
+    frequencies = [
+        int.from_bytes(payload[i * 4:i * 4 + 4], byteorder="little") / 10000
+        for i in range(CHANNEL_COUNT)
+    ]
+    return {"frequencies_mhz": frequencies}
+
+
+# Comando GET de lectura -> decodificador del parámetro (mismo formato que los datos del SET)
+READBACK_DECODERS: Dict[str, Callable[[bytes, str], Dict[str, Any]]] = {
+    "broadband_switching": _decode_working_mode,
+    "datt": _decode_attenuation,
+    "channel_switch": _decode_channels,
+    "channel_frequency_configuration": _decode_frequencies,
+}
+
+
+@dataclass
+class ReadbackCheck:
+    """Lectura que confirma un comando SET y los valores que debe devolver"""
+    set_command: str
+    get_command: str
+    expected: Dict[str, Any] = field(default_factory=dict)
+
+    def verify(self, response: Optional[bytes]) -> Dict[str, Any]:
+        """
+        Compara la respuesta del GET con los valores escritos.
+
+        Returns:
+            {"command", "expected", "actual", "match", "mismatches"}
+        """
+        actual = READBACK_DECODERS[self.get_command](frame_payload(response), self.set_command) if response else {}
+        mismatches = [
+            f"{key}: wrote {value}, read {actual.get(key, 'nothing')}"
+            for key, value in self.expected.items()
+            if actual.get(key) != value
+        ]
+        return {
+            "command": self.get_command,
+            "expected": self.expected,
+            "actual": actual,
+            "match": not mismatches,
+            "mismatches": mismatches
+        }
+
+
+def plan_readback(set_command: str, set_frame: str) -> Optional[ReadbackCheck]:
+    """
+    Lectura de confirmación de un comando SET.
+
+    Args:
+        set_command: Nombre del comando SET (master o remote_)
+        set_frame: Trama hexadecimal enviada
+
+    Returns:
+        ReadbackCheck o None si el SET no tiene lectura verificable
+    """
+    readback = get_set_command_readback(set_command)
+    if not readback or readback[0] not in READBACK_DECODERS:
+        return None
+    get_command = readback[0]
+    try:
+        payload = frame_payload(bytes.fromhex(set_frame))
+    except ValueError:
+        return None
+    expected = READBACK_DECODERS[get_command](payload, set_command)
+    if not expected:
+        return None
+    return ReadbackCheck(set_command, get_command, expected)
+
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Resilience - Reintentos con backoff y circuit breaker por dispositivo
+
+- RetryPolicy: reintenta errores transitorios del modo live (timeout,
+  CRC inválido, reset) con backoff exponencial y jitter completo, de modo
+  que varios validadores no reintenten sincronizados contra el mismo equipo.
+- CircuitBreaker: por IP; se abre tras N fallos consecutivos, deja pasar
+  una sola sonda (half-open) cuando vence reset_timeout y se cierra si la
+  sonda responde. Mientras está abierto, el batch no envía comandos.
+"""
+
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Estados del circuit breaker
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class RetryPolicy:
+    """Política de reintentos con backoff exponencial y jitter completo"""
+
+    def __init__(self, max_retries: int = 3, base_delay_seconds: float = 0.1, max_delay_seconds: float = 2.0):
+        """
+        Inicializar la política.
+
+        Args:
+            max_retries: Reintentos por comando tras el primer intento (0 = sin reintentos)
+            base_delay_seconds: Espera base del primer reintento
+            max_delay_seconds: Espera máxima entre reintentos
+        """
+        self.max_retries = max(0, max_retries)
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+
+    @classmethod
+    def from_scenarios(cls, scenarios=None) -> "RetryPolicy":
+        """Crea la política con validation_modes.live de validation_scenarios.yaml."""
+        if scenarios is None:
+            from .scenarios import validation_scenarios as scenarios
+        return cls(**scenarios.get_retry_settings())
+
+    def delay_for(self, attempt: int) -> float:
+        """
+        Espera antes del reintento número attempt (1 = primer reintento).
+
+        Jitter completo: uniforme entre 0 y min(max_delay, base * 2^(attempt-1)).
+        """
+        ceiling = min(self.max_delay_seconds, self.base_delay_seconds * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """Circuit breaker de un dispositivo"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_seconds: float = 30.0):
+        """
+        Inicializar el breaker.
+
+        Args:
+            failure_threshold: Fallos consecutivos que abren el circuito
+            reset_timeout_seconds: Tiempo abierto antes de permitir una sonda
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """
+        Indica si se puede enviar un comando al dispositivo.
+
+        En half-open sólo se permite una sonda a la vez.
+        """
+        with self._lock:
+            if self.state == CIRCUIT_OPEN:
+                if time.time() - self.opened_at < self.reset_timeout_seconds:
+                    return False
+                self.state = CIRCUIT_HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == CIRCUIT_HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        """Registra una respuesta válida (cierra el circuito)."""
+        with self._lock:
+            self.state = CIRCUIT_CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Registra un fallo; abre el circuito al alcanzar el umbral o si falla la sonda."""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == CIRCUIT_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = CIRCUIT_OPEN
+                self.opened_at = time.time()
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """
+        Libera la sonda half-open si el comando terminó sin veredicto del dispositivo.
+
+        Cubre resultados que no son éxito ni fallo del dispositivo (FAIL, SKIPPED,
+        caché, error local de trama, cancelación): el circuito sigue en half-open y
+        el siguiente comando puede sondear. Sin sonda en curso no hace nada.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Estado serializable JSON."""
+        with self._lock:
+            retry_in = None
+            if self.state == CIRCUIT_OPEN:
+                retry_in = max(0.0, round(self.reset_timeout_seconds - (time.time() - self.opened_at), 1))
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "retry_in_seconds": retry_in
+            }
+
+
+class CircuitBreakerRegistry:
+    """Circuit breakers por IP de dispositivo"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_scenarios(cls, scenarios=None) -> "CircuitBreakerRegistry":
+        """Crea el registro con validation_modes.live.circuit_breaker."""
+        if scenarios is None:
+            from .scenarios import validation_scenarios as scenarios
+        return cls(**scenarios.get_circuit_breaker_settings())
+
+    def get(self, ip_address: str) -> CircuitBreaker:
+        """Breaker del dispositivo (se crea cerrado si no existe)."""
+        with self._lock:
+            breaker = self._breakers.get(ip_address)
+            if breaker is None:
+                breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout_seconds)
+                self._breakers[ip_address] = breaker
+            return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Estado de todos los breakers conocidos."""
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {ip: breaker.to_dict() for ip, breaker in breakers.items()}
+
+
+_default_breakers: Optional[CircuitBreakerRegistry] = None
+_default_lock = threading.Lock()
+
+
+def get_default_breakers() -> CircuitBreakerRegistry:
+    """Registro de breakers compartido por el proceso."""
+    global _default_breakers
+    with _default_lock:
+        if _default_breakers is None:
+            _default_breakers = CircuitBreakerRegistry.from_scenarios()
+        return _default_breakers
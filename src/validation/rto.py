@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+RTO Estimator - Timeouts de respuesta adaptativos por dispositivo y comando
+
+Calcula el timeout de cada comando a partir del RTT medido, al estilo del
+RTO de TCP (RFC 6298):
+
+    SRTT   = (1 - ALPHA) * SRTT + ALPHA * RTT
+    RTTVAR = (1 - BETA) * RTTVAR + BETA * |SRTT - RTT|
+    RTO    = SRTT + K * RTTVAR      (limitado a [min_seconds, max_seconds])
+
+Sin mediciones se usa el timeout inicial de la configuración de escenarios.
+Tras un timeout el RTO de ese comando se duplica (backoff) hasta la
+siguiente respuesta válida. Así un dispositivo caído falla en cientos de
+milisegundos y un remoto lento al final de una cadena de fibra no produce
+timeouts falsos.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# Constantes de RFC 6298
+ALPHA = 1 / 8
+BETA = 1 / 4
+K = 4
+
+# Valores por defecto si la configuración no los define (segundos)
+DEFAULT_INITIAL_SECONDS = 3.0
+DEFAULT_MIN_SECONDS = 0.2
+DEFAULT_MAX_SECONDS = 15.0
+
+# Duplicaciones máximas del RTO tras timeouts consecutivos
+MAX_BACKOFF = 6
+
+
+@dataclass
+class RTTStats:
+    """Estadísticas de RTT suavizadas para una clave"""
+    srtt: float
+    rttvar: float
+    samples: int = 1
+    backoff: int = 0
+
+
+class RTOEstimator:
+    """
+    Estimador de timeouts por (ip, comando) con respaldo por dispositivo.
+
+    Es seguro entre hilos para poder compartirse entre el validador
+    asíncrono y el síncrono.
+    """
+
+    def __init__(
+        self,
+        initial_seconds: float = DEFAULT_INITIAL_SECONDS,
+        min_seconds: float = DEFAULT_MIN_SECONDS,
+        max_seconds: float = DEFAULT_MAX_SECONDS
+    ):
+        """
+        Inicializar el estimador.
+
+        Args:
+            initial_seconds: Timeout usado antes de tener mediciones
+            min_seconds: Límite inferior del timeout calculado
+            max_seconds: Límite superior del timeout calculado
+        """
+        self.min_seconds = min_seconds
+        self.max_seconds = max(max_seconds, min_seconds)
+        self.initial_seconds = self._clamp(initial_seconds)
+        self._stats: Dict[Tuple[str, Optional[str]], RTTStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_scenarios(cls, scenarios=None) -> "RTOEstimator":
+        """
+        Crea un estimador con los límites de validation_scenarios.yaml.
+
+        Args:
+            scenarios: Instancia de ValidationScenarios (None = la global)
+        """
+        if scenarios is None:
+            from .scenarios import validation_scenarios as scenarios
+        return cls(**scenarios.get_response_timeouts())
+
+    def _clamp(self, seconds: float) -> float:
+        return min(self.max_seconds, max(self.min_seconds, seconds))
+
+    def timeout_for(self, ip_address: str, command: Optional[str] = None) -> float:
+        """
+        Timeout en segundos para un comando (o para el dispositivo si command es None).
+
+        Sin mediciones del comando se usa la estadística del dispositivo y,
+        en su defecto, el timeout inicial.
+        """
+        with self._lock:
+            stats = self._stats.get((ip_address, command))
+            if stats is None and command is not None:
+                stats = self._stats.get((ip_address, None))
+            return self._rto(stats)
+
+    def _rto(self, stats: Optional[RTTStats]) -> float:
+        if stats is None:
+            return self.initial_seconds
+        return self._clamp((stats.srtt + K * stats.rttvar) * (2 ** stats.backoff))
+
+    def record_sample(self, ip_address: str, command: Optional[str], rtt_seconds: float):
+        """Registra un RTT medido para el comando y para el dispositivo."""
+        with self._lock:
+            for key in ((ip_address, command), (ip_address, None)):
+                stats = self._stats.get(key)
+                if stats is None:
+                    self._stats[key] = RTTStats(srtt=rtt_seconds, rttvar=rtt_seconds / 2)
+                    continue
+                stats.rttvar = (1 - BETA) * stats.rttvar + BETA * abs(stats.srtt - rtt_seconds)
+                stats.srtt = (1 - ALPHA) * stats.srtt + ALPHA * rtt_seconds
+                stats.samples += 1
+                stats.backoff = 0
+
+    def record_timeout(self, ip_address: str, command: Optional[str] = None):
+        """Duplica el RTO del comando tras un timeout (sin efecto si aún no hay mediciones)."""
+        with self._lock:
+            stats = self._stats.get((ip_address, command))
+            if stats is not None and stats.backoff < MAX_BACKOFF:
+                stats.backoff += 1
+
+    def snapshot(self, ip_address: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Estadísticas actuales (opcionalmente sólo de un dispositivo)."""
+        with self._lock:
+            return {
+                f"{ip}/{command or '*'}": {
+                    "srtt_ms": round(stats.srtt * 1000, 1),
+                    "rttvar_ms": round(stats.rttvar * 1000, 1),
+                    "samples": stats.samples,
+                    "timeout_ms": round(self._rto(stats) * 1000)
+                }
+                for (ip, command), stats in self._stats.items()
+                if ip_address is None or ip == ip_address
+            }
+
+
+_default_estimator: Optional[RTOEstimator] = None
+_default_lock = threading.Lock()
+
+
+def get_default_rto() -> RTOEstimator:
+    """Estimador compartido por el proceso, sembrado desde validation_scenarios.yaml."""
+    global _default_estimator
+    with _default_lock:
+        if _default_estimator is None:
+            _default_estimator = RTOEstimator.from_scenarios()
+        return _default_estimator
@@ -92,6 +92,98 @@ class ValidationScenarios:
         """Obtener solo escenarios habilitados."""
         scenarios = self.get_all_scenarios()
         return [s for s in scenarios if s.get("enabled", False)]
+    
+    def get_response_timeouts(self) -> Dict[str, float]:
+        """
+        Obtener los límites de timeout de respuesta para el modo live.
+        
+        Lee validation_modes.live.response_timeouts; si no define max_seconds
+        se usa network_timeout del modo live y, en su defecto, el mayor
+        response_timeout_seconds de los escenarios.
+        """
+        live = self.scenarios.get("validation_modes", {}).get("live", {})
+        config = live.get("response_timeouts", {}) or {}
+        scenario_timeouts = [
+            s.get("validation_criteria", {}).get("response_timeout_seconds")
+            for s in self.get_all_scenarios()
+        ]
+        scenario_timeouts = [t for t in scenario_timeouts if t]
+        
+        timeouts = {
+            "initial_seconds": float(config.get("initial_seconds", 3)),
+            "min_seconds": float(config.get("min_seconds", 0.2))
+        }
+        max_seconds = (
+            config.get("max_seconds")
+            or live.get("network_timeout")
+            or (max(scenario_timeouts) if scenario_timeouts else None)
+        )
+        if max_seconds:
+            timeouts["max_seconds"] = float(max_seconds)
+        return timeouts
+    
+    def get_retry_settings(self) -> Dict[str, float]:
+        """Obtener la política de reintentos del modo live (max_retries y backoff)."""
+        live = self.scenarios.get("validation_modes", {}).get("live", {})
+        backoff = live.get("retry_backoff", {}) or {}
+        return {
+            "max_retries": int(live.get("max_retries", 3)),
+            "base_delay_seconds": float(backoff.get("base_delay_seconds", 0.1)),
+            "max_delay_seconds": float(backoff.get("max_delay_seconds", 2.0))
+        }
+    
+    def get_read_cache_settings(self) -> Dict[str, Any]:
+        """Obtener los TTL por comando de la caché de lecturas del modo live."""
+        live = self.scenarios.get("validation_modes", {}).get("live", {})
+        cache = live.get("read_cache", {}) or {}
+        return {
+            "ttl_seconds": {command: float(ttl) for command, ttl in (cache.get("ttl_seconds") or {}).items()},
+            "default_ttl_seconds": float(cache.get("default_ttl_seconds", 0))
+        }
+    
+    def get_circuit_breaker_settings(self) -> Dict[str, float]:
+        """Obtener los umbrales del circuit breaker por dispositivo del modo live."""
+        live = self.scenarios.get("validation_modes", {}).get("live", {})
+        breaker = live.get("circuit_breaker", {}) or {}
+        return {
+            "failure_threshold": int(breaker.get("failure_threshold", 5)),
+            "reset_timeout_seconds": float(breaker.get("reset_timeout_seconds", 30))
+        }
+    
+    def get_tiered_settings(self) -> Dict[str, Any]:
+        """Obtener la sonda de salud de la validación escalonada (comandos, rangos y escalado)."""
+        tiered = self.scenarios.get("validation_modes", {}).get("tiered", {}) or {}
+        probe = tiered.get("probe") or {"device_id": {}, "temperature": {}, "input_and_output_power": {}}
+        return {
+            "probe": {command: dict(limits or {}) for command, limits in probe.items()},
+            "escalate_to_set": bool(tiered.get("escalate_to_set", False))
+        }
+    
+    def get_fleet_settings(self) -> Dict[str, int]:
+        """Obtener los máximos del servidor para validaciones de flota."""
+        fleet = self.scenarios.get("validation_modes", {}).get("fleet", {}) or {}
+        return {
+            "max_devices": int(fleet.get("max_devices", 256)),
+            "max_concurrency": int(fleet.get("max_concurrency", 32)),
+            "per_site_concurrency": int(fleet.get("per_site_concurrency", 8))
+        }
+    
+    def get_mock_latency_profile(self, name: str = None) -> Dict[str, Any]:
+        """
+        Obtener un perfil de latencia del modo mock.
+        
+        Args:
+            name: Nombre del perfil (None = validation_modes.mock.latency_profile)
+        """
+        mock = self.scenarios.get("validation_modes", {}).get("mock", {})
+        profiles = mock.get("latency_profiles", {}) or {}
+        name = name or mock.get("latency_profile", "realistic")
+        if name not in profiles:
+            if name != "realistic":
+                raise ValueError(f"Perfil de latencia mock desconocido: {name}")
+            # Comportamiento histórico: 50-200 ms por comando
+            return {"model": "random", "min_ms": 50, "max_ms": 200, "setup_ms": 500}
+        return dict(profiles[name])
 
 # Instancia global para usar en la API
 validation_scenarios = ValidationScenarios()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Single Flight - Coalescencia de lecturas idénticas en curso
+
+Si varias peticiones piden el mismo comando GET al mismo dispositivo
+mientras una ya está en el cable, todas esperan y comparten ese único
+intercambio en lugar de generar uno cada una.
+
+El resultado compartido es un concurrent.futures.Future para que llamadas
+desde distintos event loops (API síncrona en hilo auxiliar y endpoints
+async) puedan coalescer entre sí.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """
+    Ejecuta una sola llamada por clave a la vez y comparte su resultado.
+
+    Uso:
+        result, shared = await single_flight.run(key, lambda: fetch())
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Ejecuta call, o espera la ejecución en curso con la misma clave.
+
+        Returns:
+            (resultado, compartido) donde compartido indica que se reutilizó
+            la llamada de otro solicitante
+        """
+        with self._lock:
+            shared = self._in_flight.get(key)
+            leader = shared is None
+            if leader:
+                shared = self._in_flight[key] = concurrent.futures.Future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            try:
+                # shield: cancelar a un seguidor no debe cancelar el resultado compartido
+                return await asyncio.shield(asyncio.wrap_future(shared)), True
+            except asyncio.CancelledError:
+                if not shared.cancelled():
+                    raise
+            # El líder fue cancelado: este solicitante hace su propia llamada
+            return await call(), False
+
+        try:
+            result = await call()
+        except BaseException as e:
+            self._finish(key, shared)
+            if isinstance(e, asyncio.CancelledError):
+                shared.cancel()
+            else:
+                shared.set_exception(e)
+            raise
+        self._finish(key, shared)
+        shared.set_result(result)
+        return result, False
+
+    def _finish(self, key: Hashable, shared: concurrent.futures.Future):
+        # Se retira antes de publicar el resultado: peticiones posteriores hacen un intercambio nuevo
+        with self._lock:
+            if self._in_flight.get(key) is shared:
+                del self._in_flight[key]
+
+    def in_flight(self) -> int:
+        """Cantidad de claves con una llamada en curso."""
+        with self._lock:
+            return len(self._in_flight)
+
+
+_default_single_flight: Optional[SingleFlight] = None
+_default_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Registro single-flight compartido por el proceso."""
+    global _default_single_flight
+    with _default_lock:
+        if _default_single_flight is None:
+            _default_single_flight = SingleFlight()
+        return _default_single_flight
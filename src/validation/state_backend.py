@@ -0,0 +1,495 @@
+# -*- coding: utf-8 -*-
+"""
+State Backend - Estado compartido entre workers de la API
+
+Con `uvicorn --workers N`, cada proceso tiene su propio estado en memoria:
+un poll de estado o un WebSocket pueden llegar a un worker que nunca vio
+el client_id. El backend guarda en un lugar común:
+
+- Estado de tareas de validación (active_tasks)
+- Logs de cada validación, para reenviarlos desde el worker que tenga el WebSocket
+- Clientes WebSocket conectados
+- Cancelaciones solicitadas (el worker que ejecuta la validación la aborta)
+- Locks por dispositivo con expiración (un solo worker habla con cada equipo)
+
+Backends:
+- memory (por defecto): sólo este proceso, sin cambios de comportamiento
+- sqlite:///ruta/estado.db: procesos del mismo host (WAL)
+- redis://host:puerto/db: requiere el paquete opcional redis
+
+Se elige con la variable de entorno DRS_STATE_BACKEND.
+
+SQLite y Redis hacen E/S bloqueante: desde código async se llaman con
+call_backend(), que las ejecuta en un hilo.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections.abc import MutableMapping
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+STATE_BACKEND_ENV = "DRS_STATE_BACKEND"
+
+# Ruta de la base SQLite si DRS_STATE_BACKEND=sqlite sin ruta
+DEFAULT_SQLITE_PATH = Path(tempfile.gettempdir()) / "drs_validator_state.db"
+
+# Logs más antiguos que esto se descartan (segundos)
+LOG_RETENTION_SECONDS = 3600
+# Expiración de la marca de WebSocket conectado si el worker muere sin limpiarla
+CONNECTION_TTL_SECONDS = 3600
+# Expiración de un lock de dispositivo si su dueño deja de renovarlo
+DEVICE_LOCK_TTL_SECONDS = 900
+# Cancelaciones no atendidas se descartan tras este tiempo (segundos)
+CANCEL_TTL_SECONDS = 3600
+# Intervalo de sondeo de logs y locks compartidos
+POLL_SECONDS = 0.1
+
+
+class StateBackend:
+    """
+    Backend en memoria del proceso (por defecto).
+
+    Define la interfaz común; shared indica si el estado es visible para
+    otros procesos.
+    """
+
+    shared = False
+
+    def __init__(self):
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._logs: Dict[str, List[Tuple[int, str]]] = {}
+        self._connections: set = set()
+        self._cancels: set = set()
+        self._locks: Dict[str, Tuple[str, float]] = {}
+        self._next_log_id = 0
+        self._lock = threading.Lock()
+
+    # Estado de tareas
+
+    def set_task(self, task_id: str, data: Dict[str, Any]):
+        with self._lock:
+            self._tasks[task_id] = data
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._tasks.get(task_id)
+
+    def delete_task(self, task_id: str):
+        with self._lock:
+            self._tasks.pop(task_id, None)
+
+    def task_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._tasks)
+
+    # Logs por canal (client_id)
+
+    def publish_log(self, channel: str, message: str) -> int:
+        """Agrega un mensaje al canal y retorna su id (creciente)."""
+        with self._lock:
+            self._next_log_id += 1
+            self._logs.setdefault(channel, []).append((self._next_log_id, message))
+            return self._next_log_id
+
+    def read_logs(self, channel: str, after: int = 0) -> List[Tuple[int, str]]:
+        """Mensajes del canal con id mayor que after, en orden."""
+        with self._lock:
+            return [entry for entry in self._logs.get(channel, []) if entry[0] > after]
+
+    def clear_logs(self, channel: str):
+        with self._lock:
+            self._logs.pop(channel, None)
+
+    # Clientes WebSocket
+
+    def set_connected(self, client_id: str, connected: bool):
+        with self._lock:
+            if connected:
+                self._connections.add(client_id)
+            else:
+                self._connections.discard(client_id)
+
+    def is_connected(self, client_id: str) -> bool:
+        with self._lock:
+            return client_id in self._connections
+
+    # Cancelaciones
+
+    def request_cancel(self, task_id: str):
+        with self._lock:
+            self._cancels.add(task_id)
+
+    def is_cancel_requested(self, task_id: str) -> bool:
+        with self._lock:
+            return task_id in self._cancels
+
+    def clear_cancel(self, task_id: str):
+        with self._lock:
+            self._cancels.discard(task_id)
+
+    # Locks con expiración
+
+    def try_lock(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        """Toma el lock si está libre o vencido; si ya es de owner, renueva su expiración."""
+        now = time.time()
+        with self._lock:
+            holder = self._locks.get(name)
+            if holder and holder[0] != owner and holder[1] > now:
+                return False
+            self._locks[name] = (owner, now + ttl_seconds)
+            return True
+
+    def unlock(self, name: str, owner: str):
+        with self._lock:
+            holder = self._locks.get(name)
+            if holder and holder[0] == owner:
+                del self._locks[name]
+
+
+class SQLiteStateBackend(StateBackend):
+    """Estado compartido por los procesos de un mismo host en una base SQLite (WAL)"""
+
+    shared = True
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # isolation_level=None: transacciones explícitas (BEGIN IMMEDIATE para locks)
+        self._db = sqlite3.connect(str(self.path), timeout=5, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS tasks (id TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL);
+                CREATE TABLE IF NOT EXISTS logs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL,
+                    message TEXT NOT NULL, created REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS logs_channel ON logs (channel, id);
+                CREATE TABLE IF NOT EXISTS connections (client_id TEXT PRIMARY KEY, expires REAL NOT NULL);
+                CREATE TABLE IF NOT EXISTS cancels (id TEXT PRIMARY KEY, expires REAL NOT NULL);
+                CREATE TABLE IF NOT EXISTS locks (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL);
+            """)
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._db.execute(sql, params)
+
+    def _fetch(self, sql: str, params: tuple = ()) -> List[tuple]:
+        # Se lee dentro del lock: la conexión es compartida entre hilos
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def set_task(self, task_id: str, data: Dict[str, Any]):
+        self._execute(
+            "INSERT OR REPLACE INTO tasks (id, data, updated) VALUES (?, ?, ?)",
+            (task_id, json.dumps(data, default=str), time.time())
+        )
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._fetch("SELECT data FROM tasks WHERE id = ?", (task_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def delete_task(self, task_id: str):
+        self._execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def task_ids(self) -> List[str]:
+        return [row[0] for row in self._fetch("SELECT id FROM tasks ORDER BY updated")]
+
+    def publish_log(self, channel: str, message: str) -> int:
+        now = time.time()
+        log_id = self._execute(
+            "INSERT INTO logs (channel, message, created) VALUES (?, ?, ?)", (channel, message, now)
+        ).lastrowid
+        if log_id % 1000 == 0:
+            self._execute("DELETE FROM logs WHERE created < ?", (now - LOG_RETENTION_SECONDS,))
+        return log_id
+
+    def read_logs(self, channel: str, after: int = 0) -> List[Tuple[int, str]]:
+        return self._fetch(
+            "SELECT id, message FROM logs WHERE channel = ? AND id > ? ORDER BY id", (channel, after)
+        )
+
+    def clear_logs(self, channel: str):
+        self._execute("DELETE FROM logs WHERE channel = ?", (channel,))
+
+    def set_connected(self, client_id: str, connected: bool):
+        if connected:
+            self._execute(
+                "INSERT OR REPLACE INTO connections (client_id, expires) VALUES (?, ?)",
+                (client_id, time.time() + CONNECTION_TTL_SECONDS)
+            )
+        else:
+            self._execute("DELETE FROM connections WHERE client_id = ?", (client_id,))
+
+    def is_connected(self, client_id: str) -> bool:
+        return bool(self._fetch(
+            "SELECT 1 FROM connections WHERE client_id = ? AND expires > ?", (client_id, time.time())
+        ))
+
+    def request_cancel(self, task_id: str):
+        self._execute(
+            "INSERT OR REPLACE INTO cancels (id, expires) VALUES (?, ?)", (task_id, time.time() + CANCEL_TTL_SECONDS)
+        )
+
+    def is_cancel_requested(self, task_id: str) -> bool:
+        return bool(self._fetch("SELECT 1 FROM cancels WHERE id = ? AND expires > ?", (task_id, time.time())))
+
+    def clear_cancel(self, task_id: str):
+        self._execute("DELETE FROM cancels WHERE id = ?", (task_id,))
+
+    def try_lock(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        now = time.time()
+        with self._lock:
+            # Si BEGIN falla (p. ej. base ocupada) no hay transacción que deshacer
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute("SELECT owner, expires FROM locks WHERE name = ?", (name,)).fetchone()
+                acquired = row is None or row[0] == owner or row[1] <= now
+                if acquired:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO locks (name, owner, expires) VALUES (?, ?, ?)",
+                        (name, owner, now + ttl_seconds)
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                # Un fallo del ROLLBACK no debe ocultar el error original
+                if self._db.in_transaction:
+                    try:
+                        self._db.execute("ROLLBACK")
+                    except sqlite3.Error:
+                        pass
+                raise
+        return acquired
+
+    def unlock(self, name: str, owner: str):
+        self._execute("DELETE FROM locks WHERE name = ? AND owner = ?", (name, owner))
+
+
+class RedisStateBackend(StateBackend):
+    """Estado compartido en un servidor Redis (o compatible); requiere el paquete redis"""
+
+    shared = True
+
+    # Libera el lock sólo si sigue siendo del mismo dueño
+    _UNLOCK_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+    # Renueva la expiración sólo si el lock sigue siendo del mismo dueño
+    _RENEW_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) end return 0"
+
+    def __init__(self, url: str, prefix: str = "drs:"):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package not installed (pip install redis)")
+        super().__init__()
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    def _key(self, *parts: str) -> str:
+        return self.prefix + ":".join(parts)
+
+    def set_task(self, task_id: str, data: Dict[str, Any]):
+        self.client.hset(self._key("tasks"), task_id, json.dumps(data, default=str))
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        data = self.client.hget(self._key("tasks"), task_id)
+        return json.loads(data) if data else None
+
+    def delete_task(self, task_id: str):
+        self.client.hdel(self._key("tasks"), task_id)
+
+    def task_ids(self) -> List[str]:
+        return list(self.client.hkeys(self._key("tasks")))
+
+    def publish_log(self, channel: str, message: str) -> int:
+        key = self._key("logs", channel)
+        log_id = self.client.rpush(key, message)
+        self.client.expire(key, LOG_RETENTION_SECONDS)
+        return log_id
+
+    def read_logs(self, channel: str, after: int = 0) -> List[Tuple[int, str]]:
+        # Los ids son la posición (1-based) en la lista del canal
+        messages = self.client.lrange(self._key("logs", channel), after, -1)
+        return [(after + index, message) for index, message in enumerate(messages, 1)]
+
+    def clear_logs(self, channel: str):
+        self.client.delete(self._key("logs", channel))
+
+    def set_connected(self, client_id: str, connected: bool):
+        key = self._key("connections", client_id)
+        if connected:
+            self.client.set(key, 1, ex=CONNECTION_TTL_SECONDS)
+        else:
+            self.client.delete(key)
+
+    def is_connected(self, client_id: str) -> bool:
+        return bool(self.client.exists(self._key("connections", client_id)))
+
+    def request_cancel(self, task_id: str):
+        self.client.set(self._key("cancels", task_id), 1, ex=CANCEL_TTL_SECONDS)
+
+    def is_cancel_requested(self, task_id: str) -> bool:
+        return bool(self.client.exists(self._key("cancels", task_id)))
+
+    def clear_cancel(self, task_id: str):
+        self.client.delete(self._key("cancels", task_id))
+
+    def try_lock(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        key = self._key("locks", name)
+        ttl_ms = int(ttl_seconds * 1000)
+        if self.client.set(key, owner, nx=True, px=ttl_ms):
+            return True
+        return bool(self.client.eval(self._RENEW_SCRIPT, 1, key, owner, ttl_ms))
+
+    def unlock(self, name: str, owner: str):
+        self.client.eval(self._UNLOCK_SCRIPT, 1, self._key("locks", name), owner)
+
+
+class TaskStatusMap(MutableMapping):
+    """Vista tipo dict del estado de tareas guardado en un backend"""
+
+    def __init__(self, backend: StateBackend):
+        self.backend = backend
+
+    def __getitem__(self, task_id: str) -> Dict[str, Any]:
+        data = self.backend.get_task(task_id)
+        if data is None:
+            raise KeyError(task_id)
+        return data
+
+    def __setitem__(self, task_id: str, data: Dict[str, Any]):
+        self.backend.set_task(task_id, data)
+
+    def __delitem__(self, task_id: str):
+        if self.backend.get_task(task_id) is None:
+            raise KeyError(task_id)
+        self.backend.delete_task(task_id)
+
+    def __iter__(self):
+        return iter(self.backend.task_ids())
+
+    def __len__(self) -> int:
+        return len(self.backend.task_ids())
+
+    def __contains__(self, task_id) -> bool:
+        return self.backend.get_task(task_id) is not None
+
+
+class CancelRequests:
+    """Vista tipo set de las cancelaciones solicitadas guardadas en un backend"""
+
+    def __init__(self, backend: StateBackend):
+        self.backend = backend
+
+    def add(self, task_id: str):
+        self.backend.request_cancel(task_id)
+
+    def discard(self, task_id: str):
+        self.backend.clear_cancel(task_id)
+
+    def __contains__(self, task_id) -> bool:
+        return self.backend.is_cancel_requested(task_id)
+
+
+async def call_backend(backend: StateBackend, method, *args):
+    """
+    Llama a un método del backend sin bloquear el event loop.
+
+    Los backends compartidos (SQLite, Redis) hacen E/S bloqueante y se
+    ejecutan en un hilo; el de memoria se llama directamente.
+    """
+    if backend.shared:
+        return await asyncio.to_thread(method, *args)
+    return method(*args)
+
+
+def create_state_backend(url: Optional[str] = None) -> StateBackend:
+    """
+    Crea un backend a partir de su URL.
+
+    Args:
+        url: "memory", "sqlite" (ruta por defecto), "sqlite:///ruta.db" o
+             "redis://host:puerto/db" (None = $DRS_STATE_BACKEND o memory)
+    """
+    url = url or os.environ.get(STATE_BACKEND_ENV) or "memory"
+    if url == "memory":
+        return StateBackend()
+    if url == "sqlite":
+        return SQLiteStateBackend(DEFAULT_SQLITE_PATH)
+    if url.startswith("sqlite:///"):
+        return SQLiteStateBackend(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStateBackend(url)
+    raise ValueError(f"Backend de estado desconocido: {url}")
+
+
+@asynccontextmanager
+async def device_lock(
+    backend: StateBackend,
+    ip_address: str,
+    port: int,
+    ttl_seconds: float = DEVICE_LOCK_TTL_SECONDS
+):
+    """
+    Reserva un dispositivo entre procesos mientras dura el bloque.
+
+    El lock se renueva cada tercio de ttl_seconds mientras el bloque sigue
+    en curso, por lo que un batch más largo que el TTL no lo pierde; si el
+    worker muere, vence a los ttl_seconds.
+
+    Sin backend compartido no hace nada: dentro de un proceso la exclusión
+    la da AsyncDeviceSession, que al usarse como `async with` reserva el
+    dispositivo en el DeviceScheduler durante toda la sesión.
+    """
+    if not backend.shared:
+        yield
+        return
+    name = f"device:{ip_address}:{port}"
+    owner = uuid.uuid4().hex
+    while not await call_backend(backend, backend.try_lock, name, owner, ttl_seconds):
+        await asyncio.sleep(POLL_SECONDS)
+    renewal = asyncio.create_task(_renew_lock(backend, name, owner, ttl_seconds))
+    try:
+        yield
+    finally:
+        renewal.cancel()
+        await call_backend(backend, backend.unlock, name, owner)
+
+
+async def _renew_lock(backend: StateBackend, name: str, owner: str, ttl_seconds: float):
+    """Extiende la expiración del lock mientras su dueño lo mantiene."""
+    while True:
+        await asyncio.sleep(ttl_seconds / 3)
+        try:
+            renewed = await call_backend(backend, backend.try_lock, name, owner, ttl_seconds)
+        except Exception as e:
+            print(f"⚠️ No se pudo renovar el lock {name}: {e}")
+            continue
+        if not renewed:
+            print(f"⚠️ Lock {name} perdido: otro worker lo tomó tras vencer")
+            return
+
+
+_default_backend: Optional[StateBackend] = None
+_default_lock = threading.Lock()
+
+
+def get_state_backend() -> StateBackend:
+    """Backend compartido por el proceso ($DRS_STATE_BACKEND, por defecto memory)."""
+    global _default_backend
+    with _default_lock:
+        if _default_backend is None:
+            _default_backend = create_state_backend()
+        return _default_backend
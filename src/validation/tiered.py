@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Tiered - Validación escalonada: sonda de salud y batch completo ante anomalías
+
+Para saber si un equipo está vivo y sano no hace falta enviar todo el
+batch. La validación escalonada ejecuta primero una sonda corta
+(device_id, temperature, input_and_output_power) y compara los valores
+decodificados con rangos aceptables; sólo si falta un valor o alguno está
+fuera de rango escala al batch GET completo y, opcionalmente, a los SET.
+
+Los comandos de la sonda y sus rangos se configuran en
+validation_modes.tiered de validation_scenarios.yaml.
+"""
+
+from typing import Any, Dict, List
+
+# Niveles de la validación escalonada
+TIER_PROBE = "probe"
+TIER_GET = "get"
+TIER_SET = "set"
+
+# Anomalías de la sonda
+ANOMALY_MISSING = "missing"
+ANOMALY_OUT_OF_RANGE = "out_of_range"
+
+
+class TieredPlan:
+    """Comandos de la sonda de salud, sus rangos aceptables y alcance del escalado"""
+
+    def __init__(self, probe: Dict[str, Dict[str, float]], escalate_to_set: bool = False):
+        """
+        Args:
+            probe: Comando -> {"min", "max"} del valor decodificado (vacío = sólo debe responder)
+            escalate_to_set: Incluir el nivel SET al escalar
+        """
+        self.probe = {command: dict(limits or {}) for command, limits in probe.items()}
+        self.escalate_to_set = escalate_to_set
+
+    @classmethod
+    def from_scenarios(cls, scenarios=None) -> "TieredPlan":
+        """Plan configurado en validation_modes.tiered de validation_scenarios.yaml."""
+        if scenarios is None:
+            from .scenarios import validation_scenarios as scenarios
+        settings = scenarios.get_tiered_settings()
+        return cls(settings["probe"], settings["escalate_to_set"])
+
+    @property
+    def probe_commands(self) -> List[str]:
+        return list(self.probe)
+
+    def anomalies(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Valores de la sonda ausentes o fuera de rango.
+
+        Args:
+            results: Resultados de la sonda (CommandTestResult.to_dict())
+
+        Returns:
+            Lista de {"command", "anomaly", "detail", ...}; vacía si el equipo está sano
+        """
+        by_command = {result["command"]: result for result in results}
+        anomalies = []
+        for command, limits in self.probe.items():
+            result = by_command.get(command)
+            if result is None or result.get("status") != "PASS":
+                status = result.get("status") if result else "not executed"
+                anomalies.append({"command": command, "anomaly": ANOMALY_MISSING, "detail": f"status {status}"})
+                continue
+            value = (result.get("decoded_values") or {}).get(command)
+            if isinstance(value, str):
+                try:
+                    value = float(value)
+                except ValueError:
+                    value = None
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                anomalies.append({"command": command, "anomaly": ANOMALY_MISSING, "detail": "no decoded value"})
+                continue
+            low, high = limits.get("min"), limits.get("max")
+            if (low is not None and value < low) or (high is not None and value > high):
+                anomalies.append({
+                    "command": command,
+                    "anomaly": ANOMALY_OUT_OF_RANGE,
+                    "detail": f"{value} outside [{low}, {high}]",
+                    "value": value
+                })
+        return anomalies
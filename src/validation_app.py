@@ -10,6 +10,8 @@ import json
 import yaml
 import logging
 import asyncio
+import contextlib
+import time
 import uuid
 from datetime import datetime
 from pathlib import Path
@@ -40,9 +42,24 @@ except ImportError as e:
         print(f"Warning: Could not import standalone validator: {e2}")
         VALIDATION_AVAILABLE = False
 
+# Estado compartido entre workers (sólo biblioteca estándar; redis es opcional)
+from validation.state_backend import (
+    CancelRequests,
+    StateBackend,
+    TaskStatusMap,
+    call_backend,
+    get_state_backend,
+    POLL_SECONDS as STATE_POLL_SECONDS
+)
+
 # Import batch commands validator
 try:
     from validation.batch_commands_validator import BatchCommandsValidator, CommandType
+    from validation.mock_latency import create_mock_latency, get_default_mock_latency
+    from validation.job_queue import QueueFullError, get_job_queue
+    from validation.incremental import load_previous_result
+    from validation.early_stop import EarlyStopPolicy
+    from validation.tiered import TieredPlan
     BATCH_VALIDATION_AVAILABLE = True
     print("✅ Batch commands validator loaded successfully")
 except ImportError as e:
@@ -105,16 +122,17 @@ async def generate_simulated_validation_results(request: Dict[str, Any]):
     if command_type_str not in ["master", "remote"]:
         command_type_str = "remote"
     
-    # Simular procesamiento breve
-    await asyncio.sleep(0.5)
+    # Simular procesamiento breve (según el perfil de latencia mock)
+    setup_delay = get_default_mock_latency().setup_seconds
+    if setup_delay:
+        await asyncio.sleep(setup_delay)
     
     # Mapear a CommandType enum
     command_type = CommandType.MASTER if command_type_str == "master" else CommandType.REMOTE
     
     # Ejecutar validación batch en modo mock
     validator = BatchCommandsValidator()
-    result = await asyncio.to_thread(
-        validator.validate_batch_commands,
+    result = await validator.validate_batch_commands_async(
         ip_address=ip_address,
         command_type=command_type,
         mode="mock",
@@ -168,8 +186,19 @@ templates = Jinja2Templates(directory=Path(__file__).parent / "web/templates")
 
 # Results storage directory - use absolute path for container
 PROJECT_ROOT = Path("/app")  # Fixed path for container environment
-RESULTS_DIR = PROJECT_ROOT / "results"
-RESULTS_DIR.mkdir(exist_ok=True)
+# $DRS_RESULTS_DIR lo reemplaza (p. ej. un directorio temporal en los tests)
+RESULTS_DIR = Path(os.environ.get("DRS_RESULTS_DIR") or PROJECT_ROOT / "results")
+RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+
+# Perfiles de pausa aprendidos por modelo/firmware (fuera del listado de resultados)
+if BATCH_VALIDATION_AVAILABLE and not os.environ.get("DRS_PACING_FILE"):
+    from validation.pacing import configure_default_pacing
+    configure_default_pacing(RESULTS_DIR / "device_profiles" / "pacing.json")
+
+# Historial de latencias y fallos por dispositivo/comando (orden y ETA de los batches)
+if BATCH_VALIDATION_AVAILABLE:
+    from validation.history import configure_default_history
+    configure_default_history(RESULTS_DIR)
 
 
 # Pydantic models for API
@@ -214,13 +243,42 @@ class BatchCommandsRequest(BaseModel):
     mode: str = "mock"  # 'mock' or 'live'
     selected_commands: Optional[List[str]] = None
     timeout_seconds: Optional[int] = 3
+    pipeline_window: Optional[int] = 1  # Comandos GET en vuelo por conexión (modo live)
+    device_model: Optional[str] = None  # Perfil de pausa adaptativa (default: command_type)
+    firmware_version: Optional[str] = None
+    max_staleness_seconds: Optional[float] = None  # Acepta lecturas GET cacheadas hasta esta antigüedad
+    mock_latency_profile: Optional[str] = None  # Perfil de latencia mock (zero, fixed, realistic, field, replay)
+    verify_readback: Optional[bool] = False  # Tras cada SET, lee el parámetro escrito y compara valores
+    early_stop: Optional[bool] = False  # Corta el batch cuando el veredicto PASS/FAIL ya no puede cambiar
+    max_critical_failures: Optional[int] = None  # Corta tras N fallos de comandos críticos
+    critical_commands: Optional[List[str]] = None  # Comandos críticos (default: todos)
+    order_by_history: Optional[bool] = False  # Ejecuta primero los GET que más fallan según el historial
+
+
+class IncrementalValidationRequest(BaseModel):
+    """Request model for incremental re-validation of a previous batch result"""
+    previous: str  # Archivo en RESULTS_DIR o run_id del resultado anterior
+    max_age_seconds: Optional[float] = None  # Re-ejecuta también los PASS más antiguos que esto
+    mode: Optional[str] = None  # 'mock' or 'live' (default: el del resultado anterior)
+    port: Optional[int] = 65050
+    save: Optional[bool] = True  # Guarda el resultado combinado en RESULTS_DIR
+
+
+class TieredValidationRequest(BaseModel):
+    """Request model for tiered validation (health probe, full batch only on anomalies)"""
+    ip_address: str
+    port: Optional[int] = 65050
+    command_type: str  # 'master' or 'remote'
+    mode: str = "mock"  # 'mock' or 'live'
+    escalate_to_set: Optional[bool] = None  # Incluir los SET al escalar (default: configuración)
+    probe: Optional[Dict[str, Dict[str, float]]] = None  # Comando -> {"min", "max"} (default: configuración)
 
 
 class BatchCommandResult(BaseModel):
     """Individual command result model"""
     command: str
     command_type: str
-    status: str  # 'PASS', 'FAIL', 'TIMEOUT', 'ERROR'
+    status: str  # 'PASS', 'FAIL', 'TIMEOUT', 'ERROR', 'SKIPPED', 'CANCELLED'
     message: str
     details: Optional[str] = None
     response_data: Optional[str] = None
@@ -229,6 +287,23 @@ class BatchCommandResult(BaseModel):
     error: Optional[str] = None
 
 
+class FleetDeviceRequest(BaseModel):
+    """Device entry of a fleet validation request"""
+    ip_address: str
+    port: Optional[int] = 65050
+    command_type: str = "master"  # 'master' or 'remote'
+    site: Optional[str] = None  # Sitio/túnel para el límite por sitio
+    selected_commands: Optional[List[str]] = None
+
+
+class FleetValidationRequest(BaseModel):
+    """Request model for multi-device fleet validation"""
+    devices: List[FleetDeviceRequest]
+    mode: str = "mock"  # 'mock' or 'live'
+    max_concurrency: Optional[int] = 32  # Dispositivos simultáneos en toda la flota
+    per_site_concurrency: Optional[int] = 8  # Dispositivos simultáneos por sitio
+
+
 class BatchCommandsResponse(BaseModel):
     """Response model for batch commands validation"""
     overall_status: str
@@ -241,6 +316,14 @@ class BatchCommandsResponse(BaseModel):
     results: List[Dict[str, Any]]  # List of command results
     duration_ms: int
     timestamp: str
+    root_cause: Optional[Dict[str, Any]] = None  # Dispositivo inalcanzable (comandos omitidos)
+    circuit_breaker: Optional[Dict[str, Any]] = None  # Estado del breaker del dispositivo (modo live)
+    run_id: Optional[str] = None
+    early_stop: Optional[Dict[str, Any]] = None  # Comandos no ejecutados por veredicto ya decidido
+    incremental: Optional[Dict[str, Any]] = None  # Comandos re-ejecutados (revalidación incremental)
+    tiers: Optional[Dict[str, Any]] = None  # Niveles ejecutados y anomalías de la sonda (validación escalonada)
+    plan: Optional[Dict[str, Any]] = None  # Orden por historial y duración estimada antes de ejecutar
+    saved_file: Optional[str] = None
 
 
 class SupportedCommandsResponse(BaseModel):
@@ -254,10 +337,22 @@ class SupportedCommandsResponse(BaseModel):
 
 def save_validation_result(result: Dict[str, Any], request: ValidationRequest) -> str:
     """Save validation result to persistent storage"""
+    return save_result_file(result, {
+        "ip_address": request.device_config.ip_address,
+        "device_type": request.device_config.device_type,
+        "command_type": request.device_config.device_type,  # Agregar command_type explícitamente
+        "hostname": request.device_config.device_name,
+        "serial_number": request.device_config.serial_number,
+        "live_mode": request.mode == "live"
+    })
+
+
+def save_result_file(result: Dict[str, Any], request_info: Dict[str, Any]) -> str:
+    """Write a result with its request metadata to RESULTS_DIR"""
     try:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        device_type = request.device_config.device_type
-        ip_address = request.device_config.ip_address.replace(".", "_")
+        device_type = request_info["device_type"]
+        ip_address = request_info["ip_address"].replace(".", "_")
         
         filename = f"{timestamp}_{device_type}_{ip_address}.json"
         filepath = RESULTS_DIR / filename
@@ -265,14 +360,7 @@ def save_validation_result(result: Dict[str, Any], request: ValidationRequest) -
         # Add metadata to result
         result_data = {
             "timestamp": datetime.now().isoformat(),
-            "request": {
-                "ip_address": request.device_config.ip_address,
-                "device_type": request.device_config.device_type,
-                "command_type": request.device_config.device_type,  # Agregar command_type explícitamente
-                "hostname": request.device_config.device_name,
-                "serial_number": request.device_config.serial_number,
-                "live_mode": request.mode == "live"
-            },
+            "request": request_info,
             "result": result
         }
         
@@ -365,30 +453,108 @@ validation_service = ValidationService()
 
 # WebSocket Connection Manager for Real-time Logging
 class ConnectionManager:
-    """Manages active WebSocket connections for real-time logging"""
-    def __init__(self):
+    """
+    Manages active WebSocket connections for real-time logging.
+    
+    With a shared state backend (several uvicorn workers), logs are published
+    to the backend and each worker forwards them to the WebSockets it holds.
+    """
+    def __init__(self, state: Optional[StateBackend] = None):
         self.active_connections: Dict[str, WebSocket] = {}
+        self.state = state
+        self._forwarders: Dict[str, asyncio.Task] = {}
+
+    @property
+    def shared(self) -> bool:
+        return bool(self.state and self.state.shared)
 
     async def connect(self, websocket: WebSocket, client_id: str):
         await websocket.accept()
         self.active_connections[client_id] = websocket
+        if self.shared:
+            await call_backend(self.state, self.state.set_connected, client_id, True)
+            self._forwarders[client_id] = asyncio.create_task(self._forward_logs(client_id, websocket))
         logging.info(f"📡 WebSocket client connected: {client_id}")
 
-    def disconnect(self, client_id: str):
+    async def disconnect(self, client_id: str):
         if client_id in self.active_connections:
             del self.active_connections[client_id]
             logging.info(f"📡 WebSocket client disconnected: {client_id}")
+        forwarder = self._forwarders.pop(client_id, None)
+        if forwarder:
+            forwarder.cancel()
+        if self.shared:
+            await call_backend(self.state, self.state.set_connected, client_id, False)
+            await call_backend(self.state, self.state.clear_logs, client_id)
+
+    async def is_connected(self, client_id: str) -> bool:
+        """True if the client has a WebSocket open on this or (shared state) any worker"""
+        if client_id in self.active_connections:
+            return True
+        return self.shared and await call_backend(self.state, self.state.is_connected, client_id)
 
     async def send_log(self, client_id: str, message: str):
+        if self.shared:
+            await call_backend(self.state, self.state.publish_log, client_id, message)
+            return
         if client_id in self.active_connections:
             try:
                 await self.active_connections[client_id].send_text(message)
             except Exception as e:
                 logging.warning(f"Could not send log to client {client_id}: {e}")
 
+    async def _forward_logs(self, client_id: str, websocket: WebSocket):
+        """Forward logs published by any worker to this worker's WebSocket"""
+        last_id = 0
+        while True:
+            for log_id, message in await call_backend(self.state, self.state.read_logs, client_id, last_id):
+                try:
+                    await websocket.send_text(message)
+                except Exception as e:
+                    logging.warning(f"Could not send log to client {client_id}: {e}")
+                    return
+                last_id = log_id
+            await asyncio.sleep(STATE_POLL_SECONDS)
+
 # Global connection manager and task storage
-manager = ConnectionManager()
-active_tasks = {}
+# Estado compartido entre workers ($DRS_STATE_BACKEND: memory, sqlite:///ruta.db, redis://...)
+state_backend = get_state_backend()
+manager = ConnectionManager(state_backend)
+active_tasks = TaskStatusMap(state_backend)
+# Validaciones batch en curso en este worker (cancelables) y cancelaciones solicitadas
+# por client_id; las cancelaciones van al backend porque pueden llegar a otro worker
+running_validations: Dict[str, asyncio.Task] = {}
+cancel_requested = CancelRequests(state_backend)
+# Admisión de validaciones: workers y largo de cola acotados ($DRS_VALIDATION_WORKERS, $DRS_VALIDATION_QUEUE_SIZE)
+job_queue = get_job_queue() if BATCH_VALIDATION_AVAILABLE else None
+
+
+async def set_task_status(client_id: str, data: Dict[str, Any]):
+    """Store a task status without blocking the event loop (shared backends do I/O)"""
+    await call_backend(state_backend, state_backend.set_task, client_id, data)
+
+
+async def is_cancel_requested(client_id: str) -> bool:
+    """True if a cancel for client_id was requested on any worker"""
+    return await call_backend(state_backend, state_backend.is_cancel_requested, client_id)
+
+
+def cancel_local_validation(client_id: str) -> Optional[asyncio.Task]:
+    """Abort the validation of client_id if it runs or waits its turn in this worker"""
+    if job_queue:
+        # Si aún esperaba turno, sale de la cola sin llegar a ejecutarse
+        job_queue.cancel(client_id)
+    validation = running_validations.get(client_id)
+    if validation is not None:
+        validation.cancel()
+    return validation
+
+
+async def watch_cancel_requests(client_id: str):
+    """With shared state, apply here a cancel received by another worker"""
+    while not await is_cancel_requested(client_id):
+        await asyncio.sleep(STATE_POLL_SECONDS)
+    cancel_local_validation(client_id)
 
 async def run_validation_with_logging(client_id: str, request_data: Dict[str, Any]):
     """Execute validation with detailed real-time logging"""
@@ -398,13 +564,14 @@ async def run_validation_with_logging(client_id: str, request_data: Dict[str, An
     max_wait = 2  # segundos máximo de espera
     waited = 0
     websocket_available = False
+    cancel_watcher: Optional[asyncio.Task] = None
     
-    while client_id not in manager.active_connections and waited < max_wait:
+    while not await manager.is_connected(client_id) and waited < max_wait:
         print(f"DEBUG: Waiting for WebSocket connection... ({waited}s)")
         await asyncio.sleep(1)
         waited += 1
     
-    if client_id in manager.active_connections:
+    if await manager.is_connected(client_id):
         websocket_available = True
         print(f"DEBUG: WebSocket connected for client {client_id}")
     else:
@@ -439,7 +606,10 @@ async def run_validation_with_logging(client_id: str, request_data: Dict[str, An
                 print(message)  # Fallback to console logging
         
         # Crear instancia del validador con callback de logging
-        validator = BatchCommandsValidator(log_callback=log_callback)
+        validator = BatchCommandsValidator(
+            log_callback=log_callback,
+            order_by_history=bool(request_data.get("order_by_history", False))
+        )
         
         # Determinar el tipo de comando basado en el command_type_str
         if command_type_str == "master":
@@ -449,14 +619,89 @@ async def run_validation_with_logging(client_id: str, request_data: Dict[str, An
         else:
             command_type = CommandType.REMOTE  # default
         
-        # Ejecutar validación de forma asíncrona con logs en tiempo real
-        result = await validator.validate_batch_commands_async(
-            ip_address=ip_address,
-            port=device_config.get("port", 65050),
-            command_type=command_type,
-            mode=mode,
-            selected_commands=None  # None means all commands
-        )
+        # Orden por historial y duración estimada: la UI muestra progreso real
+        run_plan = await asyncio.to_thread(validator.plan_batch, ip_address, command_type, mode)
+        if websocket_available:
+            await manager.send_log(client_id, json.dumps({
+                "type": "validation_plan",
+                "client_id": client_id,
+                "order": run_plan["order"],
+                "total_commands": run_plan["total_commands"],
+                "eta_seconds": run_plan["eta_seconds"]
+            }))
+        
+        # Ejecutar validación de forma asíncrona con logs en tiempo real.
+        # Corre en su propia tarea para que /api/validation/cancel pueda abortarla.
+        completed = []
+        
+        async def collect_result(cmd_result):
+            completed.append(cmd_result)
+            if websocket_available:
+                await manager.send_log(client_id, json.dumps({
+                    "type": "validation_progress",
+                    "client_id": client_id,
+                    "command": cmd_result.command,
+                    "status": cmd_result.status.value,
+                    "completed": len(completed),
+                    "total_commands": run_plan["total_commands"],
+                    "remaining_seconds": validator.history.remaining_seconds(
+                        run_plan, (r.command for r in completed)
+                    )
+                }))
+        
+        # La cancelación puede llegar a otro worker: se vigila en el backend compartido
+        if state_backend.shared:
+            cancel_watcher = asyncio.create_task(watch_cancel_requests(client_id))
+        
+        # Esperar un worker libre de la cola de validaciones
+        if not await is_cancel_requested(client_id):
+            if job_queue.position(client_id) is None:
+                job_queue.submit(client_id)  # Llamada directa, sin pasar por /api/validation/run
+            queue_position = job_queue.position(client_id)
+            if queue_position:
+                await log_callback(
+                    f"[INFO] ⏳ En cola de validaciones: posición {queue_position} "
+                    f"(~{job_queue.eta_seconds(client_id):.0f}s)"
+                )
+            try:
+                await job_queue.acquire(client_id)
+            except asyncio.CancelledError:
+                if not await is_cancel_requested(client_id):
+                    raise
+        if not await is_cancel_requested(client_id):
+            await set_task_status(client_id, {"status": "RUNNING", "message": "Validación en curso..."})
+        
+        start_time = time.time()
+        if await is_cancel_requested(client_id):
+            validation = None
+        else:
+            validation = asyncio.create_task(validator.validate_batch_commands_async(
+                ip_address=ip_address,
+                port=device_config.get("port", 65050),
+                command_type=command_type,
+                mode=mode,
+                selected_commands=None,  # None means all commands
+                on_result=collect_result
+            ))
+            running_validations[client_id] = validation
+        try:
+            if validation is None:
+                raise asyncio.CancelledError()
+            result = await validation
+        except asyncio.CancelledError:
+            if not await is_cancel_requested(client_id):
+                raise
+            result = validator.cancelled_batch_result(
+                ip_address, command_type, mode, None, completed, start_time
+            )
+            await log_callback(
+                f"[WARNING] 🛑 Validación cancelada: {len(completed)}/{result['total_commands']} comandos completados"
+            )
+        finally:
+            running_validations.pop(client_id, None)
+            if cancel_watcher:
+                cancel_watcher.cancel()
+            await call_backend(state_backend, cancel_requested.discard, client_id)
         
         # Save the validation result to persistent storage
         try:
@@ -494,22 +739,28 @@ async def run_validation_with_logging(client_id: str, request_data: Dict[str, An
         overall_status = result.get("overall_status", "FAIL")
         stats = result.get("statistics", {})
         
-        if overall_status == "PASS":
+        if overall_status == "CANCELLED":
+            await set_task_status(client_id, {
+                "status": "CANCELLED",
+                "message": f"Validación cancelada: {stats.get('cancelled', 0)} comandos no ejecutados",
+                "details": result
+            })
+        elif overall_status == "PASS":
             success_msg = f"[SUCCESS] ✅ Validación completada: {stats.get('passed', 0)}/{stats.get('total_commands', 0)} comandos exitosos"
             await log_callback(success_msg)
-            active_tasks[client_id] = {
+            await set_task_status(client_id, {
                 "status": "PASS",
                 "message": "Validación completada exitosamente",
                 "details": result
-            }
+            })
         else:
             error_msg = f"[ERROR] ❌ Validación fallida: {stats.get('failed', 0)} comandos fallidos"
             await log_callback(error_msg)
-            active_tasks[client_id] = {
+            await set_task_status(client_id, {
                 "status": "FAIL",
                 "message": f"Validación fallida: {stats.get('failed', 0)} errores",
                 "details": result
-            }
+            })
         
         # Send validation_complete message via WebSocket if available
         if websocket_available:
@@ -523,8 +774,12 @@ async def run_validation_with_logging(client_id: str, request_data: Dict[str, An
     except Exception as e:
         error_msg = f"[ERROR] ❌ Error durante validación: {str(e)}"
         await log_callback(error_msg)
-        active_tasks[client_id] = {"status": "ERROR", "message": str(e)}
+        await set_task_status(client_id, {"status": "ERROR", "message": str(e)})
     finally:
+        if cancel_watcher:
+            cancel_watcher.cancel()
+        if job_queue:
+            job_queue.release(client_id)
         if websocket_available:
             await manager.send_log(client_id, "---END_OF_LOG---")
 
@@ -586,6 +841,27 @@ async def get_validation_scenarios():
     }
 
 
+def _plan_validation_run(request_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Orden y duración estimada de una validación de /api/validation/run (None si no se puede)"""
+    if not BATCH_VALIDATION_AVAILABLE:
+        return None
+    command_type = CommandType.MASTER if request_data.get("command_type") == "master" else CommandType.REMOTE
+    try:
+        plan = BatchCommandsValidator(
+            order_by_history=bool(request_data.get("order_by_history", False))
+        ).plan_batch(
+            request_data.get("ip_address", "N/A"), command_type, request_data.get("mode", "mock")
+        )
+        # Solo tipos JSON planos: la respuesta no debe fallar por lo que devuelva el planificador
+        return {
+            "eta_seconds": round(float(plan["eta_seconds"]), 1),
+            "order": [str(command) for command in plan["order"]]
+        }
+    except Exception as e:
+        logging.warning(f"No se pudo estimar la duración de la validación: {e}")
+        return None
+
+
 @app.post("/api/validation/run")
 async def run_validation(request: Dict[str, Any], background_tasks: BackgroundTasks):
     """Execute device validation with current configuration and real-time logging"""
@@ -601,16 +877,56 @@ async def run_validation(request: Dict[str, Any], background_tasks: BackgroundTa
             # WebSocket-based approach - works for both mock and live mode
             client_id = request.get("client_id", str(uuid.uuid4()))
             print(f"DEBUG: Starting WebSocket validation for client_id: {client_id}")
-            active_tasks[client_id] = {"status": "STARTING", "message": "Iniciando validación..."}
             
-            # Ejecutar la validación en background para no bloquear la respuesta HTTP
-            background_tasks.add_task(run_validation_with_logging, client_id, request)
+            # Control de admisión: con la cola llena se rechaza en lugar de degradar a todos
+            position = 0
+            admitted = False
+            if job_queue:
+                # Un client_id que ya está en la cola no es admitido (ni liberado) por esta petición
+                admitted = job_queue.position(client_id) is None
+                try:
+                    position = job_queue.submit(client_id)
+                except QueueFullError as e:
+                    return JSONResponse(
+                        {
+                            "status": "rejected",
+                            "message": "Cola de validaciones llena, reintente más tarde",
+                            "retry_after_seconds": e.retry_after,
+                            "queue": job_queue.snapshot()
+                        },
+                        status_code=429,
+                        headers={"Retry-After": str(e.retry_after)}
+                    )
+            
+            try:
+                if position:
+                    await set_task_status(client_id, {
+                        "status": "QUEUED",
+                        "message": f"En cola de validaciones (posición {position})"
+                    })
+                else:
+                    await set_task_status(client_id, {"status": "STARTING", "message": "Iniciando validación..."})
+                
+                # Duración estimada del batch según el historial del dispositivo
+                run_plan = await asyncio.to_thread(_plan_validation_run, request)
+                
+                # Ejecutar la validación en background para no bloquear la respuesta HTTP
+                background_tasks.add_task(run_validation_with_logging, client_id, request)
+            except Exception:
+                # Sin tarea en background nadie liberaría el worker (o lugar en cola) tomado
+                if admitted:
+                    job_queue.release(client_id)
+                raise
             
             return JSONResponse({
-                "status": "started",
+                "status": "queued" if position else "started",
                 "client_id": client_id,
                 "message": "Validación iniciada. Conéctate al WebSocket para logs en tiempo real.",
-                "websocket_url": f"/ws/logs/{client_id}"
+                "websocket_url": f"/ws/logs/{client_id}",
+                "queue_position": position,
+                "eta_seconds": job_queue.eta_seconds(client_id) if job_queue else 0,
+                "estimated_duration_seconds": run_plan["eta_seconds"] if run_plan else None,
+                "command_order": run_plan["order"] if run_plan else None
             })
         
         if simulation_mode:
@@ -654,7 +970,7 @@ async def run_validation(request: Dict[str, Any], background_tasks: BackgroundTa
             if BATCH_VALIDATION_AVAILABLE:
                 try:
                     validator = BatchCommandsValidator()
-                    batch_result = validator.validate_batch_commands(
+                    batch_result = await validator.validate_batch_commands_async(
                         ip_address=validation_config["ip_address"],
                         port=validation_config.get("port", 65050),
                         command_type=CommandType.REMOTE,
@@ -725,7 +1041,7 @@ async def run_validation(request: Dict[str, Any], background_tasks: BackgroundTa
             if BATCH_VALIDATION_AVAILABLE:
                 try:
                     validator = BatchCommandsValidator()
-                    batch_result = validator.validate_batch_commands(
+                    batch_result = await validator.validate_batch_commands_async(
                         ip_address=validation_config["ip_address"],
                         port=validation_config.get("port", 65050),
                         command_type=CommandType.MASTER,
@@ -792,7 +1108,8 @@ async def run_validation(request: Dict[str, Any], background_tasks: BackgroundTa
                     "timestamp": datetime.now().isoformat()
                 }
         elif VALIDATION_AVAILABLE:
-            result = validate_device(validation_config)
+            # Legacy validator uses blocking sockets: keep it off the event loop
+            result = await asyncio.to_thread(validate_device, validation_config)
         else:
             # Fallback mock result if validation not available
             result = {
@@ -827,7 +1144,11 @@ async def run_validation(request: Dict[str, Any], background_tasks: BackgroundTa
     except Exception as e:
         # Fallback: Return a client_id for WebSocket compatibility
         client_id = str(uuid.uuid4())
-        active_tasks[client_id] = {"status": "ERROR", "message": f"Error: {str(e)}"}
+        try:
+            await set_task_status(client_id, {"status": "ERROR", "message": f"Error: {str(e)}"})
+        except Exception as status_error:
+            # El error pudo venir del propio backend de estado
+            logging.warning(f"No se pudo registrar el error de la validación: {status_error}")
         return JSONResponse({
             "status": "error",
             "client_id": client_id,
@@ -838,6 +1159,10 @@ async def run_validation(request: Dict[str, Any], background_tasks: BackgroundTa
 # Remove duplicate endpoint - use the modified one above
 
 
+# Espera máxima del ping de respaldo cuando ningún puerto TCP responde
+PING_TIMEOUT_SECONDS = 10
+
+
 @app.post("/api/validation/ping/{ip_address}")
 async def ping_device_endpoint(ip_address: str, mode: str = "mock"):
     """Test basic network connectivity to device"""
@@ -896,13 +1221,10 @@ async def ping_device_endpoint(ip_address: str, mode: str = "mock"):
 
         if VALIDATION_AVAILABLE and not is_docker:
             validator = TechnicianTCPValidator()
-            result = validator.ping_device(ip_address)
+            result = await asyncio.to_thread(validator.ping_device, ip_address)
             return result
         else:
-            # Docker-friendly connectivity test using TCP connection
-            import socket
-            import asyncio
-
+            # Docker-friendly connectivity test using TCP connection (asyncio, non-blocking)
             try:
                 # Try to connect to common device ports (502 for Modbus, 80 for HTTP, etc.)
                 common_ports = [502, 80, 443, 23, 22]  # Modbus, HTTP, HTTPS, Telnet, SSH
@@ -910,15 +1232,13 @@ async def ping_device_endpoint(ip_address: str, mode: str = "mock"):
 
                 for port in common_ports:
                     try:
-                        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                        sock.settimeout(5)
-                        result = sock.connect_ex((ip_address, port))
-                        sock.close()
-
-                        if result == 0:
-                            connected = True
-                            break
-                    except:
+                        _, writer = await asyncio.wait_for(asyncio.open_connection(ip_address, port), timeout=5)
+                        writer.close()
+                        with contextlib.suppress(Exception):
+                            await writer.wait_closed()
+                        connected = True
+                        break
+                    except Exception:
                         continue
 
                 if connected:
@@ -930,15 +1250,19 @@ async def ping_device_endpoint(ip_address: str, mode: str = "mock"):
                     }
                 else:
                     # Fallback to ping if TCP fails
-                    import subprocess
                     import platform
 
                     ping_cmd = ["ping", "-n", "1"] if platform.system() == "Windows" else ["ping", "-c", "1"]
                     ping_cmd.append(ip_address)
 
+                    process = await asyncio.create_subprocess_exec(
+                        *ping_cmd,
+                        stdout=asyncio.subprocess.DEVNULL,
+                        stderr=asyncio.subprocess.DEVNULL
+                    )
                     try:
-                        result = subprocess.run(ping_cmd, capture_output=True, text=True, timeout=10)
-                        if result.returncode == 0:
+                        returncode = await asyncio.wait_for(process.wait(), timeout=PING_TIMEOUT_SECONDS)
+                        if returncode == 0:
                             return {
                                 "status": "PASS",
                                 "ip_address": ip_address,
@@ -952,7 +1276,11 @@ async def ping_device_endpoint(ip_address: str, mode: str = "mock"):
                                 "message": f"❌ Device at {ip_address} is not reachable",
                                 "timestamp": datetime.now().isoformat()
                             }
-                    except subprocess.TimeoutExpired:
+                    except asyncio.TimeoutError:
+                        # El ping terminado se espera para que no quede como proceso zombie
+                        with contextlib.suppress(ProcessLookupError):
+                            process.kill()
+                        await process.wait()
                         return {
                             "status": "FAIL",
                             "ip_address": ip_address,
@@ -976,14 +1304,59 @@ async def ping_device_endpoint(ip_address: str, mode: str = "mock"):
         }
 
 
+@app.post("/api/validation/cancel/{client_id}")
+async def cancel_validation(client_id: str):
+    """
+    Cancel an in-flight validation started by /api/validation/run.
+    
+    The validation task is cancelled immediately, aborting any pending
+    connect or read; commands already completed are kept and the rest are
+    recorded as CANCELLED (see /api/validation/task/{client_id}).
+    """
+    task = await call_backend(state_backend, state_backend.get_task, client_id) or {}
+    pending = task.get("status") in ("QUEUED", "STARTING", "RUNNING")
+    if client_id not in running_validations and not pending:
+        raise HTTPException(status_code=404, detail="No running validation for this client_id")
+    
+    # Queda en el backend: si la validación corre en otro worker, éste la aborta
+    await call_backend(state_backend, cancel_requested.add, client_id)
+    validation = cancel_local_validation(client_id)
+    if validation is not None:
+        # Deja que la cancelación llegue hasta los sockets antes de responder
+        await asyncio.wait({validation}, timeout=1)
+    
+    return {
+        "status": "cancelling",
+        "client_id": client_id,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 # New endpoints for real-time logging
 @app.get("/api/validation/task/{client_id}")
 async def get_task_result(client_id: str):
     """Get the result of a validation task"""
-    if client_id not in active_tasks:
+    task = await call_backend(state_backend, state_backend.get_task, client_id)
+    if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    return JSONResponse(active_tasks[client_id])
+    task = dict(task)
+    if job_queue and task.get("status") == "QUEUED":
+        task["queue_position"] = job_queue.position(client_id)
+        task["eta_seconds"] = job_queue.eta_seconds(client_id)
+    return JSONResponse(task)
+
+
+@app.get("/api/validation/queue")
+async def get_validation_queue():
+    """Get validation job queue occupancy (workers, queued, rejected)"""
+    if not job_queue:
+        raise HTTPException(status_code=503, detail="Batch commands validator not available")
+    
+    return {
+        "queue": job_queue.snapshot(),
+        "timestamp": datetime.now().isoformat()
+    }
 
 
 @app.websocket("/ws/logs/{client_id}")
@@ -995,7 +1368,7 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
             # Keep connection alive to send logs
             await websocket.receive_text()
     except WebSocketDisconnect:
-        manager.disconnect(client_id)
+        await manager.disconnect(client_id)
 
 
 @app.get("/api/validation/report/{run_id}")
@@ -1010,6 +1383,50 @@ async def get_validation_report(run_id: str):
     }
 
 
+def _build_batch_validator(request: BatchCommandsRequest):
+    """Validate a batch request and build its validator and command type"""
+    # Validate command_type parameter
+    if request.command_type.lower() not in ['master', 'remote', 'set']:
+        raise HTTPException(
+            status_code=400,
+            detail="command_type must be 'master', 'remote', or 'set'"
+        )
+    
+    # Convert command_type string to enum
+    command_type_map = {
+        'master': CommandType.MASTER,
+        'remote': CommandType.REMOTE,
+        'set': CommandType.SET
+    }
+    command_type = command_type_map[request.command_type.lower()]
+    
+    mock_latency = None
+    if request.mock_latency_profile:
+        try:
+            mock_latency = create_mock_latency(request.mock_latency_profile)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    early_stop = None
+    if request.early_stop or request.max_critical_failures:
+        early_stop = EarlyStopPolicy(
+            stop_when_decided=bool(request.early_stop),
+            max_critical_failures=request.max_critical_failures,
+            critical_commands=request.critical_commands
+        )
+    
+    validator = BatchCommandsValidator(
+        pipeline_window=request.pipeline_window,
+        device_model=request.device_model,
+        firmware_version=request.firmware_version,
+        mock_latency=mock_latency,
+        verify_readback=bool(request.verify_readback),
+        early_stop=early_stop,
+        order_by_history=bool(request.order_by_history)
+    )
+    return validator, command_type
+
+
 # New Batch Commands Endpoints
 @app.post("/api/validation/batch-commands")
 async def run_batch_commands(request: BatchCommandsRequest) -> BatchCommandsResponse:
@@ -1026,31 +1443,16 @@ async def run_batch_commands(request: BatchCommandsRequest) -> BatchCommandsResp
         )
     
     try:
-        # Validate command_type parameter
-        if request.command_type.lower() not in ['master', 'remote', 'set']:
-            raise HTTPException(
-                status_code=400,
-                detail="command_type must be 'master', 'remote', or 'set'"
-            )
+        validator, command_type = _build_batch_validator(request)
         
-        # Convert command_type string to enum
-        command_type_map = {
-            'master': CommandType.MASTER,
-            'remote': CommandType.REMOTE,
-            'set': CommandType.SET
-        }
-        command_type = command_type_map[request.command_type.lower()]
-        
-        # Initialize batch validator
-        validator = BatchCommandsValidator()
-        
-        # Execute batch validation
-        result = validator.validate_batch_commands(
+        # Execute batch validation on the event loop (device I/O is asyncio-native)
+        result = await validator.validate_batch_commands_async(
             ip_address=request.ip_address,
             port=request.port,
             command_type=command_type,
             mode=request.mode,
-            selected_commands=request.selected_commands
+            selected_commands=request.selected_commands,
+            max_staleness=request.max_staleness_seconds
         )
         
         # Return structured response
@@ -1064,9 +1466,16 @@ async def run_batch_commands(request: BatchCommandsRequest) -> BatchCommandsResp
             statistics=result["statistics"],
             results=result["results"],
             duration_ms=result["duration_ms"],
-            timestamp=result["timestamp"]
+            timestamp=result["timestamp"],
+            root_cause=result.get("root_cause"),
+            circuit_breaker=result.get("circuit_breaker"),
+            run_id=result.get("run_id"),
+            early_stop=result.get("early_stop"),
+            plan=result.get("plan")
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -1074,6 +1483,240 @@ async def run_batch_commands(request: BatchCommandsRequest) -> BatchCommandsResp
         )
 
 
+@app.post("/api/validation/batch-commands/incremental")
+async def run_incremental_batch_commands(request: IncrementalValidationRequest) -> BatchCommandsResponse:
+    """
+    Re-validate only the failed or stale commands of a previous batch result.
+    
+    The previous result is a file in RESULTS_DIR or its run_id. Commands that
+    did not pass, or passed longer than max_age_seconds ago, are executed
+    again; the rest are carried over. Every command result carries its
+    provenance (rerun / previous, run_id, validated_at).
+    """
+    if not BATCH_VALIDATION_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Batch commands validator not available"
+        )
+    
+    # Con un run_id se recorren todos los JSON de RESULTS_DIR: fuera del event loop
+    try:
+        previous = await asyncio.to_thread(load_previous_result, request.previous, RESULTS_DIR)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        validator = BatchCommandsValidator()
+        result = await validator.revalidate_batch_commands_async(
+            previous,
+            mode=request.mode,
+            port=request.port,
+            max_age_seconds=request.max_age_seconds
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid previous result: {e}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Incremental validation failed: {str(e)}"
+        )
+    
+    saved_file = None
+    if request.save:
+        saved_path = await asyncio.to_thread(save_result_file, result, {
+            "ip_address": result["ip_address"],
+            "device_type": result["command_type"],
+            "command_type": result["command_type"],
+            "live_mode": result["mode"] == "live",
+            "incremental_of": request.previous
+        })
+        saved_file = Path(saved_path).name if saved_path else None
+    
+    return BatchCommandsResponse(**result, saved_file=saved_file)
+
+
+@app.post("/api/validation/batch-commands/tiered")
+async def run_tiered_batch_commands(request: TieredValidationRequest) -> BatchCommandsResponse:
+    """
+    Tiered validation: run a short health probe and escalate only on anomalies.
+    
+    The probe (device_id, temperature, input_and_output_power by default)
+    is checked against the ranges of validation_modes.tiered. When a value
+    is missing or out of range, the remaining GET commands are executed
+    and, with escalate_to_set, the SET commands as well.
+    """
+    if not BATCH_VALIDATION_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Batch commands validator not available"
+        )
+    
+    command_type_map = {
+        'master': CommandType.MASTER,
+        'remote': CommandType.REMOTE
+    }
+    if request.command_type.lower() not in command_type_map:
+        raise HTTPException(
+            status_code=400,
+            detail="command_type must be 'master' or 'remote'"
+        )
+    
+    plan = None
+    if request.probe:
+        plan = TieredPlan(request.probe, TieredPlan.from_scenarios().escalate_to_set)
+    
+    try:
+        validator = BatchCommandsValidator()
+        result = await validator.validate_tiered_async(
+            ip_address=request.ip_address,
+            command_type=command_type_map[request.command_type.lower()],
+            mode=request.mode,
+            port=request.port,
+            escalate_to_set=request.escalate_to_set,
+            plan=plan
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Tiered validation failed: {str(e)}"
+        )
+    
+    return BatchCommandsResponse(**result)
+
+
+@app.post("/api/validation/batch-commands/stream")
+async def stream_batch_commands(request: BatchCommandsRequest, http_request: Request, format: Optional[str] = None):
+    """
+    Streaming variant of batch-commands: one record per command as it completes.
+    
+    Emits newline-delimited JSON (default) or Server-Sent Events
+    (format=sse or Accept: text/event-stream). Each command result is a
+    {"type": "result"} record; the stream ends with a {"type": "summary"}
+    record carrying overall status and statistics (or {"type": "error"}).
+    """
+    if not BATCH_VALIDATION_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Batch commands validator not available"
+        )
+    
+    from fastapi.responses import StreamingResponse
+    
+    if format not in (None, "sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    use_sse = format == "sse" or (
+        format is None and "text/event-stream" in http_request.headers.get("accept", "")
+    )
+    validator, command_type = _build_batch_validator(request)
+    
+    async def records():
+        async for record in validator.stream_batch_commands(
+            ip_address=request.ip_address,
+            command_type=command_type,
+            mode=request.mode,
+            selected_commands=request.selected_commands,
+            port=request.port,
+            max_staleness=request.max_staleness_seconds
+        ):
+            payload = json.dumps(record, default=str)
+            if use_sse:
+                yield f"event: {record['type']}\ndata: {payload}\n\n"
+            else:
+                yield payload + "\n"
+    
+    return StreamingResponse(
+        records(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        # Evita que proxies (nginx) acumulen la respuesta antes de enviarla
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/api/validation/fleet")
+async def run_fleet_validation(request: FleetValidationRequest) -> Dict[str, Any]:
+    """
+    Execute batch validation against many DRS devices concurrently.
+    
+    Devices run in parallel up to max_concurrency (and per_site_concurrency
+    per site), clamped to the server maxima in validation_scenarios.yaml;
+    commands within each device stay serialized. The fleet run takes one
+    slot of the validation job queue.
+    """
+    if not BATCH_VALIDATION_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Batch commands validator not available"
+        )
+    
+    if not request.devices:
+        raise HTTPException(status_code=400, detail="Fleet must contain at least one device")
+    
+    for device in request.devices:
+        if device.command_type.lower() not in ['master', 'remote']:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid command_type '{device.command_type}' for {device.ip_address}. Must be 'master' or 'remote'"
+            )
+    
+    if request.mode.lower() not in ['mock', 'live']:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid mode. Must be 'mock' or 'live'"
+        )
+    
+    from validation.fleet import FleetValidator, FleetDevice, get_fleet_limits
+    
+    for field in ("max_concurrency", "per_site_concurrency"):
+        value = getattr(request, field)
+        if value is not None and value < 1:
+            raise HTTPException(status_code=400, detail=f"{field} must be at least 1")
+    
+    max_devices = get_fleet_limits()["max_devices"]
+    if len(request.devices) > max_devices:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Fleet has {len(request.devices)} devices; the maximum is {max_devices}"
+        )
+    
+    fleet = FleetValidator.from_scenarios(request.max_concurrency, request.per_site_concurrency)
+    devices = [
+        FleetDevice(
+            ip_address=device.ip_address,
+            port=device.port or 65050,
+            command_type=device.command_type.lower(),
+            site=device.site,
+            selected_commands=device.selected_commands
+        )
+        for device in request.devices
+    ]
+    
+    # La flota ocupa un worker de la cola de validaciones, como cualquier otra ejecución
+    fleet_id = f"fleet-{uuid.uuid4()}"
+    if job_queue:
+        try:
+            job_queue.submit(fleet_id)
+        except QueueFullError as e:
+            return JSONResponse(
+                {
+                    "status": "rejected",
+                    "message": "Cola de validaciones llena, reintente más tarde",
+                    "retry_after_seconds": e.retry_after,
+                    "queue": job_queue.snapshot()
+                },
+                status_code=429,
+                headers={"Retry-After": str(e.retry_after)}
+            )
+    try:
+        if job_queue:
+            await job_queue.acquire(fleet_id)
+        return await fleet.validate_fleet(devices, mode=request.mode.lower())
+    finally:
+        if job_queue:
+            job_queue.release(fleet_id)
+
+
 @app.get("/api/validation/supported-commands")
 async def get_supported_commands() -> SupportedCommandsResponse:
     """
@@ -1137,6 +1780,32 @@ async def get_batch_commands_status():
     }
 
 
+@app.get("/api/validation/circuit-breakers")
+async def get_circuit_breakers():
+    """Get per-device circuit breaker state for live validation"""
+    if not BATCH_VALIDATION_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Batch commands validator not available")
+    
+    from validation.resilience import get_default_breakers
+    return {
+        "devices": get_default_breakers().snapshot(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@app.get("/api/validation/device-queues")
+async def get_device_queues():
+    """Get per-device exchange queue depth and wait times (live mode contention)"""
+    if not BATCH_VALIDATION_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Batch commands validator not available")
+    
+    from validation.device_scheduler import get_device_scheduler
+    return {
+        "devices": get_device_scheduler().snapshot(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @app.get("/api/results")
 async def get_results() -> Dict[str, Any]:
     """Get validation results (alias for history endpoint)"""
@@ -350,6 +350,12 @@ class DRSValidatorUI {
                 })
             });
 
+            if (response.status === 429) {
+                // Cola de validaciones llena: el servidor indica cuándo reintentar
+                const retryAfter = response.headers.get('Retry-After');
+                throw new Error(`Cola de validaciones llena, reintente en ${retryAfter}s`);
+            }
+
             if (!response.ok) {
                 throw new Error(`HTTP ${response.status}: ${response.statusText}`);
             }
@@ -357,10 +363,13 @@ class DRSValidatorUI {
             const result = await response.json();
             
             // Check if this is the new WebSocket response or legacy response
-            if (result.client_id && result.status === 'started') {
+            if (result.client_id && (result.status === 'started' || result.status === 'queued')) {
                 // New WebSocket approach
                 const clientId = result.client_id;
                 this.appendToOutput(`[INFO] 🚀 Iniciando validación con ID: ${clientId}`);
+                if (result.queue_position) {
+                    this.appendToOutput(`[INFO] ⏳ En cola: posición ${result.queue_position} (~${Math.round(result.eta_seconds)}s)`);
+                }
                 
                 // Step 2: Connect to WebSocket for real-time logs
                 await this.connectToValidationLogs(clientId);
@@ -394,12 +403,15 @@ class DRSValidatorUI {
             this.appendToOutput(`[STATS] 📈 Total: ${stats.total_commands} | ✅ Exitosos: ${stats.passed} | ❌ Fallidos: ${stats.failed} | ⏱️ Timeouts: ${stats.timeouts}`);
             this.appendToOutput(`[STATS] 🎯 Tasa de Éxito: ${stats.success_rate}% | ⏰ Promedio: ${stats.average_duration_ms}ms`);
         }
+        if (result.root_cause) {
+            this.appendToOutput(`[ERROR] ⛔ Dispositivo inalcanzable: ${result.root_cause.error} (${result.root_cause.skipped_commands} comandos omitidos)`);
+        }
         
         // Show individual test results with hex frames and decoded values
         if (result.tests && result.tests.length > 0) {
             this.appendToOutput(`\n[COMMANDS] 📋 Comandos Ejecutados:`);
             result.tests.forEach((test, index) => {
-                const status = test.status === 'PASS' ? '✅' : test.status === 'TIMEOUT' ? '⏱️' : '❌';
+                const status = test.status === 'PASS' ? '✅' : test.status === 'TIMEOUT' ? '⏱️' : test.status === 'SKIPPED' ? '⏭️' : test.status === 'CANCELLED' ? '🛑' : '❌';
                 const commandType = test.is_set_command ? 'SET' : 'GET';
                 const typeIcon = test.is_set_command ? '⚙️' : '🔍';
                 
@@ -480,6 +492,16 @@ class DRSValidatorUI {
                                 }, 1000);
                                 return;
                             }
+                            if (data.type === 'validation_plan') {
+                                this.appendToOutput(`[INFO] ⏱️ Duración estimada: ~${data.eta_seconds}s (${data.total_commands} comandos)`);
+                                this.updateProgressText(`0/${data.total_commands} comandos · ~${data.eta_seconds}s restantes`);
+                                return;
+                            }
+                            if (data.type === 'validation_progress') {
+                                this.setProgress(Math.round((data.completed / data.total_commands) * 100));
+                                this.updateProgressText(`${data.completed}/${data.total_commands} comandos · ~${data.remaining_seconds}s restantes`);
+                                return;
+                            }
                         } catch (e) {
                             // Not JSON, treat as regular log message
                             console.warn('Failed to parse WebSocket message as JSON:', message);
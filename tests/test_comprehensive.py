@@ -6,10 +6,17 @@ Tests comprehensive functionality including:
 - Hex frame generation and validation  
 - Batch command execution (mock/live)
 - SantoneDecoder integration
+- Mock latency models (zero, fixed, random, replay)
+- Incremental re-validation of failed or stale commands
+- Precompiled frame registry and lazy SET frame generation
 - FastAPI endpoint simulation
 - Error handling and edge cases
 """
 
+import json
+import subprocess
+import tempfile
+import time
 import unittest
 import sys
 from pathlib import Path
@@ -19,8 +26,25 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root / "src"))
 
 from validation.batch_commands_validator import BatchCommandsValidator, CommandType, ValidationResult
-from validation.hex_frames import get_master_frame, get_remote_frame, validate_frame_format
+from validation.hex_frames import (
+    DEVICE_MASTER,
+    DEVICE_REMOTE,
+    FrameRegistry,
+    get_frame_registry,
+    get_master_frame,
+    get_master_set_command_frame,
+    get_remote_frame,
+    validate_frame_format
+)
 from validation.decoder_integration import CommandDecoderMapping, create_mock_decoder_response
+from validation.incremental import load_previous_result, select_commands
+from validation.mock_latency import (
+    FixedLatency,
+    MockLatencyModel,
+    RandomLatency,
+    ReplayLatency,
+    create_mock_latency
+)
 
 
 class TestBatchCommandsValidator(unittest.TestCase):
@@ -213,7 +237,9 @@ class TestBatchCommandsValidator(unittest.TestCase):
     
     def test_performance_metrics(self):
         """Test that performance metrics are properly captured"""
-        result = self.validator.validate_batch_commands(
+        # Latencia fija: el perfil por defecto puede ser "zero" (DRS_MOCK_LATENCY en CI)
+        validator = BatchCommandsValidator(mock_latency=FixedLatency(latency_ms=5))
+        result = validator.validate_batch_commands(
             ip_address=self.test_ip,
             command_type=CommandType.MASTER,
             mode="mock",
@@ -237,6 +263,221 @@ class TestBatchCommandsValidator(unittest.TestCase):
         print(f"✅ Performance metrics tests passed - avg {stats['average_duration_ms']}ms per command")
 
 
+class TestMockLatency(unittest.TestCase):
+    """Test suite for configurable mock latency models"""
+
+    COMMANDS = ["device_id", "temperature", "datt", "input_and_output_power"]
+
+    def _run_mock(self, model):
+        validator = BatchCommandsValidator(mock_latency=model)
+        return validator.validate_batch_commands("192.168.1.100", CommandType.MASTER, "mock", self.COMMANDS)
+
+    def test_zero_latency_profile(self):
+        """The zero profile runs a full mock batch without sleeping"""
+        start = time.perf_counter()
+        result = self._run_mock(create_mock_latency("zero"))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(result["statistics"]["passed"], len(self.COMMANDS))
+        self.assertLess(elapsed, 0.2)
+        self.assertEqual(create_mock_latency("zero").setup_seconds, 0)
+
+        print(f"✅ Mock latency tests passed - zero profile batch in {elapsed * 1000:.1f}ms")
+
+    def test_fixed_and_random_models(self):
+        """Fixed latency is constant and random latency stays within bounds"""
+        self.assertEqual(FixedLatency(latency_ms=40).delay_for("device_id"), 0.04)
+
+        uniform = RandomLatency(min_ms=50, max_ms=200, seed=1)
+        normal = RandomLatency(min_ms=80, max_ms=1500, distribution="normal", mean_ms=350, stddev_ms=120, seed=1)
+        for model in (uniform, normal):
+            delays = [model.delay_for("temperature") for _ in range(200)]
+            self.assertGreaterEqual(min(delays), model.min_ms / 1000)
+            self.assertLessEqual(max(delays), model.max_ms / 1000)
+
+        # Misma semilla, misma secuencia
+        self.assertEqual(
+            [RandomLatency(seed=7).delay_for("x") for _ in range(3)],
+            [RandomLatency(seed=7).delay_for("x") for _ in range(3)]
+        )
+        with self.assertRaises(ValueError):
+            RandomLatency(distribution="pareto")
+
+    def test_replay_recorded_latencies(self):
+        """Replay cycles through recorded per-command latencies from saved live results"""
+        recording = {
+            "mode": "live",
+            "results": [
+                {"command": "device_id", "status": "PASS", "duration_ms": 30},
+                {"command": "device_id", "status": "PASS", "duration_ms": 50},
+                {"command": "temperature", "status": "TIMEOUT", "duration_ms": 3000}
+            ]
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "latencies.json"
+            path.write_text(json.dumps(recording))
+            model = create_mock_latency({"model": "replay", "file": str(path), "fallback_ms": 10})
+
+        self.assertIsInstance(model, ReplayLatency)
+        self.assertEqual([model.delay_for("device_id") for _ in range(3)], [0.03, 0.05, 0.03])
+        # Los timeouts no son latencia del equipo: se usa el valor de respaldo
+        self.assertEqual(model.delay_for("temperature"), 0.01)
+
+    def test_replay_saved_result_file(self):
+        """Replay reads a batch result as written to RESULTS_DIR ({"request", "result"})"""
+        validator = BatchCommandsValidator(mock_latency=FixedLatency(latency_ms=20))
+        batch = validator.validate_batch_commands(
+            "192.168.1.100", CommandType.MASTER, "mock", ["device_id", "temperature"]
+        )
+        recorded = {r["command"]: r["duration_ms"] for r in batch["results"]}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "20250926_194004_master_192_168_1_100.json"
+            path.write_text(json.dumps({
+                "timestamp": "2025-09-26T19:40:04",
+                "request": {"ip_address": "192.168.1.100", "device_type": "master", "live_mode": False},
+                "result": batch
+            }, indent=2))
+            model = create_mock_latency({"model": "replay", "file": str(path), "fallback_ms": 10})
+
+        self.assertEqual(model.to_dict()["commands"], 2)
+        self.assertEqual(model.delay_for("device_id"), recorded["device_id"] / 1000)
+        self.assertEqual(model.delay_for("temperature"), recorded["temperature"] / 1000)
+        self.assertGreaterEqual(recorded["device_id"], 20)
+
+    def test_replay_without_recording_fails(self):
+        """A missing or empty recording is reported instead of silently using the fallback"""
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                create_mock_latency({"model": "replay", "file": str(Path(tmp) / "missing.json")})
+            empty = Path(tmp) / "empty.json"
+            empty.write_text(json.dumps({"request": {}, "result": {"results": []}}))
+            with self.assertRaises(ValueError):
+                create_mock_latency({"model": "replay", "file": str(empty)})
+
+    def test_profile_selection(self):
+        """Profiles come from validation_scenarios.yaml and unknown names are rejected"""
+        self.assertIsInstance(create_mock_latency("zero"), MockLatencyModel)
+        self.assertIsInstance(create_mock_latency("fixed"), FixedLatency)
+        realistic = create_mock_latency("realistic")
+        self.assertIsInstance(realistic, RandomLatency)
+        self.assertEqual((realistic.min_ms, realistic.max_ms), (50, 200))
+        with self.assertRaises(ValueError):
+            create_mock_latency("warp-speed")
+
+
+class TestIncrementalRevalidation(unittest.TestCase):
+    """Test suite for incremental re-validation from a previous result"""
+
+    COMMANDS = ["device_id", "temperature", "datt", "input_and_output_power"]
+
+    def setUp(self):
+        self.validator = BatchCommandsValidator(mock_latency=MockLatencyModel())
+        self.previous = self.validator.validate_batch_commands(
+            "192.168.1.100", CommandType.MASTER, "mock", self.COMMANDS
+        )
+
+    def test_only_failed_commands_rerun(self):
+        """Failed and timed-out commands are re-run; passing ones are carried over"""
+        self.previous["results"][1].update(status="TIMEOUT", error="TCP timeout")
+        self.previous["results"][3].update(status="FAIL")
+        self.assertEqual(select_commands(self.previous), ["temperature", "input_and_output_power"])
+
+        result = self.validator.revalidate_batch_commands(self.previous)
+
+        self.assertEqual(result["incremental"]["rerun_commands"], ["temperature", "input_and_output_power"])
+        self.assertEqual(result["incremental"]["reused_commands"], 2)
+        self.assertEqual(result["incremental"]["previous_run_id"], self.previous["run_id"])
+        self.assertEqual([r["command"] for r in result["results"]], self.COMMANDS)
+        self.assertEqual(result["statistics"]["passed"], 4)
+        self.assertEqual(result["overall_status"], "PASS")
+        self.assertNotEqual(result["run_id"], self.previous["run_id"])
+
+        sources = [r["provenance"]["source"] for r in result["results"]]
+        self.assertEqual(sources, ["previous", "rerun", "previous", "rerun"])
+        self.assertEqual(result["results"][0]["provenance"]["run_id"], self.previous["run_id"])
+        self.assertEqual(result["results"][0]["provenance"]["validated_at"], self.previous["timestamp"])
+
+        print("✅ Incremental re-validation tests passed")
+
+    def test_stale_commands_rerun(self):
+        """Passing commands older than max_age_seconds are re-run too"""
+        self.previous["timestamp"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - 7200))
+        self.assertEqual(select_commands(self.previous, max_age_seconds=3600), self.COMMANDS)
+        self.assertEqual(select_commands(self.previous), [])
+
+        # Nada que re-ejecutar: todo se conserva sin enviar comandos
+        result = self.validator.revalidate_batch_commands(self.previous)
+        self.assertEqual(result["incremental"]["rerun_commands"], [])
+        self.assertEqual(result["incremental"]["reused_commands"], len(self.COMMANDS))
+
+        # En una cadena de revalidaciones cuenta la antigüedad de cada comando
+        chained = self.validator.revalidate_batch_commands(self.previous, max_age_seconds=3600)
+        self.assertEqual(select_commands(chained, max_age_seconds=3600), [])
+
+    def test_load_previous_by_filename_and_run_id(self):
+        """Saved results are found by file name or run_id"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "20250101_120000_master_192_168_1_100.json"
+            path.write_text(json.dumps({"request": {}, "result": self.previous}))
+
+            self.assertEqual(load_previous_result(path.name, tmp)["run_id"], self.previous["run_id"])
+            self.assertEqual(load_previous_result(path.stem, tmp)["run_id"], self.previous["run_id"])
+            self.assertEqual(load_previous_result(self.previous["run_id"], tmp)["ip_address"], "192.168.1.100")
+            with self.assertRaises(FileNotFoundError):
+                load_previous_result("does-not-exist", tmp)
+
+
+class TestFrameRegistry(unittest.TestCase):
+    """Test suite for the precompiled frame registry"""
+
+    def test_lookup_returns_ready_bytes(self):
+        """GET and SET frames resolve to bytes by (device type, command)"""
+        registry = get_frame_registry()
+        self.assertIs(registry, get_frame_registry())
+        self.assertEqual(registry.get(DEVICE_MASTER, "device_id"), bytes.fromhex(get_master_frame("device_id")))
+        self.assertEqual(registry.get_hex(DEVICE_REMOTE, "temperature"), get_remote_frame("temperature"))
+        self.assertTrue(registry.is_valid(DEVICE_MASTER, "device_id"))
+        self.assertIsNone(registry.get(DEVICE_REMOTE, "optical_port_devices_connected_4"))
+        self.assertFalse(registry.is_valid(DEVICE_MASTER, "unknown_command"))
+
+        for command, frame in registry.hex_frames(DEVICE_MASTER, set_commands=True).items():
+            self.assertTrue(command.startswith("set_"))
+            self.assertEqual(registry.get(DEVICE_MASTER, command), bytes.fromhex(frame))
+            self.assertEqual(get_master_set_command_frame(command), frame)
+        # Un GET no es un comando SET aunque esté en el registro master
+        self.assertEqual(get_master_set_command_frame("device_id"), "")
+
+    def test_registry_is_immutable(self):
+        """Registered frames cannot be replaced or modified after build"""
+        source = bytearray.fromhex("7E070000970000E8357E")
+        registry = FrameRegistry([(DEVICE_MASTER, "device_id", source)])
+        source[1] = 0xFF
+        self.assertEqual(registry.get_hex(DEVICE_MASTER, "device_id"), "7E070000970000E8357E")
+        self.assertIsInstance(registry.get(DEVICE_MASTER, "device_id"), bytes)
+        with self.assertRaises(TypeError):
+            registry._bytes[(DEVICE_MASTER, "device_id")] = b""
+        self.assertEqual(len(registry), 1)
+
+    def test_set_frames_are_generated_lazily(self):
+        """Importing hex_frames builds no SET frames until they are accessed"""
+        code = (
+            "import validation.hex_frames as h\n"
+            "assert h._set_frames is None\n"
+            "assert h.TOTAL_MASTER_COMMANDS == len(h.DRS_MASTER_FRAMES)\n"
+            "assert h._set_frames is None\n"
+            "frames = h.DRS_SET_FRAMES\n"
+            "assert h.DRS_SET_FRAMES is frames\n"
+            "assert h.TOTAL_SET_COMMANDS == len(frames)\n"
+            "assert h.TOTAL_UNIQUE_COMMANDS >= h.TOTAL_MASTER_COMMANDS\n"
+        )
+        completed = subprocess.run(
+            [sys.executable, "-c", code], cwd=str(project_root / "src"), capture_output=True, text=True
+        )
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+
+        print("✅ Frame registry tests passed")
+
+
 class TestAPIIntegration(unittest.TestCase):
     """Test API integration aspects"""
     
@@ -419,6 +660,9 @@ def run_comprehensive_tests():
     
     # Add test classes
     test_suite.addTest(unittest.makeSuite(TestBatchCommandsValidator))
+    test_suite.addTest(unittest.makeSuite(TestMockLatency))
+    test_suite.addTest(unittest.makeSuite(TestIncrementalRevalidation))
+    test_suite.addTest(unittest.makeSuite(TestFrameRegistry))
     test_suite.addTest(unittest.makeSuite(TestAPIIntegration))
     
     # Run tests
@@ -15,6 +15,8 @@ import unittest
 import sys
 import asyncio
 import json
+import os
+import tempfile
 import time
 from pathlib import Path
 from unittest.mock import patch, AsyncMock, MagicMock
@@ -23,6 +25,12 @@ from unittest.mock import patch, AsyncMock, MagicMock
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root / "src"))
 
+# Los resultados y perfiles de pausa que guardan los tests van a un directorio
+# temporal, no a /app/results
+_results_tmp = tempfile.TemporaryDirectory(prefix="drs_test_results_")
+os.environ["DRS_RESULTS_DIR"] = _results_tmp.name
+os.environ["DRS_PACING_FILE"] = str(Path(_results_tmp.name) / "device_profiles" / "pacing.json")
+
 # Try to import FastAPI test client
 try:
     from fastapi.testclient import TestClient
@@ -103,7 +111,7 @@ class TestEndToEndValidation(unittest.TestCase):
         """Test complete batch commands validation workflow in mock mode"""
         # Mock the validator
         mock_validator = MagicMock()
-        mock_validator.validate_batch_commands.return_value = {
+        mock_validator.validate_batch_commands_async = AsyncMock(return_value={
             "overall_status": "PASS",
             "command_type": "master",
             "mode": "mock",
@@ -138,7 +146,7 @@ class TestEndToEndValidation(unittest.TestCase):
             ],
             "duration_ms": 143,
             "timestamp": "2025-01-13T10:00:00Z"
-        }
+        })
         mock_validator_class.return_value = mock_validator
 
         # Test request
@@ -160,8 +168,8 @@ class TestEndToEndValidation(unittest.TestCase):
         self.assertEqual(len(data["results"]), 3)
 
         # Verify validator was called correctly
-        mock_validator.validate_batch_commands.assert_called_once()
-        call_args = mock_validator.validate_batch_commands.call_args
+        mock_validator.validate_batch_commands_async.assert_awaited_once()
+        call_args = mock_validator.validate_batch_commands_async.call_args
         self.assertEqual(call_args[1]["ip_address"], self.test_ip)
         self.assertEqual(call_args[1]["command_type"], "master")
         self.assertEqual(call_args[1]["mode"], "mock")
@@ -170,7 +178,7 @@ class TestEndToEndValidation(unittest.TestCase):
     def test_batch_commands_validation_with_timeouts(self, mock_validator_class):
         """Test batch commands validation with timeouts"""
         mock_validator = MagicMock()
-        mock_validator.validate_batch_commands.return_value = {
+        mock_validator.validate_batch_commands_async = AsyncMock(return_value={
             "overall_status": "FAIL",
             "command_type": "remote",
             "mode": "live",
@@ -200,7 +208,7 @@ class TestEndToEndValidation(unittest.TestCase):
             ],
             "duration_ms": 6000,
             "timestamp": "2025-01-13T10:00:00Z"
-        }
+        })
         mock_validator_class.return_value = mock_validator
 
         request_data = {
@@ -280,6 +288,55 @@ class TestEndToEndValidation(unittest.TestCase):
         self.assertIn("ip_address", data)
         self.assertEqual(data["ip_address"], self.test_ip)
 
+    def test_ping_fallback_closes_connections_and_reaps_ping(self):
+        """The live connectivity check awaits writer close and reaps a killed ping"""
+        import validation_app
+        events = []
+
+        class FakeWriter:
+            def close(self):
+                events.append("close")
+
+            async def wait_closed(self):
+                events.append("wait_closed")
+                raise ConnectionResetError("reset while closing")
+
+        class HangingPing:
+            def __init__(self):
+                self.killed = asyncio.Event()
+
+            async def wait(self):
+                await self.killed.wait()
+                events.append("reaped")
+                return -9
+
+            def kill(self):
+                events.append("kill")
+                self.killed.set()
+
+        async def reachable(ip_address, port):
+            return None, FakeWriter()
+
+        async def unreachable(ip_address, port):
+            raise OSError("unreachable")
+
+        async def hanging_ping(*args, **kwargs):
+            return HangingPing()
+
+        with patch.dict(os.environ, {"DOCKER_CONTAINER": "1"}):
+            with patch("asyncio.open_connection", reachable):
+                response = self.client.post(f"/api/validation/ping/{self.test_ip}?mode=live")
+            self.assertEqual(response.json()["status"], "PASS")
+            self.assertEqual(events, ["close", "wait_closed"])
+
+            events.clear()
+            with patch("asyncio.open_connection", unreachable), \
+                    patch("asyncio.create_subprocess_exec", hanging_ping), \
+                    patch.object(validation_app, "PING_TIMEOUT_SECONDS", 0.05):
+                response = self.client.post(f"/api/validation/ping/{self.test_ip}?mode=live")
+        self.assertIn("Ping timeout", response.json()["message"])
+        self.assertEqual(events, ["kill", "reaped"])
+
     def test_results_endpoints(self):
         """Test results retrieval endpoints"""
         # Test results list
@@ -338,6 +395,193 @@ class TestEndToEndValidation(unittest.TestCase):
         self.assertIn("status", data)
         self.assertIn("timestamp", data)
 
+    def test_fleet_validation_mock(self):
+        """Test multi-device fleet validation endpoint in mock mode"""
+        fleet_request = {
+            "mode": "mock",
+            "max_concurrency": 4,
+            "per_site_concurrency": 2,
+            "devices": [
+                {"ip_address": f"192.168.11.{n}", "command_type": "master", "site": "tunnel-a",
+                 "selected_commands": ["device_id", "temperature"]}
+                for n in range(1, 4)
+            ] + [
+                {"ip_address": "192.168.60.160", "command_type": "remote", "site": "tunnel-b",
+                 "selected_commands": ["temperature"]}
+            ]
+        }
+
+        response = self.client.post("/api/validation/fleet", json=fleet_request)
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertEqual(data["total_devices"], 4)
+        self.assertEqual(len(data["devices"]), 4)
+        self.assertEqual(data["summary"]["commands"]["total_commands"], 7)
+        self.assertEqual(set(data["sites"]), {"tunnel-a", "tunnel-b"})
+
+        invalid = {"mode": "mock", "devices": [{"ip_address": self.test_ip, "command_type": "set"}]}
+        response = self.client.post("/api/validation/fleet", json=invalid)
+        self.assertEqual(response.status_code, 400)
+
+        negative = dict(fleet_request, max_concurrency=-1)
+        response = self.client.post("/api/validation/fleet", json=negative)
+        self.assertEqual(response.status_code, 400)
+
+        oversized = {"mode": "mock", "devices": [
+            {"ip_address": f"10.0.{n // 250}.{n % 250}", "command_type": "master"} for n in range(257)
+        ]}
+        response = self.client.post("/api/validation/fleet", json=oversized)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("maximum is 256", response.json()["error"])
+
+    def test_cancel_validation(self):
+        """Test cancelling a running validation records a CANCELLED partial result"""
+        import socket
+        import validation_app
+
+        silent = socket.socket()
+        silent.bind(("127.0.0.1", 0))
+        silent.listen(8)  # Acepta la conexión pero nunca responde
+        client_id = f"{self.test_client_id}-cancel"
+        request = {
+            "ip_address": "127.0.0.1",
+            "port": silent.getsockname()[1],
+            "command_type": "master",
+            "mode": "live",
+            "client_id": client_id
+        }
+
+        async def scenario():
+            validation_app.active_tasks[client_id] = {"status": "STARTING"}
+            run = asyncio.create_task(validation_app.run_validation_with_logging(client_id, request))
+            # Sin WebSocket, la validación arranca tras esperar la conexión de logs
+            while client_id not in validation_app.running_validations:
+                await asyncio.sleep(0.05)
+            await asyncio.sleep(0.2)
+            start = time.monotonic()
+            response = await validation_app.cancel_validation(client_id)
+            await run
+            return response, time.monotonic() - start
+
+        try:
+            response, elapsed = asyncio.run(scenario())
+        finally:
+            silent.close()
+
+        self.assertEqual(response["status"], "cancelling")
+        self.assertLess(elapsed, 1.0)
+        task = self.client.get(f"/api/validation/task/{client_id}").json()
+        self.assertEqual(task["status"], "CANCELLED")
+        self.assertEqual(task["details"]["overall_status"], "CANCELLED")
+        self.assertGreater(task["details"]["statistics"]["cancelled"], 0)
+        self.assertNotIn(client_id, validation_app.running_validations)
+
+        response = self.client.post("/api/validation/cancel/unknown-client")
+        self.assertEqual(response.status_code, 404)
+
+    def test_batch_commands_stream_mock(self):
+        """Test streaming batch results as NDJSON and SSE"""
+        stream_request = {
+            "ip_address": self.test_ip,
+            "command_type": "master",
+            "mode": "mock",
+            "selected_commands": ["device_id", "temperature", "datt"],
+            "mock_latency_profile": "zero"
+        }
+
+        response = self.client.post("/api/validation/batch-commands/stream", json=stream_request)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+
+        records = [json.loads(line) for line in response.text.splitlines() if line]
+        self.assertEqual([r["type"] for r in records], ["result"] * 3 + ["summary"])
+        self.assertEqual([r["command"] for r in records[:3]], stream_request["selected_commands"])
+        self.assertEqual(records[-1]["statistics"]["total_commands"], 3)
+        self.assertNotIn("results", records[-1])
+
+        response = self.client.post("/api/validation/batch-commands/stream?format=sse", json=stream_request)
+        self.assertEqual(response.status_code, 200)
+        events = [line for line in response.text.splitlines() if line.startswith("event: ")]
+        self.assertEqual(events, ["event: result"] * 3 + ["event: summary"])
+
+        response = self.client.post("/api/validation/batch-commands/stream?format=xml", json=stream_request)
+        self.assertEqual(response.status_code, 400)
+
+
+    def test_batch_commands_do_not_block_event_loop(self):
+        """Test that other requests are served while a batch is running"""
+        import httpx
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                batch = asyncio.create_task(client.post("/api/validation/batch-commands", json={
+                    "ip_address": self.test_ip,
+                    "command_type": "master",
+                    "mode": "mock",
+                    "selected_commands": ["device_id", "temperature", "datt", "input_and_output_power"],
+                    "mock_latency_profile": "fixed"
+                }))
+                await asyncio.sleep(0.05)
+                start = time.perf_counter()
+                health = await client.get("/health")
+                health_elapsed = time.perf_counter() - start
+                self.assertFalse(batch.done())
+                return health, health_elapsed, await batch
+
+        health, health_elapsed, batch_response = asyncio.run(scenario())
+        self.assertEqual(health.status_code, 200)
+        self.assertLess(health_elapsed, 0.1)
+        self.assertEqual(batch_response.status_code, 200)
+        self.assertEqual(batch_response.json()["statistics"]["passed"], 4)
+
+    def test_incremental_batch_commands(self):
+        """Test incremental re-validation of a saved result by run_id"""
+        import tempfile
+        import validation_app
+        from validation.batch_commands_validator import BatchCommandsValidator, CommandType
+        from validation.mock_latency import MockLatencyModel
+
+        previous = BatchCommandsValidator(mock_latency=MockLatencyModel()).validate_batch_commands(
+            "192.168.1.100", CommandType.MASTER, "mock", ["device_id", "temperature"]
+        )
+        previous["results"][1]["status"] = "TIMEOUT"
+        on_event_loop = []
+
+        def off_loop(func):
+            # Registra si la lectura/escritura de archivos corre en el event loop
+            def wrapper(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                    on_event_loop.append(func.__name__)
+                except RuntimeError:
+                    pass
+                return func(*args, **kwargs)
+            return wrapper
+
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "previous.json").write_text(json.dumps({"request": {}, "result": previous}))
+            with patch.object(validation_app, "RESULTS_DIR", Path(tmp)), \
+                    patch.object(validation_app, "load_previous_result", off_loop(validation_app.load_previous_result)), \
+                    patch.object(validation_app, "save_result_file", off_loop(validation_app.save_result_file)):
+                response = self.client.post("/api/validation/batch-commands/incremental", json={
+                    "previous": previous["run_id"]
+                })
+                missing = self.client.post("/api/validation/batch-commands/incremental", json={
+                    "previous": "unknown-run"
+                })
+                saved = sorted(p.name for p in Path(tmp).glob("*.json"))
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["incremental"]["rerun_commands"], ["temperature"])
+        self.assertEqual(data["statistics"]["passed"], 2)
+        self.assertEqual(data["results"][0]["provenance"]["source"], "previous")
+        self.assertIn(data["saved_file"], saved)
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(on_event_loop, [])
+
 
 class TestEndToEndIntegration(unittest.TestCase):
     """Integration tests for end-to-end workflows"""
@@ -405,6 +649,228 @@ class TestEndToEndIntegration(unittest.TestCase):
                 self.assertIn("status", result)
 
 
+class TestValidationJobQueue(unittest.TestCase):
+    """Test suite for validation admission control and queueing"""
+
+    def setUp(self):
+        """Set up job queue fixtures"""
+        if not FASTAPI_AVAILABLE:
+            self.skipTest("FastAPI test client not available")
+
+        from validation.job_queue import ValidationJobQueue
+        self.queue = ValidationJobQueue(max_workers=1, max_queued=1, initial_job_seconds=10)
+        self.client = TestClient(app)
+
+    def test_queue_full_returns_429(self):
+        """A full queue rejects new runs with 429 and Retry-After"""
+        import validation_app
+        from validation.job_queue import QueueFullError
+
+        self.assertEqual(self.queue.submit("busy"), 0)
+        self.assertEqual(self.queue.submit("waiting"), 1)
+        with self.assertRaises(QueueFullError):
+            self.queue.submit("overflow")
+
+        with patch.object(validation_app, "job_queue", self.queue):
+            response = self.client.post("/api/validation/run", json={
+                "ip_address": "192.168.1.100", "command_type": "master", "mode": "mock",
+                "client_id": "overflow"
+            })
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["Retry-After"], "10")
+        self.assertEqual(response.json()["queue"]["rejected"], 2)
+
+        print("✅ Validation job queue tests passed")
+
+    def test_fleet_runs_take_a_queue_slot(self):
+        """Fleet validations are admitted through the job queue and release their slot"""
+        import validation_app
+
+        fleet_request = {"mode": "mock", "devices": [
+            {"ip_address": "192.168.11.1", "command_type": "master", "selected_commands": ["device_id"]}
+        ]}
+        with patch.object(validation_app, "job_queue", self.queue):
+            response = self.client.post("/api/validation/fleet", json=fleet_request)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.queue.snapshot()["completed"], 1)
+            self.assertEqual(self.queue.snapshot()["running"], 0)
+
+            self.queue.submit("busy")
+            self.queue.submit("waiting")
+            response = self.client.post("/api/validation/fleet", json=fleet_request)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response.headers)
+
+    def test_failed_start_releases_queue_slot(self):
+        """A state backend error after admission gives the worker back"""
+        import validation_app
+
+        async def failing_status(client_id, data):
+            raise RuntimeError("state backend unavailable")
+
+        with patch.object(validation_app, "job_queue", self.queue), \
+                patch.object(validation_app, "set_task_status", failing_status):
+            response = self.client.post("/api/validation/run", json={
+                "ip_address": "192.168.1.100", "command_type": "master", "mode": "mock",
+                "client_id": "failing-start"
+            })
+
+        self.assertEqual(response.json()["status"], "error")
+        self.assertIn("state backend unavailable", response.json()["message"])
+        self.assertIsNone(self.queue.position("failing-start"))
+        self.assertEqual(self.queue.snapshot()["running"], 0)
+
+    def test_queued_task_reports_position_and_eta(self):
+        """Queued runs expose position and ETA through the task endpoint"""
+        import validation_app
+
+        self.queue.submit("busy")
+        self.queue.submit("queued-client")
+        with patch.dict(validation_app.active_tasks, {"queued-client": {"status": "QUEUED"}}), \
+                patch.object(validation_app, "job_queue", self.queue):
+            task = self.client.get("/api/validation/task/queued-client").json()
+        self.assertEqual(task["queue_position"], 1)
+        self.assertEqual(task["eta_seconds"], 10.0)
+
+    def test_workers_are_handed_over_in_order(self):
+        """Releasing a worker starts the next queued run; cancelled runs leave the queue"""
+        from validation.job_queue import ValidationJobQueue
+        queue = ValidationJobQueue(max_workers=1, max_queued=2)
+
+        async def scenario():
+            order = []
+
+            async def job(name, hold):
+                await queue.acquire(name)
+                order.append(name)
+                await asyncio.sleep(hold)
+                queue.release(name)
+
+            queue.submit("a")
+            queue.submit("b")
+            queue.submit("c")
+            tasks = [asyncio.create_task(job("a", 0.05)), asyncio.create_task(job("b", 0)),
+                     asyncio.create_task(job("c", 0))]
+            await asyncio.sleep(0.01)
+            self.assertTrue(queue.cancel("b"))
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            return order, results
+
+        order, results = asyncio.run(scenario())
+        self.assertEqual(order, ["a", "c"])
+        self.assertIsInstance(results[1], asyncio.CancelledError)
+        self.assertEqual(queue.snapshot()["running"], 0)
+        self.assertEqual(queue.snapshot()["completed"], 2)
+
+
+class TestSharedState(unittest.TestCase):
+    """Test suite for state shared between API workers"""
+
+    def setUp(self):
+        """Two SQLite backends on one file stand in for two uvicorn workers"""
+        import tempfile
+        from validation.state_backend import SQLiteStateBackend
+        self.tmp = tempfile.TemporaryDirectory()
+        path = Path(self.tmp.name) / "state.db"
+        self.worker_a = SQLiteStateBackend(path)
+        self.worker_b = SQLiteStateBackend(path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_tasks_and_logs_visible_across_workers(self):
+        """Task status and logs written by one worker are read by another"""
+        from validation.state_backend import TaskStatusMap
+
+        tasks_a, tasks_b = TaskStatusMap(self.worker_a), TaskStatusMap(self.worker_b)
+        tasks_a["client-1"] = {"status": "RUNNING", "message": "Validación en curso..."}
+        self.assertIn("client-1", tasks_b)
+        self.assertEqual(tasks_b["client-1"]["status"], "RUNNING")
+        self.assertNotIn("client-2", tasks_b)
+
+        first = self.worker_a.publish_log("client-1", "[INFO] 🚀 inicio")
+        self.worker_a.publish_log("client-1", "---END_OF_LOG---")
+        self.assertEqual([m for _, m in self.worker_b.read_logs("client-1")], ["[INFO] 🚀 inicio", "---END_OF_LOG---"])
+        self.assertEqual([m for _, m in self.worker_b.read_logs("client-1", first)], ["---END_OF_LOG---"])
+
+        self.worker_b.set_connected("client-1", True)
+        self.assertTrue(self.worker_a.is_connected("client-1"))
+        self.worker_b.set_connected("client-1", False)
+        self.assertFalse(self.worker_a.is_connected("client-1"))
+
+        print("✅ Shared state tests passed")
+
+    def test_device_lock_serializes_workers(self):
+        """Only one worker at a time holds a device; expired locks are taken over"""
+        from validation.state_backend import device_lock
+
+        self.assertTrue(self.worker_a.try_lock("device:10.0.0.1:65050", "a", 60))
+        self.assertFalse(self.worker_b.try_lock("device:10.0.0.1:65050", "b", 60))
+        self.worker_a.unlock("device:10.0.0.1:65050", "a")
+        self.assertTrue(self.worker_b.try_lock("device:10.0.0.1:65050", "b", 0))
+        self.assertTrue(self.worker_a.try_lock("device:10.0.0.1:65050", "a", 60))  # El de b venció
+
+        async def scenario():
+            order = []
+
+            async def batch(backend, name):
+                async with device_lock(backend, "10.0.0.2", 65050):
+                    order.append(f"{name}-start")
+                    await asyncio.sleep(0.15)
+                    order.append(f"{name}-end")
+
+            await asyncio.gather(batch(self.worker_a, "a"), batch(self.worker_b, "b"))
+            return order
+
+        order = asyncio.run(scenario())
+        self.assertEqual(order[1], order[0].replace("start", "end"))
+
+    def test_device_lock_is_renewed_while_held(self):
+        """A batch longer than the lock TTL keeps the device"""
+        from validation.state_backend import device_lock
+
+        async def scenario():
+            async with device_lock(self.worker_a, "10.0.0.3", 65050, ttl_seconds=0.3):
+                await asyncio.sleep(0.5)
+                return self.worker_b.try_lock("device:10.0.0.3:65050", "b", 60)
+
+        self.assertFalse(asyncio.run(scenario()))
+        self.assertTrue(self.worker_b.try_lock("device:10.0.0.3:65050", "b", 60))
+
+    def test_cancel_requests_visible_across_workers(self):
+        """A cancel requested on one worker is seen by the worker running the validation"""
+        from validation.state_backend import CancelRequests
+
+        CancelRequests(self.worker_a).add("client-1")
+        self.assertIn("client-1", CancelRequests(self.worker_b))
+        self.assertNotIn("client-2", CancelRequests(self.worker_b))
+        CancelRequests(self.worker_b).discard("client-1")
+        self.assertNotIn("client-1", CancelRequests(self.worker_a))
+
+    def test_failed_lock_transaction_keeps_original_error(self):
+        """The error that aborted a lock transaction is not replaced by the ROLLBACK"""
+        import sqlite3
+
+        class FailingCommit:
+            def __init__(self, db):
+                self.db = db
+
+            @property
+            def in_transaction(self):
+                return self.db.in_transaction
+
+            def execute(self, sql, params=()):
+                if sql == "COMMIT":
+                    # SQLite ya deshizo la transacción al fallar
+                    self.db.execute("ROLLBACK")
+                    raise sqlite3.OperationalError("disk I/O error")
+                return self.db.execute(sql, params)
+
+        self.worker_a._db = FailingCommit(self.worker_a._db)
+        with self.assertRaisesRegex(sqlite3.OperationalError, "disk I/O error"):
+            self.worker_a.try_lock("device:10.0.0.4:65050", "a", 60)
+
+
 def run_e2e_tests():
     """Run end-to-end test suite"""
     print("=== 🚀 Running End-to-End Test Suite ===")
@@ -416,6 +882,8 @@ def run_e2e_tests():
     # Add test classes
     test_suite.addTest(unittest.makeSuite(TestEndToEndValidation))
     test_suite.addTest(unittest.makeSuite(TestEndToEndIntegration))
+    test_suite.addTest(unittest.makeSuite(TestValidationJobQueue))
+    test_suite.addTest(unittest.makeSuite(TestSharedState))
 
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
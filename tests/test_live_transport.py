@@ -0,0 +1,1436 @@
+#!/usr/bin/env python3
+"""
+Unit Tests for the Live Santone Transport
+
+Tests live-mode execution against an in-process fake DRS device:
+- Persistent device sessions (one TCP connection per batch)
+- Transparent reconnection when the link drops
+- Native asyncio transport shared by many concurrent sessions
+- Frame-aware stream reading (fragmented and coalesced TCP segments)
+- Pipelined GET windows matched by command number
+- Adaptive inter-command pacing
+- Adaptive per-device response timeouts (RTO)
+- Fail-fast skipping of unreachable devices
+- Retries with jittered backoff and per-device circuit breakers
+- Multi-device fleet validation with bounded concurrency
+- Process-wide per-device exchange scheduling
+- Coalescing of identical in-flight GET reads
+- Short-TTL read cache with invalidation on SET commands
+- Streaming of per-command results as they complete
+- Cancellation of in-flight batches down to the socket
+- SET commands verified by reading back the written parameter
+- Early termination once the batch verdict is decided
+- Tiered validation escalating from a health probe on anomalies
+- History-informed command ordering and run-duration prediction
+"""
+
+import asyncio
+import errno
+import json
+import tempfile
+import unittest
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path for imports
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "src"))
+
+from validation.batch_commands_validator import BatchCommandsValidator, CommandType, ValidationResult
+from validation.device_session import (
+    AsyncDeviceSession,
+    classify_connection_error,
+    CONNECTION_REFUSED,
+    CONNECT_TIMEOUT,
+    HOST_UNREACHABLE
+)
+from validation.frame_reader import SantoneFrameReader, is_well_formed_frame, unescape_frame_content
+from validation.hex_frames import get_master_frame
+from validation.pacing import PacingController, BACKOFF_FLOOR_MS, DECREASE_AFTER_SUCCESSES
+from validation.rto import RTOEstimator
+from validation.fleet import FleetDevice, FleetValidator
+from validation.device_scheduler import DeviceScheduler, get_device_scheduler
+from validation.single_flight import SingleFlight
+from validation.read_cache import DeviceReadCache
+from validation.readback import ReadbackCheck, frame_payload, plan_readback
+from validation.early_stop import EarlyStopPolicy
+from validation.history import DEFAULT_COMMAND_MS, CommandHistory
+from validation.tiered import ANOMALY_MISSING, ANOMALY_OUT_OF_RANGE, TIER_GET, TIER_PROBE, TieredPlan
+from validation.mock_latency import MockLatencyModel
+from validation.set_commands import build_santone_frame
+from validation.resilience import CircuitBreaker, CircuitBreakerRegistry, RetryPolicy, CIRCUIT_OPEN, CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN
+from validation.scenarios import ValidationScenarios
+from validation.real_drs_responses_20250926_194004 import REAL_DRS_RESPONSES
+
+
+# Respuestas del dispositivo simulado indexadas por número de comando
+RESPONSES_BY_COMMAND_NUMBER = {
+    bytes.fromhex(frame)[4]: bytes.fromhex(frame)
+    for frame in REAL_DRS_RESPONSES.values()
+}
+
+
+class FakeDRSServer:
+    """Dispositivo DRS simulado que responde tramas Santone reales por TCP"""
+
+    def __init__(self, drop_after: int = 0, fragment_delay: float = 0, reverse_order: bool = False,
+                 response_delay: float = 0, corrupt_first: int = 0, responder=None):
+        """
+        Args:
+            drop_after: Cierra la conexión tras N respuestas (0 = nunca)
+            fragment_delay: Si > 0, envía cada respuesta en dos segmentos separados por este retardo
+            reverse_order: Responde en orden inverso las tramas recibidas en un mismo segmento
+            response_delay: Retardo antes de cada respuesta (None = nunca responde)
+            corrupt_first: Las primeras N respuestas se envían con un byte alterado (CRC inválido)
+            responder: Función trama -> respuesta que reemplaza a las respuestas reales
+        """
+        self.connections = 0
+        self.requests = 0
+        self.request_connections = []
+        self.drop_after = drop_after
+        self.fragment_delay = fragment_delay
+        self.reverse_order = reverse_order
+        self.response_delay = response_delay
+        self.corrupt_first = corrupt_first
+        self.responder = responder
+        fake = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                fake.connections += 1
+                connection = fake.connections
+                served = 0
+                reader = SantoneFrameReader()
+                while True:
+                    data = self.request.recv(1024)
+                    if not data:
+                        return
+                    reader.feed(data)
+                    requests = list(iter(reader.next_frame, None))
+                    if fake.reverse_order:
+                        requests.reverse()
+                    for request in requests:
+                        fake.requests += 1
+                        fake.request_connections.append(connection)
+                        if fake.response_delay is None:
+                            continue
+                        time.sleep(fake.response_delay)
+                        if fake.responder:
+                            response = fake.responder(request)
+                        else:
+                            response = RESPONSES_BY_COMMAND_NUMBER.get(request[4], b"")
+                        if fake.requests <= fake.corrupt_first:
+                            response = response[:-4] + bytes([response[-4] ^ 0x01]) + response[-3:]
+                        if fake.fragment_delay:
+                            self.request.sendall(response[:5])
+                            time.sleep(fake.fragment_delay)
+                            response = response[5:]
+                        self.request.sendall(response)
+                        served += 1
+                        if fake.drop_after and served >= fake.drop_after:
+                            return
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestDeviceSession(unittest.TestCase):
+    """Test suite for persistent device sessions"""
+
+    def test_session_reuses_single_connection(self):
+        """All commands of a live batch travel over one TCP connection"""
+        commands = ["device_id", "temperature", "input_and_output_power", "datt"]
+        with FakeDRSServer() as fake:
+            validator = BatchCommandsValidator(timeout_per_command=2)
+            result = validator.validate_batch_commands(
+                ip_address="127.0.0.1",
+                command_type=CommandType.MASTER,
+                mode="live",
+                selected_commands=commands,
+                port=fake.port
+            )
+
+        self.assertEqual(result["statistics"]["passed"], len(commands))
+        self.assertEqual(fake.requests, len(commands))
+        self.assertEqual(fake.connections, 1)
+
+        print("✅ Persistent session tests passed")
+
+    def test_session_reconnects_after_drop(self):
+        """A dropped link is re-established transparently"""
+        frame = bytes.fromhex(get_master_frame("temperature"))
+
+        async def exchange_twice(port):
+            async with AsyncDeviceSession("127.0.0.1", port, timeout=2) as session:
+                return await session.exchange(frame), await session.exchange(frame)
+
+        with FakeDRSServer(drop_after=1) as fake:
+            first, second = asyncio.run(exchange_twice(fake.port))
+
+        self.assertEqual(first, second)
+        self.assertEqual(first[4], 0x02)
+        self.assertEqual(fake.connections, 2)
+
+        print("✅ Session reconnection tests passed")
+
+    def test_session_unreachable_device(self):
+        """Connection errors are raised to the caller"""
+        probe = socket.socket()
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+        probe.close()
+
+        async def exchange_once():
+            session = AsyncDeviceSession("127.0.0.1", port, timeout=1)
+            with self.assertRaises(OSError):
+                await session.exchange(bytes.fromhex(get_master_frame("device_id")))
+            return session
+
+        session = asyncio.run(exchange_once())
+        self.assertFalse(session.is_connected)
+
+    def test_concurrent_sessions_single_event_loop(self):
+        """Many device sessions run concurrently on one event loop without threads"""
+        commands = ["device_id", "temperature"]
+
+        async def run_many(port, count):
+            validator = BatchCommandsValidator(timeout_per_command=2, coalesce_reads=False)
+            return await asyncio.gather(*[
+                validator.validate_batch_commands_async(
+                    ip_address="127.0.0.1",
+                    command_type=CommandType.MASTER,
+                    mode="live",
+                    selected_commands=commands,
+                    port=port
+                )
+                for _ in range(count)
+            ])
+
+        with FakeDRSServer() as fake:
+            results = asyncio.run(run_many(fake.port, 20))
+
+        self.assertEqual(len(results), 20)
+        self.assertTrue(all(r["statistics"]["passed"] == len(commands) for r in results))
+        self.assertEqual(fake.connections, 20)
+
+        print("✅ Concurrent asyncio sessions tests passed")
+
+
+def unused_port() -> int:
+    """Puerto local sin servidor escuchando (conexión rechazada)"""
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    return port
+
+
+class TestFailFast(unittest.TestCase):
+    """Test suite for unreachable-device short-circuit"""
+
+    def test_refused_device_skips_remaining_commands(self):
+        """A refused connection ends the batch with one root-cause error"""
+        commands = ["device_id", "temperature", "input_and_output_power", "datt"]
+        validator = BatchCommandsValidator(timeout_per_command=2, pacing=PacingController(),
+                                           breakers=CircuitBreakerRegistry())
+        start = time.time()
+        result = validator.validate_batch_commands(
+            ip_address="127.0.0.1",
+            command_type=CommandType.MASTER,
+            mode="live",
+            selected_commands=commands,
+            port=unused_port()
+        )
+
+        self.assertLess(time.time() - start, 1)
+        self.assertEqual(result["statistics"]["errors"], 1)
+        self.assertEqual(result["statistics"]["skipped"], len(commands) - 1)
+        self.assertEqual(result["results"][0]["status"], "ERROR")
+        self.assertTrue(all(r["status"] == "SKIPPED" for r in result["results"][1:]))
+        self.assertEqual(result["root_cause"]["reason"], CONNECTION_REFUSED)
+        self.assertEqual(result["root_cause"]["command"], "device_id")
+
+        print("✅ Fail-fast tests passed")
+
+    def test_reachable_device_has_no_root_cause(self):
+        """Healthy batches report no root cause"""
+        with FakeDRSServer() as fake:
+            validator = BatchCommandsValidator(timeout_per_command=2)
+            result = validator.validate_batch_commands(
+                ip_address="127.0.0.1",
+                command_type=CommandType.MASTER,
+                mode="live",
+                selected_commands=["device_id", "temperature"],
+                port=fake.port
+            )
+
+        self.assertIsNone(result["root_cause"])
+        self.assertEqual(result["statistics"]["skipped"], 0)
+
+    def test_connect_timeouts_need_repetition(self):
+        """Refused/unreachable are final at once; connect timeouts only when repeated"""
+        self.assertEqual(classify_connection_error(ConnectionRefusedError()), CONNECTION_REFUSED)
+        self.assertEqual(classify_connection_error(OSError(errno.EHOSTUNREACH, "No route to host")), HOST_UNREACHABLE)
+        self.assertEqual(classify_connection_error(asyncio.TimeoutError()), CONNECT_TIMEOUT)
+
+        session = AsyncDeviceSession("127.0.0.1", max_connect_failures=2)
+        session.last_connect_error, session.connect_failures = CONNECT_TIMEOUT, 1
+        self.assertIsNone(session.unreachable_reason)
+        session.connect_failures = 2
+        self.assertEqual(session.unreachable_reason, CONNECT_TIMEOUT)
+
+
+class TestRetryAndCircuitBreaker(unittest.TestCase):
+    """Test suite for live-path retries and per-device circuit breakers"""
+
+    def test_retry_delay_is_jittered_and_bounded(self):
+        """Backoff grows exponentially with full jitter up to the maximum"""
+        policy = RetryPolicy(max_retries=3, base_delay_seconds=0.1, max_delay_seconds=0.3)
+        for attempt, ceiling in [(1, 0.1), (2, 0.2), (3, 0.3), (6, 0.3)]:
+            delays = [policy.delay_for(attempt) for _ in range(50)]
+            self.assertTrue(all(0 <= d <= ceiling for d in delays))
+        self.assertGreater(len({policy.delay_for(2) for _ in range(10)}), 1)
+
+    def test_crc_mismatch_is_retried(self):
+        """A corrupted reply is retried on the same session"""
+        with FakeDRSServer(corrupt_first=1) as fake:
+            validator = BatchCommandsValidator(
+                timeout_per_command=2,
+                retry_policy=RetryPolicy(max_retries=2, base_delay_seconds=0.01),
+                breakers=CircuitBreakerRegistry()
+            )
+            result = validator.validate_batch_commands(
+                ip_address="127.0.0.1",
+                command_type=CommandType.MASTER,
+                mode="live",
+                selected_commands=["temperature", "device_id"],
+                port=fake.port
+            )
+
+        self.assertEqual(result["statistics"]["passed"], 2)
+        self.assertEqual([r["attempts"] for r in result["results"]], [2, 1])
+        self.assertEqual(fake.requests, 3)
+        self.assertEqual(result["circuit_breaker"]["state"], CIRCUIT_CLOSED)
+
+        print("✅ Retry policy tests passed")
+
+    def test_breaker_half_open_probe(self):
+        """The breaker opens at the threshold and lets one probe through after the reset timeout"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=0.05)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CIRCUIT_OPEN)
+        self.assertFalse(breaker.allow_request())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CIRCUIT_CLOSED)
+
+    def test_open_breaker_skips_batch(self):
+        """Commands to a device with an open breaker are skipped without connecting"""
+        breakers = CircuitBreakerRegistry(failure_threshold=1, reset_timeout_seconds=60)
+        validator = BatchCommandsValidator(timeout_per_command=1, pacing=PacingController(), breakers=breakers)
+        port = unused_port()
+        validator.validate_batch_commands("127.0.0.1", CommandType.MASTER, "live", ["device_id"], port)
+
+        result = validator.validate_batch_commands(
+            "127.0.0.1", CommandType.MASTER, "live", ["device_id", "temperature"], port
+        )
+        self.assertEqual(result["statistics"]["skipped"], 2)
+        self.assertEqual(result["root_cause"]["reason"], "circuit_open")
+        self.assertEqual(result["circuit_breaker"]["state"], CIRCUIT_OPEN)
+        self.assertEqual(breakers.snapshot()["127.0.0.1"]["state"], CIRCUIT_OPEN)
+
+    def test_probe_released_when_served_from_cache(self):
+        """A half-open probe answered from the read cache does not block later commands"""
+        breakers = CircuitBreakerRegistry(failure_threshold=1, reset_timeout_seconds=0.05)
+        cache = DeviceReadCache(ttl_seconds={"device_id": 60})
+        with FakeDRSServer() as fake:
+            validator = BatchCommandsValidator(
+                timeout_per_command=2, pacing=PacingController(), breakers=breakers,
+                retry_policy=RetryPolicy(max_retries=0), read_cache=cache
+            )
+            validator.validate_batch_commands(
+                "127.0.0.1", CommandType.MASTER, "live", ["device_id"], fake.port, max_staleness=30
+            )
+            breakers.get("127.0.0.1").record_failure()
+            self.assertEqual(breakers.get("127.0.0.1").state, CIRCUIT_OPEN)
+            time.sleep(0.06)
+
+            result = validator.validate_batch_commands(
+                "127.0.0.1", CommandType.MASTER, "live", ["device_id", "temperature"], fake.port, max_staleness=30
+            )
+
+        self.assertIn("Cached read", result["results"][0]["details"])
+        self.assertEqual(result["statistics"]["passed"], 2)
+        self.assertEqual(result["circuit_breaker"]["state"], CIRCUIT_CLOSED)
+
+    def test_release_probe_keeps_half_open(self):
+        """Releasing a probe without a verdict lets the next command probe again"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        self.assertFalse(breaker.allow_request())
+        breaker.release_probe()
+        self.assertEqual(breaker.state, CIRCUIT_HALF_OPEN)
+        self.assertTrue(breaker.allow_request())
+
+
+class TestFleetValidation(unittest.TestCase):
+    """Test suite for multi-device fleet validation"""
+
+    def test_fleet_respects_global_and_site_limits(self):
+        """Devices run concurrently within the global and per-site caps"""
+        active = {"total": 0, "max_total": 0}
+        active_by_site = {}
+        max_by_site = {}
+
+        class CountingValidator(BatchCommandsValidator):
+            def __init__(self, device):
+                super().__init__()
+                self.site = device.site
+
+            async def validate_batch_commands_async(self, *args, **kwargs):
+                active["total"] += 1
+                active_by_site[self.site] = active_by_site.get(self.site, 0) + 1
+                active["max_total"] = max(active["max_total"], active["total"])
+                max_by_site[self.site] = max(max_by_site.get(self.site, 0), active_by_site[self.site])
+                try:
+                    await asyncio.sleep(0.02)
+                    return await super().validate_batch_commands_async(*args, **kwargs)
+                finally:
+                    active["total"] -= 1
+                    active_by_site[self.site] -= 1
+
+        devices = [
+            FleetDevice(f"10.0.{site}.{n}", command_type="remote", site=f"tunnel-{site}",
+                        selected_commands=["temperature"])
+            for site in range(3) for n in range(4)
+        ]
+        fleet = FleetValidator(max_concurrency=5, per_site_concurrency=2, validator_factory=CountingValidator)
+        result = asyncio.run(fleet.validate_fleet(devices, mode="mock"))
+
+        self.assertEqual(result["total_devices"], 12)
+        self.assertEqual(len(result["devices"]), 12)
+        self.assertLessEqual(active["max_total"], 5)
+        self.assertGreater(active["max_total"], 1)
+        self.assertTrue(all(count <= 2 for count in max_by_site.values()))
+        self.assertEqual(set(result["sites"]), {"tunnel-0", "tunnel-1", "tunnel-2"})
+        self.assertEqual(result["summary"]["commands"]["total_commands"], 12)
+
+        print("✅ Fleet concurrency tests passed")
+
+    def test_requested_concurrency_is_clamped(self):
+        """Client concurrency never exceeds the server maxima from validation_scenarios.yaml"""
+        limits = ValidationScenarios().get_fleet_settings()
+        fleet = FleetValidator.from_scenarios(max_concurrency=10000, per_site_concurrency=10000)
+        self.assertEqual(fleet.max_concurrency, limits["max_concurrency"])
+        self.assertEqual(fleet.per_site_concurrency, limits["per_site_concurrency"])
+        fleet = FleetValidator.from_scenarios(max_concurrency=2)
+        self.assertEqual(fleet.max_concurrency, 2)
+        self.assertEqual(fleet.per_site_concurrency, limits["per_site_concurrency"])
+
+    def test_live_fleet_aggregates_device_results(self):
+        """Per-device and fleet-level results include unreachable devices"""
+        with FakeDRSServer() as first, FakeDRSServer() as second:
+            devices = [
+                FleetDevice("127.0.0.1", first.port, "master", "site-a", ["device_id", "temperature"]),
+                FleetDevice("127.0.0.1", second.port, "master", "site-a", ["device_id", "temperature"]),
+                FleetDevice("127.0.0.1", unused_port(), "master", "site-b", ["device_id", "temperature"]),
+            ]
+            fleet = FleetValidator(validator_factory=lambda device: BatchCommandsValidator(
+                pacing=PacingController(), breakers=CircuitBreakerRegistry()
+            ))
+            result = asyncio.run(fleet.validate_fleet(devices, mode="live"))
+
+        self.assertEqual(result["overall_status"], "FAIL")
+        self.assertEqual(result["summary"]["devices_passed"], 2)
+        self.assertEqual(result["summary"]["commands"]["passed"], 4)
+        self.assertEqual(result["summary"]["commands"]["skipped"], 1)
+        self.assertEqual(result["sites"]["site-a"]["devices_passed"], 2)
+        self.assertEqual(result["sites"]["site-b"]["unreachable_devices"], ["127.0.0.1"])
+        self.assertEqual([d["port"] for d in result["devices"]], [d.port for d in devices])
+
+
+class TestDeviceScheduler(unittest.TestCase):
+    """Test suite for per-device exchange serialization"""
+
+    def test_one_exchange_per_device_across_event_loops(self):
+        """Exchanges to one device never overlap, even from different threads/loops"""
+        scheduler = DeviceScheduler()
+        state = {"active": 0, "max_active": 0}
+        guard = threading.Lock()
+
+        async def exchange():
+            async with scheduler.slot("10.0.0.1", 65050):
+                with guard:
+                    state["active"] += 1
+                    state["max_active"] = max(state["max_active"], state["active"])
+                await asyncio.sleep(0.02)
+                with guard:
+                    state["active"] -= 1
+
+        async def run_many(count):
+            await asyncio.gather(*[exchange() for _ in range(count)])
+
+        threads = [threading.Thread(target=asyncio.run, args=(run_many(3),)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        asyncio.run(run_many(3))
+        for thread in threads:
+            thread.join()
+
+        stats = scheduler.snapshot()["10.0.0.1:65050"]
+        self.assertEqual(state["max_active"], 1)
+        self.assertEqual(stats["exchanges"], 9)
+        self.assertGreater(stats["max_queue_depth"], 1)
+        self.assertGreater(stats["max_wait_ms"], 0)
+        self.assertFalse(stats["busy"])
+
+        print("✅ Device scheduler tests passed")
+
+    def test_different_devices_run_in_parallel(self):
+        """Only exchanges to the same IP and port are serialized"""
+        scheduler = DeviceScheduler()
+
+        async def exchange(port):
+            async with scheduler.slot("10.0.0.1", port):
+                await asyncio.sleep(0.1)
+
+        async def run_all():
+            start = time.monotonic()
+            await asyncio.gather(*[exchange(port) for port in range(5)])
+            return time.monotonic() - start
+
+        self.assertLess(asyncio.run(run_all()), 0.3)
+
+    def test_cancelled_waiter_does_not_block_device(self):
+        """A waiter cancelled while queued leaves the device usable"""
+        scheduler = DeviceScheduler()
+
+        async def scenario():
+            await scheduler.acquire("10.0.0.1", 1)
+            waiter = asyncio.ensure_future(scheduler.acquire("10.0.0.1", 1))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            scheduler.release("10.0.0.1", 1)
+            await asyncio.wait_for(scheduler.acquire("10.0.0.1", 1), timeout=1)
+            scheduler.release("10.0.0.1", 1)
+
+        asyncio.run(scenario())
+        self.assertFalse(scheduler.snapshot()["10.0.0.1:1"]["busy"])
+
+    def test_concurrent_batches_share_device_without_interleaving(self):
+        """Two validations of the same device both pass, one whole session after the other"""
+        commands = ["device_id", "temperature", "input_and_output_power"]
+
+        async def validate(port):
+            validator = BatchCommandsValidator(timeout_per_command=2)
+            return await validator.validate_batch_commands_async(
+                ip_address="127.0.0.1",
+                command_type=CommandType.MASTER,
+                mode="live",
+                selected_commands=commands,
+                port=port
+            )
+
+        with FakeDRSServer() as fake:
+            async def run_both():
+                return await asyncio.gather(validate(fake.port), validate(fake.port))
+            results = asyncio.run(run_both())
+
+        self.assertTrue(all(r["statistics"]["passed"] == len(commands) for r in results))
+        # Cada batch completa su sesión antes de que empiece la siguiente
+        self.assertEqual(fake.request_connections, [1] * len(commands) + [2] * len(commands))
+        self.assertFalse(get_device_scheduler().snapshot()[f"127.0.0.1:{fake.port}"]["busy"])
+
+
+class TestReadCoalescing(unittest.TestCase):
+    """Test suite for single-flight GET coalescing"""
+
+    def test_identical_reads_share_one_exchange(self):
+        """Concurrent identical GETs on one device cost a single wire exchange"""
+        async def read_many(port, count):
+            validator = BatchCommandsValidator(timeout_per_command=2, breakers=CircuitBreakerRegistry())
+            return await asyncio.gather(*[
+                validator._execute_single_live_command("127.0.0.1", "temperature", CommandType.MASTER, port)
+                for _ in range(count)
+            ])
+
+        with FakeDRSServer(response_delay=0.1) as fake:
+            results = asyncio.run(read_many(fake.port, 5))
+
+        self.assertEqual(fake.requests, 1)
+        self.assertTrue(all(r.status == ValidationResult.PASS for r in results))
+        self.assertEqual({r.response_data for r in results}, {bytes.fromhex(REAL_DRS_RESPONSES["temperature"]).hex()})
+        self.assertEqual(sum("coalesced" in r.details for r in results), 4)
+        # Los resultados compartidos no comparten el dict decodificado
+        self.assertIsNot(results[0].decoded_values, results[1].decoded_values)
+
+        print("✅ Read coalescing tests passed")
+
+    def test_set_commands_are_never_coalesced(self):
+        """Every SET request reaches the device"""
+        async def set_many(port, count):
+            validator = BatchCommandsValidator(
+                rto=RTOEstimator(initial_seconds=0.2, min_seconds=0.2, max_seconds=1),
+                retry_policy=RetryPolicy(max_retries=0),
+                breakers=CircuitBreakerRegistry()
+            )
+            return await asyncio.gather(*[
+                validator._execute_single_live_command("127.0.0.1", "set_working_mode_wideband", CommandType.MASTER, port)
+                for _ in range(count)
+            ])
+
+        with FakeDRSServer() as fake:
+            asyncio.run(set_many(fake.port, 3))
+
+        self.assertEqual(fake.requests, 3)
+
+    def test_later_reads_are_not_served_stale(self):
+        """Once an exchange finishes, the next identical read goes to the wire"""
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        async def scenario():
+            flight = SingleFlight()
+            first = await asyncio.gather(*[flight.run("k", fetch) for _ in range(3)])
+            second = await flight.run("k", fetch)
+            return flight, first, second
+
+        flight, first, second = asyncio.run(scenario())
+        self.assertEqual([r for r, _ in first], [1, 1, 1])
+        self.assertEqual([shared for _, shared in first], [False, True, True])
+        self.assertEqual(second, (2, False))
+        self.assertEqual(flight.coalesced, 2)
+        self.assertEqual(flight.in_flight(), 0)
+
+
+class TestReadCache(unittest.TestCase):
+    """Test suite for the short-TTL device read cache"""
+
+    def _validator(self, cache):
+        return BatchCommandsValidator(
+            timeout_per_command=2,
+            pacing=PacingController(),
+            breakers=CircuitBreakerRegistry(),
+            retry_policy=RetryPolicy(max_retries=0),
+            read_cache=cache
+        )
+
+    def _run(self, validator, port, commands, max_staleness):
+        return validator.validate_batch_commands(
+            "127.0.0.1", CommandType.MASTER, "live", commands, port, max_staleness=max_staleness
+        )
+
+    def test_cached_reads_skip_the_wire(self):
+        """Stable GETs within max_staleness are served without an exchange"""
+        cache = DeviceReadCache(ttl_seconds={"device_id": 60})
+        commands = ["device_id", "temperature"]
+        with FakeDRSServer() as fake:
+            validator = self._validator(cache)
+            self._run(validator, fake.port, commands, max_staleness=30)
+            self.assertEqual(fake.requests, 2)
+            result = self._run(validator, fake.port, commands, max_staleness=30)
+            # temperature tiene TTL 0: siempre va al cable
+            self.assertEqual(fake.requests, 3)
+
+        self.assertEqual(result["overall_status"], "PASS")
+        cached = result["results"][0]
+        self.assertIn("Cached read", cached["details"])
+        self.assertEqual(cached["attempts"], 0)
+        self.assertEqual(cached["response_data"], bytes.fromhex(REAL_DRS_RESPONSES["device_id"]).hex())
+        self.assertEqual(cache.stats()["hits"], 1)
+
+        print("✅ Read cache tests passed")
+
+    def test_cache_is_opt_in(self):
+        """Without max_staleness every command reaches the device"""
+        cache = DeviceReadCache(ttl_seconds={"device_id": 60})
+        with FakeDRSServer() as fake:
+            validator = self._validator(cache)
+            self._run(validator, fake.port, ["device_id"], max_staleness=None)
+            self._run(validator, fake.port, ["device_id"], max_staleness=None)
+            self.assertEqual(fake.requests, 2)
+            # La lectura ya quedó cacheada para quien sí acepte antigüedad
+            self._run(validator, fake.port, ["device_id"], max_staleness=30)
+            self.assertEqual(fake.requests, 2)
+
+    def test_set_commands_invalidate_readback(self):
+        """A SET drops the cached GETs it can change and nothing else"""
+        cache = DeviceReadCache(ttl_seconds={"device_id": 60, "broadband_switching": 60})
+        cache.put("127.0.0.1", 65050, "master", "device_id", "id")
+        cache.put("127.0.0.1", 65050, "master", "broadband_switching", "mode")
+        cache.put("127.0.0.1", 65050, "remote", "broadband_switching", "mode")
+        validator = self._validator(cache)
+
+        set_result = validator._build_live_result("set_working_mode_wideband", CommandType.MASTER, None, 0)
+        validator._update_read_cache("127.0.0.1", 65050, set_result)
+
+        self.assertIsNone(cache.get("127.0.0.1", 65050, "master", "broadband_switching", 60))
+        self.assertIsNone(cache.get("127.0.0.1", 65050, "remote", "broadband_switching", 60))
+        self.assertIsNotNone(cache.get("127.0.0.1", 65050, "master", "device_id", 60))
+        # max_staleness más estricto que la antigüedad de la entrada
+        self.assertIsNone(cache.get("127.0.0.1", 65050, "master", "device_id", -1))
+
+    def test_reads_are_keyed_by_command_type(self):
+        """A master read is never served to a remote batch of the same command"""
+        cache = DeviceReadCache(ttl_seconds={"device_id": 60})
+        with FakeDRSServer() as fake:
+            validator = self._validator(cache)
+            self._run(validator, fake.port, ["device_id"], max_staleness=30)
+            result = validator.validate_batch_commands(
+                "127.0.0.1", CommandType.REMOTE, "live", ["device_id"], fake.port, max_staleness=30
+            )
+            self.assertEqual(fake.requests, 2)
+
+        self.assertNotIn("Cached read", result["results"][0]["details"])
+        self.assertIsNotNone(cache.get("127.0.0.1", fake.port, "master", "device_id", 30))
+        self.assertIsNotNone(cache.get("127.0.0.1", fake.port, "remote", "device_id", 30))
+
+
+class ConfigurableDevice:
+    """Respondedor que guarda lo escrito por los SET y lo devuelve en sus GET de lectura"""
+
+    # Número de comando SET -> número del GET que lee el mismo parámetro
+    READBACK_NUMBERS = {0x80: 0x81, 0xE7: 0x09, 0x41: 0x42, 0x35: 0x36}
+
+    def __init__(self, apply_sets: bool = True):
+        self.apply_sets = apply_sets
+        self.settings = {}
+
+    def __call__(self, request: bytes) -> bytes:
+        command = request[4]
+        if command in self.READBACK_NUMBERS:
+            if self.apply_sets:
+                self.settings[self.READBACK_NUMBERS[command]] = request[7:7 + request[6]]
+            return build_santone_frame(command, "")
+        if command in self.settings:
+            return build_santone_frame(command, self.settings[command].hex())
+        return RESPONSES_BY_COMMAND_NUMBER.get(command, b"")
+
+
+class TestSetReadback(unittest.TestCase):
+    """Test suite for SET commands verified by reading back the written value"""
+
+    def _validator(self, verify_readback=True):
+        return BatchCommandsValidator(
+            timeout_per_command=1,
+            pacing=PacingController(),
+            breakers=CircuitBreakerRegistry(),
+            retry_policy=RetryPolicy(max_retries=0),
+            read_cache=DeviceReadCache(),
+            verify_readback=verify_readback
+        )
+
+    def test_readback_confirms_applied_settings(self):
+        """Each SET is followed by its GET over the same connection and the values match"""
+        commands = ["set_attenuation_10_15", "set_channels_first_8_on"]
+        with FakeDRSServer(responder=ConfigurableDevice()) as fake:
+            result = self._validator().validate_batch_commands(
+                "127.0.0.1", CommandType.MASTER, "live", commands, fake.port
+            )
+            self.assertEqual(fake.requests, 4)
+            self.assertEqual(fake.connections, 1)
+
+        self.assertEqual(result["overall_status"], "PASS")
+        attenuation = result["results"][0]["decoded_values"]["readback"]
+        self.assertEqual(attenuation["command"], "datt")
+        self.assertTrue(attenuation["match"])
+        self.assertEqual(attenuation["actual"], {"downlink_db": 15.0, "uplink_db": 10.0})
+        channels = result["results"][1]["decoded_values"]["readback"]
+        self.assertEqual(channels["actual"]["channels_on"], [1, 2, 3, 4, 5, 6, 7, 8])
+        self.assertEqual(len(result["results"]), 2)
+
+        print("✅ SET read-back tests passed")
+
+    def test_readback_mismatch_fails_set(self):
+        """A SET acknowledged but not applied fails with the differing values"""
+        device = ConfigurableDevice(apply_sets=False)
+        device.settings[0x09] = bytes([20 * 4, 10 * 4])
+        with FakeDRSServer(responder=device) as fake:
+            result = self._validator().validate_batch_commands(
+                "127.0.0.1", CommandType.MASTER, "live", ["set_attenuation_10_15"], fake.port
+            )
+
+        set_result = result["results"][0]
+        self.assertEqual(set_result["status"], "FAIL")
+        self.assertIn("Read-back mismatch", set_result["error"])
+        self.assertIn("downlink_db: wrote 15.0, read 20.0", set_result["error"])
+        self.assertFalse(set_result["decoded_values"]["readback"]["match"])
+
+    def test_readback_is_opt_in(self):
+        """Without verify_readback only the SET itself is sent"""
+        with FakeDRSServer(responder=ConfigurableDevice()) as fake:
+            result = self._validator(verify_readback=False).validate_batch_commands(
+                "127.0.0.1", CommandType.MASTER, "live", ["set_working_mode_channel"], fake.port
+            )
+            self.assertEqual(fake.requests, 1)
+        self.assertEqual(result["results"][0]["status"], "PASS")
+        self.assertNotIn("readback", result["results"][0]["decoded_values"])
+
+    def test_readback_unescapes_response_payload(self):
+        """Payload bytes 0x7E/0x5E arrive escaped and are decoded after unescaping"""
+        check = ReadbackCheck("set_attenuation", "datt", {"downlink_db": 31.5, "uplink_db": 23.5})
+        # datt con 31.5 dB (0x7E) y 23.5 dB (0x5E): los datos viajan como 5E 7D 5E 5D
+        response = bytes.fromhex("7E" "070000090002" "5E7D5E5D" "0000" "7E")
+        self.assertEqual(frame_payload(response), bytes([0x7E, 0x5E]))
+        result = check.verify(response)
+        self.assertTrue(result["match"], result["mismatches"])
+
+    def test_mock_readback_and_remote_layout(self):
+        """Mock mode simulates an applying device; DRU attenuations decode uplink first"""
+        result = self._validator().validate_batch_commands(
+            "127.0.0.1", CommandType.REMOTE, "mock", ["remote_set_attenuation_12_18", "temperature"]
+        )
+        readback = result["results"][0]["decoded_values"]["readback"]
+        self.assertTrue(readback["match"])
+        self.assertEqual(readback["expected"], {"uplink_db": 12.0, "downlink_db": 18.0})
+        self.assertNotIn("readback", result["results"][1]["decoded_values"])
+        # Comandos sin parámetro legible no tienen lectura de confirmación
+        self.assertIsNone(plan_readback("temperature", get_master_frame("temperature")))
+
+
+class TestEarlyStop(unittest.TestCase):
+    """Test suite for early termination of decided batches"""
+
+    COMMANDS = ["device_id", "temperature", "datt", "input_and_output_power", "channel_switch"]
+
+    def _validator(self, policy):
+        return BatchCommandsValidator(
+            timeout_per_command=0.2,
+            pacing=PacingController(),
+            breakers=CircuitBreakerRegistry(),
+            retry_policy=RetryPolicy(max_retries=0),
+            adaptive_timeouts=False,
+            mock_latency=MockLatencyModel(),
+            early_stop=policy
+        )
+
+    def test_stops_once_fail_is_decided(self):
+        """A silent device stops being queried once PASS is out of reach"""
+        with FakeDRSServer(response_delay=None) as fake:
+            result = self._validator(EarlyStopPolicy()).validate_batch_commands(
+                "127.0.0.1", CommandType.MASTER, "live", self.COMMANDS, fake.port
+            )
+            # 4 de 5 deben pasar: tras 2 timeouts el FAIL está decidido
+            self.assertEqual(fake.requests, 2)
+
+        self.assertEqual(result["overall_status"], "FAIL")
+        self.assertEqual(result["statistics"]["timeouts"], 2)
+        self.assertEqual(result["statistics"]["skipped"], 3)
+        self.assertEqual(result["early_stop"]["not_executed"], self.COMMANDS[2:])
+        self.assertEqual(result["early_stop"]["after_command"], "temperature")
+        self.assertIn("FAIL decided", result["early_stop"]["reason"])
+        self.assertIsNone(result["root_cause"])
+
+        print("✅ Early stop tests passed")
+
+    def test_stops_once_pass_is_decided(self):
+        """Commands after the PASS threshold is reached are not executed"""
+        result = self._validator(EarlyStopPolicy()).validate_batch_commands(
+            "127.0.0.1", CommandType.MASTER, "mock", self.COMMANDS
+        )
+        self.assertEqual(result["overall_status"], "PASS")
+        self.assertEqual(result["statistics"]["passed"], 4)
+        self.assertEqual(result["early_stop"]["not_executed"], ["channel_switch"])
+
+        # Sin política se ejecuta todo
+        result = self._validator(None).validate_batch_commands(
+            "127.0.0.1", CommandType.MASTER, "mock", self.COMMANDS
+        )
+        self.assertEqual(result["statistics"]["passed"], 5)
+        self.assertIsNone(result["early_stop"])
+
+    def test_critical_failures(self):
+        """Only failures of critical commands count towards max_critical_failures"""
+        policy = EarlyStopPolicy(stop_when_decided=False, max_critical_failures=1, critical_commands=["device_id"])
+        self.assertIsNone(policy.check([("temperature", False), ("datt", False)], 10))
+        self.assertIn("device_id", policy.check([("temperature", False), ("device_id", False)], 10))
+        # Con el batch completo no hay nada que cortar
+        self.assertIsNone(policy.check([("device_id", False)], 1))
+
+
+class TestTieredValidation(unittest.TestCase):
+    """Test suite for the tiered health probe and its escalation"""
+
+    def setUp(self):
+        self.validator = BatchCommandsValidator(mock_latency=MockLatencyModel(), adaptive_timeouts=False)
+
+    def test_healthy_probe_does_not_escalate(self):
+        """A sane device is checked with the probe commands only"""
+        result = self.validator.validate_tiered("127.0.0.1", CommandType.MASTER, "mock")
+        self.assertEqual(result["overall_status"], "PASS")
+        self.assertEqual(result["tiers"]["executed"], [TIER_PROBE])
+        self.assertFalse(result["tiers"]["escalated"])
+        self.assertEqual(
+            sorted(result["commands_tested"]),
+            ["device_id", "input_and_output_power", "temperature"]
+        )
+
+    def test_out_of_range_probe_escalates_to_get_tier(self):
+        """An out-of-range probe value runs the remaining GET commands"""
+        plan = TieredPlan({"device_id": {}, "temperature": {"max": 0}})
+        result = self.validator.validate_tiered("127.0.0.1", CommandType.MASTER, "mock", plan=plan)
+        self.assertEqual(result["tiers"]["executed"], [TIER_PROBE, TIER_GET])
+        self.assertEqual(result["tiers"]["anomalies"][0]["command"], "temperature")
+        self.assertEqual(result["tiers"]["anomalies"][0]["anomaly"], ANOMALY_OUT_OF_RANGE)
+
+        all_gets = [
+            cmd for cmd in self.validator._get_commands_for_type(CommandType.MASTER)
+            if not self.validator._is_set_command(cmd)
+        ]
+        self.assertEqual(sorted(result["commands_tested"]), sorted(all_gets))
+
+    def test_missing_value_is_an_anomaly(self):
+        """Probe commands that fail or are not executed count as missing"""
+        plan = TieredPlan({"temperature": {}, "device_id": {}})
+        anomalies = plan.anomalies([
+            {"command": "temperature", "status": "TIMEOUT", "decoded_values": None}
+        ])
+        self.assertEqual([a["command"] for a in anomalies], ["temperature", "device_id"])
+        self.assertTrue(all(a["anomaly"] == ANOMALY_MISSING for a in anomalies))
+        self.assertEqual(plan.anomalies([
+            {"command": "temperature", "status": "PASS", "decoded_values": {"temperature": "41.5"}},
+            {"command": "device_id", "status": "PASS", "decoded_values": {"device_id": 12}}
+        ]), [])
+
+        print("✅ Tiered validation tests passed")
+
+    def test_live_probe_with_real_frames(self):
+        """Against real DRS frames the default probe stays healthy; a failing range escalates"""
+        with FakeDRSServer() as fake:
+            validator = BatchCommandsValidator(
+                timeout_per_command=2, pacing=PacingController(), breakers=CircuitBreakerRegistry()
+            )
+            result = validator.validate_tiered("127.0.0.1", CommandType.MASTER, "live", port=fake.port)
+            self.assertEqual(result["tiers"]["anomalies"], [])
+            self.assertEqual(result["tiers"]["executed"], [TIER_PROBE])
+            self.assertEqual(fake.requests, 3)
+
+            plan = TieredPlan({"device_id": {}, "input_and_output_power": {"min": -20}})
+            result = validator.validate_tiered("127.0.0.1", CommandType.MASTER, "live", port=fake.port, plan=plan)
+
+        self.assertEqual(result["tiers"]["executed"], [TIER_PROBE, TIER_GET])
+        self.assertEqual(result["tiers"]["anomalies"][0]["anomaly"], ANOMALY_OUT_OF_RANGE)
+        self.assertEqual(result["tiers"]["anomalies"][0]["value"], -81.01)
+
+
+class TestCommandHistory(unittest.TestCase):
+    """Test suite for history-informed ordering and duration prediction"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.results_dir = Path(self.tmp.name)
+        self.history = CommandHistory(self.results_dir)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _save(self, name, results, ip_address="10.0.0.1", mode="live"):
+        batch = {"ip_address": ip_address, "mode": mode, "results": [
+            {"command": command, "status": status, "duration_ms": duration_ms}
+            for command, status, duration_ms in results
+        ]}
+        (self.results_dir / name).write_text(json.dumps({"request": {}, "result": batch}))
+
+    def test_orders_likely_failures_first(self):
+        """Commands that usually fail quickly run before slow healthy ones"""
+        self._save("a.json", [("device_id", "PASS", 400), ("temperature", "TIMEOUT", 100), ("datt", "PASS", 50)])
+        self._save("b.json", [("device_id", "PASS", 400), ("temperature", "TIMEOUT", 100), ("datt", "PASS", 50)])
+        self.history.refresh()
+
+        order = self.history.order(
+            "10.0.0.1", "live", ["set_datt", "device_id", "temperature", "datt"],
+            is_set=BatchCommandsValidator._is_set_command
+        )
+        self.assertEqual(order, ["set_datt", "temperature", "datt", "device_id"])
+
+        # Sin historial el orden no cambia
+        self.assertEqual(
+            CommandHistory().order("10.0.0.1", "live", ["device_id", "temperature", "datt"]),
+            ["device_id", "temperature", "datt"]
+        )
+
+    def test_predicts_duration_from_history(self):
+        """ETA uses the device history, then other devices, then the default"""
+        self._save("a.json", [("device_id", "PASS", 400), ("temperature", "PASS", 200)])
+        self._save("b.json", [("temperature", "PASS", 100)], ip_address="10.0.0.2")
+        self._save("c.json", [("datt", "PASS", 900)], mode="mock")
+        self.history.refresh()
+
+        plan = self.history.predict("10.0.0.2", "live", ["temperature", "device_id", "datt"])
+        self.assertEqual(plan["expected_ms"], {"temperature": 100, "device_id": 400, "datt": DEFAULT_COMMAND_MS})
+        self.assertEqual(plan["eta_seconds"], round((500 + DEFAULT_COMMAND_MS) / 1000, 1))
+        self.assertEqual(plan["commands_with_history"], 2)
+        self.assertEqual(self.history.remaining_seconds(plan, ["device_id"]), round((100 + DEFAULT_COMMAND_MS) / 1000, 1))
+
+    def test_batch_result_carries_plan(self):
+        """The validator runs commands in planned order and reports the plan"""
+        self._save("a.json", [("datt", "TIMEOUT", 100)], ip_address="127.0.0.1", mode="mock")
+        validator = BatchCommandsValidator(
+            mock_latency=MockLatencyModel(), history=CommandHistory(self.results_dir), order_by_history=True
+        )
+        result = validator.validate_batch_commands(
+            "127.0.0.1", CommandType.MASTER, "mock", ["device_id", "temperature", "datt"]
+        )
+        self.assertEqual(result["commands_tested"], ["datt", "device_id", "temperature"])
+        self.assertEqual(result["plan"]["order"], result["commands_tested"])
+        self.assertEqual(result["plan"]["commands_with_history"], 1)
+
+        # Sin order_by_history se conserva el orden pedido; la ETA se informa igual
+        validator = BatchCommandsValidator(mock_latency=MockLatencyModel(), history=CommandHistory(self.results_dir))
+        result = validator.validate_batch_commands(
+            "127.0.0.1", CommandType.MASTER, "mock", ["device_id", "temperature", "datt"]
+        )
+        self.assertEqual(result["commands_tested"], ["device_id", "temperature", "datt"])
+        self.assertEqual(result["plan"]["commands_with_history"], 1)
+
+        print("✅ Command history tests passed")
+
+
+class TestResultStreaming(unittest.TestCase):
+    """Test suite for streaming batch results"""
+
+    def test_results_stream_before_batch_completes(self):
+        """The first result arrives after one command, not after the whole batch"""
+        commands = ["device_id", "temperature", "datt", "input_and_output_power"]
+
+        async def consume(port):
+            validator = BatchCommandsValidator(
+                timeout_per_command=2,
+                pacing=PacingController(),
+                breakers=CircuitBreakerRegistry()
+            )
+            start = time.monotonic()
+            arrivals = []
+            async for record in validator.stream_batch_commands(
+                "127.0.0.1", CommandType.MASTER, "live", commands, port
+            ):
+                arrivals.append((time.monotonic() - start, record))
+            return arrivals
+
+        with FakeDRSServer(response_delay=0.1) as fake:
+            arrivals = asyncio.run(consume(fake.port))
+
+        records = [record for _, record in arrivals]
+        self.assertEqual([r["type"] for r in records], ["result"] * 4 + ["summary"])
+        self.assertEqual([r["command"] for r in records[:4]], commands)
+        self.assertEqual(records[-1]["overall_status"], "PASS")
+        self.assertLess(arrivals[0][0], arrivals[-1][0] / 2)
+
+        print("✅ Result streaming tests passed")
+
+    def test_closing_stream_cancels_validation(self):
+        """A consumer that stops early cancels the remaining commands"""
+        async def first_only(port):
+            validator = BatchCommandsValidator(
+                timeout_per_command=2,
+                pacing=PacingController(),
+                breakers=CircuitBreakerRegistry()
+            )
+            stream = validator.stream_batch_commands(
+                "127.0.0.1", CommandType.MASTER, "live", ["device_id", "temperature", "datt"], port
+            )
+            record = await stream.__anext__()
+            await stream.aclose()
+            await asyncio.sleep(0.3)
+            return record
+
+        with FakeDRSServer(response_delay=0.1) as fake:
+            record = asyncio.run(first_only(fake.port))
+            self.assertEqual(record["command"], "device_id")
+            self.assertLess(fake.requests, 3)
+
+
+class TestCancellation(unittest.TestCase):
+    """Test suite for cancelling in-flight live batches"""
+
+    def test_cancel_aborts_pending_read(self):
+        """Cancelling a batch stuck on a silent device returns in milliseconds"""
+        silent = socket.socket()
+        silent.bind(("127.0.0.1", 0))
+        silent.listen(8)  # Acepta conexiones (backlog) pero nunca responde
+        port = silent.getsockname()[1]
+        commands = ["device_id", "temperature", "datt"]
+
+        async def scenario():
+            validator = BatchCommandsValidator(
+                rto=RTOEstimator(initial_seconds=10, min_seconds=10, max_seconds=10),
+                pacing=PacingController(),
+                breakers=CircuitBreakerRegistry()
+            )
+            completed = []
+
+            async def collect(result):
+                completed.append(result)
+
+            task = asyncio.create_task(validator.validate_batch_commands_async(
+                "127.0.0.1", CommandType.MASTER, "live", commands, port, on_result=collect
+            ))
+            await asyncio.sleep(0.2)
+            start = time.monotonic()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            elapsed = time.monotonic() - start
+            return validator.cancelled_batch_result(
+                "127.0.0.1", CommandType.MASTER, "live", commands, completed, time.time()
+            ), elapsed
+
+        try:
+            result, elapsed = asyncio.run(scenario())
+        finally:
+            silent.close()
+
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(result["overall_status"], "CANCELLED")
+        self.assertEqual(result["statistics"]["cancelled"], 3)
+        self.assertEqual([r["status"] for r in result["results"]], ["CANCELLED"] * 3)
+        # El dispositivo quedó libre para el siguiente intercambio
+        self.assertFalse(get_device_scheduler().snapshot().get(f"127.0.0.1:{port}", {}).get("busy"))
+
+        print("✅ Cancellation tests passed")
+
+    def test_cancelled_result_keeps_completed_commands(self):
+        """Commands finished before the cancel keep their real result"""
+        validator = BatchCommandsValidator()
+        done = validator._build_live_result("device_id", CommandType.MASTER, None, 5)
+        result = validator.cancelled_batch_result(
+            "127.0.0.1", CommandType.MASTER, "live", ["device_id", "temperature"], [done], time.time()
+        )
+        self.assertEqual([r["status"] for r in result["results"]], ["TIMEOUT", "CANCELLED"])
+        self.assertEqual(result["commands_tested"], ["device_id", "temperature"])
+
+
+class TestPipelinedCommands(unittest.TestCase):
+    """Test suite for pipelined GET windows"""
+
+    COMMANDS = ["device_id", "temperature", "input_and_output_power", "datt", "channel_frequency_configuration"]
+
+    def run_batch(self, fake, pipeline_window, commands=None):
+        validator = BatchCommandsValidator(timeout_per_command=2, pipeline_window=pipeline_window)
+        return validator.validate_batch_commands(
+            ip_address="127.0.0.1",
+            command_type=CommandType.MASTER,
+            mode="live",
+            selected_commands=commands or self.COMMANDS,
+            port=fake.port
+        )
+
+    def test_pipelined_window_matches_responses(self):
+        """Out-of-order responses are matched to requests by command number"""
+        with FakeDRSServer(reverse_order=True) as fake:
+            result = self.run_batch(fake, pipeline_window=3)
+
+        self.assertEqual(result["statistics"]["passed"], len(self.COMMANDS))
+        self.assertEqual([r["command"] for r in result["results"]], self.COMMANDS)
+        for cmd_result in result["results"]:
+            self.assertEqual(
+                bytes.fromhex(cmd_result["response_data"]),
+                bytes.fromhex(REAL_DRS_RESPONSES[cmd_result["command"]])
+            )
+        self.assertEqual(fake.connections, 1)
+
+        print("✅ Pipelined window tests passed")
+
+    def test_pipelined_window_missing_response_times_out(self):
+        """Requests without a response in the window are reported as TIMEOUT"""
+        unknown = bytes.fromhex(get_master_frame("temperature"))
+        unknown = unknown[:4] + b"\xEE" + unknown[5:]
+
+        async def exchange(port):
+            async with AsyncDeviceSession("127.0.0.1", port, timeout=0.5) as session:
+                return await session.exchange_pipelined([
+                    bytes.fromhex(get_master_frame("device_id")), unknown
+                ])
+
+        with FakeDRSServer() as fake:
+            results = asyncio.run(exchange(fake.port))
+
+        self.assertEqual(results[0][0], bytes.fromhex(REAL_DRS_RESPONSES["device_id"]))
+        self.assertIsNone(results[1][0])
+        # La petición sin respuesta reporta el tiempo que se esperó la ventana
+        self.assertGreaterEqual(results[1][1], 0.5)
+
+    def test_pipelined_window_keeps_replies_after_reset(self):
+        """A connection dropped mid-window keeps the replies already received"""
+        frames = [bytes.fromhex(get_master_frame(name)) for name in ["device_id", "temperature", "datt"]]
+
+        async def exchange(port):
+            async with AsyncDeviceSession("127.0.0.1", port, timeout=2) as session:
+                return await session.exchange_pipelined(frames)
+
+        with FakeDRSServer(drop_after=1) as fake:
+            results = asyncio.run(exchange(fake.port))
+
+        self.assertEqual(results[0][0], bytes.fromhex(REAL_DRS_RESPONSES["device_id"]))
+        self.assertEqual([response for response, _ in results[1:]], [None, None])
+
+        # En el validador sólo se reintentan los comandos sin respuesta
+        with FakeDRSServer(drop_after=1) as fake:
+            result = self.run_batch(fake, pipeline_window=3, commands=["device_id", "temperature", "datt"])
+            self.assertEqual(fake.request_connections, [1, 2, 3])
+
+        self.assertEqual(result["statistics"]["passed"], 3)
+        self.assertEqual([r["attempts"] for r in result["results"]], [1, 2, 2])
+
+    def test_pipeline_plan_keeps_set_commands_sequential(self):
+        """SET commands are never pipelined"""
+        validator = BatchCommandsValidator(pipeline_window=4)
+        steps = validator._plan_live_steps(dict.fromkeys(
+            ["device_id", "temperature", "set_working_mode_wideband", "datt", "optical_port_devices_connected_1"]
+        ))
+        self.assertEqual(steps, [
+            ["device_id", "temperature"],
+            ["set_working_mode_wideband"],
+            ["datt", "optical_port_devices_connected_1"]
+        ])
+        self.assertEqual(BatchCommandsValidator()._plan_live_steps(dict.fromkeys(["device_id", "datt"])),
+                         [["device_id"], ["datt"]])
+
+
+class TestPacingController(unittest.TestCase):
+    """Test suite for adaptive inter-command pacing"""
+
+    def test_backoff_and_recovery(self):
+        """Failures back off the gap and success streaks shrink it again"""
+        pacing = PacingController()
+        key = pacing.profile_key("master", "v1")
+        self.assertEqual(pacing.gap_seconds(key), 0)
+
+        pacing.record_failure(key, "timeout")
+        pacing.record_failure(key, "reset")
+        self.assertEqual(pacing.gap_seconds(key), 2 * BACKOFF_FLOOR_MS / 1000)
+
+        for _ in range(DECREASE_AFTER_SUCCESSES):
+            pacing.record_success(key)
+        self.assertLess(pacing.gap_seconds(key), 2 * BACKOFF_FLOOR_MS / 1000)
+        self.assertEqual(pacing.snapshot()[key]["last_failure"], "reset")
+
+        print("✅ Pacing backoff tests passed")
+
+    def test_profiles_persist_between_runs(self):
+        """Learned gaps are reloaded from the pacing file"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "pacing.json"
+            pacing = PacingController(path)
+            key = pacing.profile_key("remote", "2.1")
+            pacing.record_failure(key, "malformed")
+            pacing.save()
+
+            reloaded = PacingController(path)
+            self.assertEqual(reloaded.gap_seconds(key), pacing.gap_seconds(key))
+            self.assertEqual(reloaded.gap_seconds(pacing.profile_key("remote", "2.2")), 0)
+
+    def test_known_good_device_runs_without_gaps(self):
+        """A healthy device is validated without the fixed 100 ms sleep"""
+        commands = ["device_id", "temperature", "input_and_output_power", "datt"]
+        pacing = PacingController()
+        with FakeDRSServer() as fake:
+            validator = BatchCommandsValidator(timeout_per_command=2, pacing=pacing)
+            result = validator.validate_batch_commands(
+                ip_address="127.0.0.1",
+                command_type=CommandType.MASTER,
+                mode="live",
+                selected_commands=commands,
+                port=fake.port
+            )
+
+        self.assertEqual(result["statistics"]["passed"], len(commands))
+        self.assertLess(result["duration_ms"], 100 * (len(commands) - 1))
+        self.assertEqual(pacing.snapshot()["master/unknown"]["streak"], len(commands))
+
+
+class TestAdaptiveTimeouts(unittest.TestCase):
+    """Test suite for RTO-style adaptive response timeouts"""
+
+    def test_rto_from_measured_rtt(self):
+        """The timeout follows SRTT + 4*RTTVAR within the configured bounds"""
+        rto = RTOEstimator(initial_seconds=3, min_seconds=0.2, max_seconds=15)
+        self.assertEqual(rto.timeout_for("10.0.0.1", "temperature"), 3)
+
+        for _ in range(20):
+            rto.record_sample("10.0.0.1", "temperature", 0.02)
+        self.assertEqual(rto.timeout_for("10.0.0.1", "temperature"), 0.2)
+        # Comandos sin mediciones usan la estadística del dispositivo
+        self.assertEqual(rto.timeout_for("10.0.0.1", "datt"), 0.2)
+
+        for _ in range(20):
+            rto.record_sample("10.0.0.2", "temperature", 4.0)
+        self.assertGreater(rto.timeout_for("10.0.0.2", "temperature"), 4.0)
+        self.assertLessEqual(rto.timeout_for("10.0.0.2", "temperature"), 15)
+
+        before = rto.timeout_for("10.0.0.2", "temperature")
+        rto.record_timeout("10.0.0.2", "temperature")
+        self.assertAlmostEqual(rto.timeout_for("10.0.0.2", "temperature"), 2 * before)
+        rto.record_timeout("10.0.0.2", "temperature")
+        self.assertEqual(rto.timeout_for("10.0.0.2", "temperature"), 15)
+
+        print("✅ RTO estimator tests passed")
+
+    def test_bounds_seeded_from_scenarios(self):
+        """Initial and bounding timeouts come from validation_scenarios.yaml"""
+        timeouts = ValidationScenarios().get_response_timeouts()
+        rto = RTOEstimator(**timeouts)
+        self.assertEqual(rto.initial_seconds, timeouts["initial_seconds"])
+        self.assertGreaterEqual(rto.max_seconds, 15)
+
+    def test_network_timeout_caps_response_timeouts(self):
+        """Without response_timeouts.max_seconds the live network_timeout is the ceiling"""
+        scenarios = ValidationScenarios()
+        scenarios.scenarios = {"validation_modes": {"live": {
+            "network_timeout": 12, "response_timeouts": {"initial_seconds": 2}
+        }}}
+        self.assertEqual(scenarios.get_response_timeouts()["max_seconds"], 12)
+        scenarios.scenarios["validation_modes"]["live"]["response_timeouts"]["max_seconds"] = 8
+        self.assertEqual(scenarios.get_response_timeouts()["max_seconds"], 8)
+
+    def test_pipelined_replies_feed_rto(self):
+        """Replies matched in a pipelined window are recorded as RTT samples"""
+        commands = ["device_id", "temperature", "datt"]
+        rto = RTOEstimator(initial_seconds=3, min_seconds=0.2, max_seconds=15)
+        with FakeDRSServer() as fake:
+            validator = BatchCommandsValidator(rto=rto, pacing=PacingController(), pipeline_window=3,
+                                               breakers=CircuitBreakerRegistry())
+            result = validator.validate_batch_commands(
+                ip_address="127.0.0.1",
+                command_type=CommandType.MASTER,
+                mode="live",
+                selected_commands=commands,
+                port=fake.port
+            )
+
+        self.assertEqual(result["statistics"]["passed"], len(commands))
+        for command in commands:
+            self.assertLess(rto.timeout_for("127.0.0.1", command), 1)
+
+    def test_dead_device_fails_fast(self):
+        """A known device that stops answering times out in hundreds of milliseconds"""
+        commands = ["device_id", "temperature", "datt"]
+        rto = RTOEstimator(initial_seconds=3, min_seconds=0.2, max_seconds=15)
+        for command in commands:
+            rto.record_sample("127.0.0.1", command, 0.005)
+
+        with FakeDRSServer(response_delay=None) as fake:
+            validator = BatchCommandsValidator(rto=rto, pacing=PacingController(),
+                                               retry_policy=RetryPolicy(max_retries=0),
+                                               breakers=CircuitBreakerRegistry())
+            result = validator.validate_batch_commands(
+                ip_address="127.0.0.1",
+                command_type=CommandType.MASTER,
+                mode="live",
+                selected_commands=commands,
+                port=fake.port
+            )
+
+        self.assertEqual(result["statistics"]["timeouts"], len(commands))
+        for cmd_result in result["results"]:
+            self.assertLess(cmd_result["duration_ms"], 1000)
+
+    def test_slow_device_does_not_time_out(self):
+        """Measured slow replies raise the timeout above the static value"""
+        rto = RTOEstimator(initial_seconds=0.2, min_seconds=0.2, max_seconds=5)
+        for _ in range(5):
+            rto.record_sample("127.0.0.1", "temperature", 0.4)
+
+        with FakeDRSServer(response_delay=0.4) as fake:
+            validator = BatchCommandsValidator(timeout_per_command=0.2, rto=rto, pacing=PacingController())
+            result = validator.validate_batch_commands(
+                ip_address="127.0.0.1",
+                command_type=CommandType.MASTER,
+                mode="live",
+                selected_commands=["temperature"],
+                port=fake.port
+            )
+
+        self.assertEqual(result["statistics"]["passed"], 1)
+
+
+class TestSantoneFrameReader(unittest.TestCase):
+    """Test suite for incremental Santone frame reading"""
+
+    def setUp(self):
+        self.temperature = bytes.fromhex(REAL_DRS_RESPONSES["temperature"])
+        self.device_id = bytes.fromhex(REAL_DRS_RESPONSES["device_id"])
+
+    def test_fragmented_frame(self):
+        """A frame split across segments is returned once complete"""
+        reader = SantoneFrameReader()
+        reader.feed(self.temperature[:4])
+        self.assertIsNone(reader.next_frame())
+        reader.feed(self.temperature[4:])
+        self.assertEqual(reader.next_frame(), self.temperature)
+        self.assertEqual(reader.buffered, 0)
+
+    def test_coalesced_frames(self):
+        """Extra bytes after a frame are kept for the next one"""
+        reader = SantoneFrameReader()
+        reader.feed(self.temperature + self.device_id[:3])
+        self.assertEqual(reader.next_frame(), self.temperature)
+        self.assertIsNone(reader.next_frame())
+        reader.feed(self.device_id[3:])
+        self.assertEqual(reader.next_frame(), self.device_id)
+
+    def test_truncated_frame_resync(self):
+        """A truncated frame is dropped using the header length byte"""
+        reader = SantoneFrameReader()
+        reader.feed(self.temperature[:9] + self.device_id)
+        self.assertEqual(reader.next_frame(), self.device_id)
+
+    def test_escaped_content(self):
+        """Escaped 0x7E/0x5E bytes do not terminate the frame"""
+        frame = bytes.fromhex("7E070000020002" + "5E7D5E5D" + "AABB7E")
+        reader = SantoneFrameReader()
+        reader.feed(frame)
+        self.assertEqual(reader.next_frame(), frame)
+        self.assertEqual(unescape_frame_content(frame[1:-1])[6:8], bytes([0x7E, 0x5E]))
+        self.assertTrue(is_well_formed_frame(frame))
+
+        print("✅ Santone frame reader tests passed")
+
+    def test_fragmented_response_over_tcp(self):
+        """Live commands wait for the closing flag instead of the socket timeout"""
+        with FakeDRSServer(fragment_delay=0.05) as fake:
+            validator = BatchCommandsValidator(timeout_per_command=2)
+            result = validator.validate_batch_commands(
+                ip_address="127.0.0.1",
+                command_type=CommandType.MASTER,
+                mode="live",
+                selected_commands=["temperature", "channel_frequency_configuration"],
+                port=fake.port
+            )
+
+        self.assertEqual(result["statistics"]["passed"], 2)
+        for cmd_result in result["results"]:
+            self.assertEqual(
+                bytes.fromhex(cmd_result["response_data"]),
+                bytes.fromhex(REAL_DRS_RESPONSES[cmd_result["command"]])
+            )
+            self.assertLess(cmd_result["duration_ms"], 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()